@@ -0,0 +1,2 @@
+# Benchmarks - Mediciones de rendimiento del Validador TamaPrint
+# Este archivo hace que el directorio benchmarks sea un paquete Python
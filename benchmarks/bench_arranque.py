@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark: arranque en frío del servicio
+
+Mide en procesos nuevos:
+  - importar_s:          importar src.validador (sin cargar el catálogo)
+  - primer_health_s:     desde lanzar el servidor hasta el primer 200 de /health
+  - listo_s:             desde lanzar el servidor hasta el primer 200 de /health/ready
+  - primera_validacion_s: desde lanzar el servidor hasta el primer 200 de /validar-orden
+
+El servidor hijo sirve un catálogo sintético con un gspread falso (con
+--latencia-sheets se simula un Google Sheets lento) y corre con
+`uvicorn --factory src.validador:crear_app`. Reporta la mediana de
+--repeticiones arranques en JSON.
+
+Uso:
+  python -m benchmarks.bench_arranque
+  python -m benchmarks.bench_arranque --filas 100000 --latencia-sheets 2 --repeticiones 3
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ORDEN_PRUEBA = {
+    "comprador": {"nit": "CN800000000"},
+    "orden_compra": "ARRANQUE-1",
+    "items": [{
+        "codigo": "14000000000",
+        "descripcion": "Artículo 0",
+        "cantidad": 1,
+        "precio_unitario": 1.0,
+        "precio_total": 1.0,
+        "fecha_entrega": "2024-01-15"
+    }]
+}
+
+
+def _entorno(credenciales):
+    entorno = dict(os.environ)
+    entorno.update({
+        'GOOGLE_DRIVE_FILE_ID': 'benchmark',
+        'GOOGLE_SHEET_RANGE': 'Hoja1!A:Z',
+        'GOOGLE_APPLICATION_CREDENTIALS': credenciales,
+        'CATALOGO_RECARGA_SEGUNDOS': '0',
+        'CATALOGO_SNAPSHOT_PATH': '',
+        'LOG_LEVEL': 'WARNING'
+    })
+    return entorno
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def servir(args):
+    """Proceso hijo: servidor con Google Sheets falso"""
+    from unittest.mock import patch
+    import uvicorn
+    from benchmarks.sintetico import catalogo_sintetico
+    from tests.sheets_falso import cliente_gspread_falso
+
+    hoja, _ = catalogo_sintetico(args.filas)
+    with patch('gspread.authorize', return_value=cliente_gspread_falso(hoja, args.latencia_sheets)), \
+         patch('google.oauth2.service_account.Credentials.from_service_account_file'):
+        uvicorn.run("src.validador:crear_app", factory=True, port=args.puerto, log_level="warning")
+
+
+def _medir_importacion(entorno):
+    codigo = (
+        "import time; inicio = time.perf_counter(); import src.validador; "
+        "print(time.perf_counter() - inicio)"
+    )
+    salida = subprocess.run(
+        [sys.executable, "-c", codigo], env=entorno, capture_output=True, text=True, check=True
+    ).stdout
+    return float(salida.strip().splitlines()[-1])
+
+
+def _esperar(cliente, metodo, ruta, limite, **kwargs):
+    """Reintentar hasta obtener 200; devuelve el instante o None si se vence el límite"""
+    while time.perf_counter() < limite:
+        try:
+            if cliente.request(metodo, ruta, **kwargs).status_code == 200:
+                return time.perf_counter()
+        except httpx.TransportError:
+            pass
+        time.sleep(0.01)
+    return None
+
+
+def _medir_arranque(args, entorno):
+    puerto = _puerto_libre()
+    comando = [
+        sys.executable, "-m", "benchmarks.bench_arranque", "--servir", "--puerto", str(puerto),
+        "--filas", str(args.filas), "--latencia-sheets", str(args.latencia_sheets)
+    ]
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(comando, env=entorno, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        limite = inicio + args.timeout
+        with httpx.Client(base_url=f"http://127.0.0.1:{puerto}", timeout=5) as cliente:
+            health = _esperar(cliente, "GET", "/health", limite)
+            listo = _esperar(cliente, "GET", "/health/ready", limite)
+            validacion = _esperar(cliente, "POST", "/validar-orden", limite, json=ORDEN_PRUEBA)
+    finally:
+        proceso.terminate()
+        proceso.wait(timeout=10)
+    return tuple(
+        instante - inicio if instante is not None else None
+        for instante in (health, listo, validacion)
+    )
+
+
+def _mediana(valores):
+    valores = [v for v in valores if v is not None]
+    return round(statistics.median(valores), 3) if valores else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque en frío")
+    parser.add_argument("--filas", type=int, default=100000, help="filas del catálogo sintético")
+    parser.add_argument("--latencia-sheets", type=float, default=0.0,
+                        help="segundos que tarda el Google Sheets falso en responder")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--timeout", type=float, default=120.0, help="límite por arranque")
+    parser.add_argument("--servir", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--puerto", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.servir:
+        servir(args)
+        return
+
+    with tempfile.TemporaryDirectory() as directorio:
+        credenciales = os.path.join(directorio, "credentials.json")
+        open(credenciales, 'w').close()
+        entorno = _entorno(credenciales)
+        importaciones = [_medir_importacion(entorno) for _ in range(args.repeticiones)]
+        arranques = [_medir_arranque(args, entorno) for _ in range(args.repeticiones)]
+
+    print(json.dumps({
+        "filas_catalogo": args.filas,
+        "latencia_sheets_s": args.latencia_sheets,
+        "repeticiones": args.repeticiones,
+        "importar_s": _mediana(importaciones),
+        "primer_health_s": _mediana([h for h, _, _ in arranques]),
+        "listo_s": _mediana([l for _, l, _ in arranques]),
+        "primera_validacion_s": _mediana([v for _, _, v in arranques])
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
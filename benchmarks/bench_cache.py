@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Benchmark: throughput de CacheManager.set con el cache lleno según max_size
+
+Uso:
+  python -m benchmarks.bench_cache
+  python -m benchmarks.bench_cache --operaciones 50000
+"""
+
+import argparse
+import logging
+import time
+
+from src.validador import CacheManager
+
+
+def medir_sets(max_size, operaciones):
+    """Operaciones set por segundo con el cache ya lleno (cada set evicta una entrada)"""
+    cache = CacheManager(max_size=max_size, ttl_seconds=3600)
+    for i in range(max_size):
+        cache.set(f"llenado_{i}", i)
+    inicio = time.perf_counter()
+    for i in range(operaciones):
+        cache.set(f"clave_{i}", i)
+    return operaciones / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del cache LRU")
+    parser.add_argument("--operaciones", type=int, default=20000)
+    args = parser.parse_args()
+
+    # El benchmark mide el cache, no el logging
+    logging.disable(logging.INFO)
+
+    print(f"{'max_size':>10}{'sets/s':>14}")
+    for max_size in (1000, 10000, 100000):
+        print(f"{max_size:>10}{medir_sets(max_size, args.operaciones):>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: búsqueda por clave con pandas .loc vs IndiceCatalogo
+
+Uso:
+  python -m benchmarks.bench_indice
+  python -m benchmarks.bench_indice --filas 100000 --busquedas 20000
+"""
+
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from src.catalogo import IndiceCatalogo
+
+
+def generar_catalogo(filas, clientes=50, semilla=42):
+    """Catálogo sintético con la misma forma de clave que el real"""
+    rnd = random.Random(semilla)
+    catalogo = pd.DataFrame({
+        'Código SN': [f"CN{800000000 + rnd.randrange(clientes)}" for _ in range(filas)],
+        'Nº catálogo SN': [str(14000000000 + i) for i in range(filas)],
+    })
+    catalogo['clave_busqueda'] = (
+        catalogo['Código SN'].str.upper() + "|" + catalogo['Nº catálogo SN'].str.lower()
+    )
+    return catalogo
+
+
+def medir(funcion, claves):
+    """Tiempo promedio por búsqueda en nanosegundos"""
+    inicio = time.perf_counter()
+    for clave in claves:
+        funcion(clave)
+    return (time.perf_counter() - inicio) / len(claves) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del índice del catálogo")
+    parser.add_argument("--filas", type=int, default=50000)
+    parser.add_argument("--busquedas", type=int, default=10000)
+    args = parser.parse_args()
+
+    catalogo = generar_catalogo(args.filas)
+    rnd = random.Random(7)
+    existentes = rnd.sample(catalogo['clave_busqueda'].tolist(), min(args.busquedas, args.filas))
+    faltantes = [f"CN999999999|{i}" for i in range(len(existentes))]
+
+    indice_pandas = catalogo.set_index('clave_busqueda')
+    indice_hash = IndiceCatalogo.desde_catalogo(catalogo)
+
+    def buscar_pandas(clave):
+        try:
+            return indice_pandas.loc[clave]
+        except KeyError:
+            return None
+
+    def buscar_hash(clave):
+        cliente, codigo = clave.split('|')
+        return indice_hash.buscar(cliente, codigo)
+
+    print(f"Catálogo: {args.filas} filas, {len(existentes)} búsquedas por caso")
+    print(f"{'caso':<12}{'pandas .loc':>16}{'IndiceCatalogo':>18}{'mejora':>10}")
+    for caso, claves in (("encontrado", existentes), ("faltante", faltantes)):
+        ns_pandas = medir(buscar_pandas, claves)
+        ns_hash = medir(buscar_hash, claves)
+        print(f"{caso:<12}{ns_pandas:>13.0f} ns{ns_hash:>15.0f} ns{ns_pandas / ns_hash:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
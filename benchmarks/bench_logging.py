@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: costo del logging por orden para quien registra (el hilo de la solicitud)
+
+Reproduce los mensajes que emite una validación de /validar-orden y compara:
+  - antes:   handlers de consola y archivo síncronos, mensajes con f-string y
+             un debug por artículo formateado aunque DEBUG esté apagado
+  - despues: QueueHandler + QueueListener (como setup_logging), formateo diferido
+             y debug por artículo solo si el nivel lo habilita
+
+La consola se redirige a os.devnull para medir el costo del logging y no el de
+la terminal.
+
+Uso:
+  python -m benchmarks.bench_logging
+  python -m benchmarks.bench_logging --ordenes 20000 --articulos 50
+"""
+
+import argparse
+import logging
+import os
+import queue
+import tempfile
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+FORMATO = '%(asctime)s | %(levelname)s | %(name)s | %(message)s'
+
+
+def _handlers(directorio, consola):
+    formato = logging.Formatter(FORMATO)
+    handlers = [
+        logging.StreamHandler(consola),
+        logging.FileHandler(os.path.join(directorio, 'bench.log'), encoding='utf-8')
+    ]
+    for handler in handlers:
+        handler.setFormatter(formato)
+    return handlers
+
+
+def _orden_antes(logger, numero, cliente, codigos):
+    logger.info(f"[VALIDATE] Iniciando validación de orden...")
+    logger.info(f"[ORDER] Validando orden {numero} para cliente {cliente} con {len(codigos)} artículos")
+    for codigo in codigos:
+        logger.debug(f"[ITEM] Buscando {cliente}|{codigo}")
+    logger.info(f"[RESULT] Validación completada: {len(codigos)}/{len(codigos)} artículos encontrados")
+    logger.info(f"[SUCCESS] Validación exitosa para orden: {numero}")
+
+
+def _orden_despues(logger, numero, cliente, codigos):
+    logger.debug("[VALIDATE] Iniciando validación de orden...")
+    logger.info("[ORDER] Validando orden %s para cliente %s con %d artículos", numero, cliente, len(codigos))
+    if logger.isEnabledFor(logging.DEBUG):
+        for codigo in codigos:
+            logger.debug("[ITEM] %s + %s no existe en el catálogo", cliente, codigo)
+    logger.info("[RESULT] Validación completada: %d/%d artículos encontrados", len(codigos), len(codigos))
+    logger.info("[SUCCESS] Validación exitosa para orden: %s", numero)
+
+
+def medir(emitir, handlers_logger, ordenes, articulos):
+    """Microsegundos por orden gastados en el hilo que registra"""
+    logger = logging.getLogger(f"bench.{emitir.__name__}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    for handler in handlers_logger:
+        logger.addHandler(handler)
+    codigos = [f"1400379{i:04d}" for i in range(articulos)]
+    try:
+        inicio = time.perf_counter()
+        for i in range(ordenes):
+            emitir(logger, f"OC-{i}", "CN800069933", codigos)
+        return (time.perf_counter() - inicio) / ordenes * 1e6
+    finally:
+        for handler in handlers_logger:
+            logger.removeHandler(handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del logging por orden")
+    parser.add_argument("--ordenes", type=int, default=5000)
+    parser.add_argument("--articulos", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio, open(os.devnull, 'w', encoding='utf-8') as consola:
+        handlers = _handlers(directorio, consola)
+        antes = medir(_orden_antes, handlers, args.ordenes, args.articulos)
+
+        cola = queue.SimpleQueue()
+        listener = QueueListener(cola, *handlers, respect_handler_level=True)
+        listener.start()
+        try:
+            despues = medir(_orden_despues, [QueueHandler(cola)], args.ordenes, args.articulos)
+        finally:
+            listener.stop()
+        for handler in handlers:
+            handler.close()
+
+    print(f"{'escenario':<12}{'us/orden':>12}")
+    print(f"{'antes':<12}{antes:>12.1f}")
+    print(f"{'despues':<12}{despues:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark: validación de órdenes con catálogos sintéticos, directo y por HTTP
+
+Genera catálogos sintéticos con NIT sesgados (benchmarks.sintetico) servidos por
+un gspread falso (tests.sheets_falso), construye ValidadorOrdenesCompra con cada uno y mide órdenes de
+distintos tamaños en tres escenarios:
+  - directo:    ValidadorOrdenesCompra.validar_orden
+  - http:       POST /validar-orden (pydantic, pool, serialización, middleware)
+  - http_lote:  POST /validar-ordenes con --lote órdenes por solicitud
+
+Cada orden tiene número distinto, así que no hay aciertos en el cache de
+resultados. Se reporta costo por artículo, órdenes/s, p50/p99 y RSS pico en
+JSON (junto con el commit) para comparar entre commits.
+
+Uso:
+  python -m benchmarks.bench_validacion
+  python -m benchmarks.bench_validacion --filas 10000,100000 --items 1,100,5000 --salida bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+from benchmarks.sintetico import catalogo_sintetico, orden_sintetica
+from tests.sheets_falso import cliente_gspread_falso
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _rss_pico_mb():
+    """RSS máximo del proceso hasta ahora en MB (None si no se puede medir)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB y macOS bytes
+    return round(pico / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _commit_actual():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _percentil(valores_ordenados, p):
+    return valores_ordenados[min(len(valores_ordenados) - 1, int(len(valores_ordenados) * p))]
+
+
+def _resumir(escenario, filas, items, latencias, total_s, ordenes_por_medicion=1):
+    latencias = sorted(latencias)
+    p50 = _percentil(latencias, 0.50)
+    return {
+        "escenario": escenario,
+        "filas_catalogo": filas,
+        "items_por_orden": items,
+        "mediciones": len(latencias),
+        "ordenes_por_s": round(len(latencias) * ordenes_por_medicion / total_s, 1),
+        "p50_ms": round(p50 * 1000, 3),
+        "p99_ms": round(_percentil(latencias, 0.99) * 1000, 3),
+        "us_por_item": round(p50 * 1e6 / (items * ordenes_por_medicion), 3),
+        "rss_pico_mb": _rss_pico_mb()
+    }
+
+
+def _medir(funcion, argumentos):
+    latencias = []
+    inicio_total = time.perf_counter()
+    for argumento in argumentos:
+        inicio = time.perf_counter()
+        funcion(argumento)
+        latencias.append(time.perf_counter() - inicio)
+    return latencias, time.perf_counter() - inicio_total
+
+
+def _importar_validador(hoja):
+    """Importar src.validador con credenciales y Google Sheets falsos"""
+    credenciales = tempfile.NamedTemporaryFile(suffix='.json', delete=False)
+    credenciales.close()
+    os.environ.update({
+        'GOOGLE_DRIVE_FILE_ID': 'benchmark',
+        'GOOGLE_SHEET_RANGE': 'Hoja1!A:Z',
+        'GOOGLE_APPLICATION_CREDENTIALS': credenciales.name,
+        'CATALOGO_RECARGA_SEGUNDOS': '0',
+        'CATALOGO_SNAPSHOT_PATH': '',
+        'LOG_LEVEL': 'ERROR'
+    })
+    with patch('gspread.authorize', return_value=cliente_gspread_falso(hoja)), \
+         patch('google.oauth2.service_account.Credentials.from_service_account_file'):
+        import src.validador as modulo
+    return modulo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de validación con catálogos sintéticos")
+    parser.add_argument("--filas", default="10000,100000,1000000",
+                        help="tamaños de catálogo separados por coma")
+    parser.add_argument("--items", default="1,10,100,1000,5000",
+                        help="artículos por orden separados por coma")
+    parser.add_argument("--repeticiones", type=int, default=100, help="órdenes por medición")
+    parser.add_argument("--lote", type=int, default=10, help="órdenes por solicitud en http_lote")
+    parser.add_argument("--clientes", type=int, default=500)
+    parser.add_argument("--sesgo", type=float, default=1.1)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--sin-http", action="store_true", help="medir solo el escenario directo")
+    parser.add_argument("--salida", help="archivo JSON de salida (por defecto stdout)")
+    args = parser.parse_args()
+
+    tamanos_catalogo = [int(x) for x in args.filas.split(",")]
+    tamanos_orden = [int(x) for x in args.items.split(",")]
+
+    hoja, _ = catalogo_sintetico(tamanos_catalogo[0], args.clientes, args.sesgo, args.semilla)
+    modulo = _importar_validador(hoja)
+    from fastapi.testclient import TestClient
+    cliente_http = TestClient(modulo.app)
+
+    resultados = []
+    for filas in tamanos_catalogo:
+        hoja, articulos = catalogo_sintetico(filas, args.clientes, args.sesgo, args.semilla)
+        with patch('gspread.authorize', return_value=cliente_gspread_falso(hoja)), \
+             patch('google.oauth2.service_account.Credentials.from_service_account_file'):
+            inicio = time.perf_counter()
+            validador = modulo.ValidadorOrdenesCompra()
+            carga_s = time.perf_counter() - inicio
+        del hoja
+        # Los endpoints usan la instancia global del módulo
+        modulo.validador = validador
+        resultados.append({
+            "escenario": "carga_catalogo", "filas_catalogo": filas,
+            "segundos": round(carga_s, 3), "rss_pico_mb": _rss_pico_mb()
+        })
+        print(f"[BENCH] Catálogo de {filas} filas cargado en {carga_s:.2f}s", file=sys.stderr)
+
+        # El cliente con más artículos: el caso más caro para la búsqueda
+        nit = max(articulos, key=lambda n: len(articulos[n]))
+        rng = random.Random(args.semilla)
+        for items in tamanos_orden:
+            ordenes = [
+                orden_sintetica(nit, articulos[nit], items, f"BENCH-{filas}-{items}-{i}", rng=rng)
+                for i in range(args.repeticiones)
+            ]
+            latencias, total = _medir(validador.validar_orden, ordenes)
+            resultados.append(_resumir("directo", filas, items, latencias, total))
+
+            if not args.sin_http:
+                # Números nuevos: el escenario anterior dejó estas órdenes en el cache
+                for orden in ordenes:
+                    orden["orden_compra"] += "-http"
+                latencias, total = _medir(
+                    lambda orden: cliente_http.post("/validar-orden", json=orden), ordenes
+                )
+                resultados.append(_resumir("http", filas, items, latencias, total))
+
+                lotes = [
+                    ordenes[i:i + args.lote] for i in range(0, len(ordenes), args.lote)
+                ]
+                latencias, total = _medir(
+                    lambda lote: cliente_http.post("/validar-ordenes", json=lote), lotes
+                )
+                resultados.append(_resumir("http_lote", filas, items, latencias, total, args.lote))
+            print(f"[BENCH] {filas} filas, órdenes de {items} artículos medidas", file=sys.stderr)
+
+    informe = {
+        "commit": _commit_actual(),
+        "fecha": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": vars(args),
+        "resultados": resultados
+    }
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+
+if __name__ == "__main__":
+    main()
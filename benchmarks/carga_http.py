@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Generador de carga HTTP: reproduce un corpus de órdenes contra el servicio corriendo
+
+Corpus:
+  - grabado:    --corpus archivo.ndjson (una orden JSON por línea, mismo formato
+                que /validar-ordenes/stream)
+  - sintético:  --sintetico N órdenes generadas con benchmarks.sintetico
+                (--guardar-corpus para reutilizarlas después)
+
+Modos:
+  - lazo cerrado:  --concurrencia 10,40,80 (cada cliente envía la siguiente
+                   orden al recibir la respuesta)
+  - lazo abierto:  --tasas 20,50,100 solicitudes/s con llegadas Poisson,
+                   independientes de lo que tarde el servicio
+
+Cada escalón dura --duracion segundos. Por escalón se reporta throughput,
+p50/p90/p99/max y tasa de error (sin respuesta o HTTP 429/5xx). El punto de
+saturación es el primer escalón con p99 mayor a --slo-ms, error mayor a
+--max-error o, en lazo abierto, throughput menor al 90 % de la tasa ofrecida.
+
+Uso:
+  python -m benchmarks.carga_http --sintetico 500 --concurrencia 1,10,40,80
+  python -m benchmarks.carga_http --corpus ordenes.ndjson --tasas 10,50,100,200 --salida carga.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+import uuid
+
+import httpx
+
+from benchmarks.sintetico import orden_sintetica
+
+
+def _cargar_corpus(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def _corpus_sintetico(cantidad, nit, semilla):
+    """Órdenes con tamaños sesgados: la mayoría pequeñas y algunas de miles de artículos"""
+    rng = random.Random(semilla)
+    articulos = [f"{14000000000 + i}" for i in range(5000)]
+    tamanos = [1, 3, 10, 30, 100, 500, 2000]
+    pesos = [30, 25, 20, 12, 8, 4, 1]
+    return [
+        orden_sintetica(nit, articulos, rng.choices(tamanos, pesos)[0], f"CARGA-{i}", rng=rng)
+        for i in range(cantidad)
+    ]
+
+
+def _percentil(valores_ordenados, p):
+    if not valores_ordenados:
+        return None
+    return valores_ordenados[min(len(valores_ordenados) - 1, int(len(valores_ordenados) * p))]
+
+
+class Escalon:
+    """Mediciones de un escalón de carga"""
+
+    def __init__(self, modo, nivel):
+        self.modo = modo
+        self.nivel = nivel
+        self.latencias = []
+        self.codigos = {}
+        self.errores = 0
+        self.descartadas = 0
+
+    def registrar(self, latencia, codigo):
+        self.codigos[codigo] = self.codigos.get(codigo, 0) + 1
+        if codigo is None or codigo == 429 or codigo >= 500:
+            self.errores += 1
+        else:
+            self.latencias.append(latencia)
+
+    def resumen(self, duracion):
+        latencias = sorted(self.latencias)
+        enviadas = sum(self.codigos.values())
+
+        def ms(valor):
+            return round(valor * 1000, 1) if valor is not None else None
+
+        return {
+            "modo": self.modo,
+            "nivel": self.nivel,
+            "enviadas": enviadas,
+            "descartadas": self.descartadas,
+            "throughput": round(len(latencias) / duracion, 1),
+            "tasa_error": round(self.errores / enviadas, 4) if enviadas else 0.0,
+            "p50_ms": ms(_percentil(latencias, 0.50)),
+            "p90_ms": ms(_percentil(latencias, 0.90)),
+            "p99_ms": ms(_percentil(latencias, 0.99)),
+            "max_ms": ms(latencias[-1] if latencias else None),
+            "codigos": {str(codigo): n for codigo, n in sorted(self.codigos.items(), key=str)}
+        }
+
+
+async def _enviar(cliente, orden, sin_cache, escalon):
+    if sin_cache:
+        orden = {**orden, "orden_compra": f"{orden['orden_compra']}-{uuid.uuid4().hex[:8]}"}
+    inicio = time.perf_counter()
+    try:
+        respuesta = await cliente.post("/validar-orden", json=orden)
+        codigo = respuesta.status_code
+    except httpx.HTTPError:
+        codigo = None
+    escalon.registrar(time.perf_counter() - inicio, codigo)
+
+
+async def _lazo_cerrado(cliente, corpus, concurrencia, duracion, sin_cache):
+    escalon = Escalon("concurrencia", concurrencia)
+    ordenes = itertools.cycle(corpus)
+    fin = time.perf_counter() + duracion
+
+    async def usuario():
+        while time.perf_counter() < fin:
+            await _enviar(cliente, next(ordenes), sin_cache, escalon)
+
+    await asyncio.gather(*(usuario() for _ in range(concurrencia)))
+    return escalon
+
+
+async def _lazo_abierto(cliente, corpus, tasa, duracion, sin_cache, max_en_vuelo, rng):
+    escalon = Escalon("tasa", tasa)
+    ordenes = itertools.cycle(corpus)
+    en_vuelo = set()
+    inicio = time.perf_counter()
+    proxima = inicio
+    while proxima < inicio + duracion:
+        await asyncio.sleep(max(0.0, proxima - time.perf_counter()))
+        if len(en_vuelo) >= max_en_vuelo:
+            # El servicio no da abasto: no acumular solicitudes sin límite en el cliente
+            escalon.descartadas += 1
+        else:
+            tarea = asyncio.ensure_future(_enviar(cliente, next(ordenes), sin_cache, escalon))
+            en_vuelo.add(tarea)
+            tarea.add_done_callback(en_vuelo.discard)
+        proxima += rng.expovariate(tasa)
+    if en_vuelo:
+        await asyncio.gather(*en_vuelo)
+    return escalon
+
+
+def _saturado(resumen, args):
+    if resumen["tasa_error"] > args.max_error:
+        return True
+    if resumen["p99_ms"] is not None and resumen["p99_ms"] > args.slo_ms:
+        return True
+    return resumen["modo"] == "tasa" and resumen["throughput"] < 0.9 * resumen["nivel"]
+
+
+async def principal(args, corpus):
+    limites = httpx.Limits(max_connections=args.max_en_vuelo, max_keepalive_connections=args.max_en_vuelo)
+    rng = random.Random(args.semilla)
+    resumenes = []
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limites) as cliente:
+        (await cliente.get("/health")).raise_for_status()
+        if args.tasas:
+            niveles = [("tasa", float(t)) for t in args.tasas.split(",")]
+        else:
+            niveles = [("concurrencia", int(c)) for c in args.concurrencia.split(",")]
+        for modo, nivel in niveles:
+            if modo == "tasa":
+                escalon = await _lazo_abierto(
+                    cliente, corpus, nivel, args.duracion, args.sin_cache, args.max_en_vuelo, rng
+                )
+            else:
+                escalon = await _lazo_cerrado(cliente, corpus, nivel, args.duracion, args.sin_cache)
+            resumen = escalon.resumen(args.duracion)
+            resumen["saturado"] = _saturado(resumen, args)
+            resumenes.append(resumen)
+            print(
+                f"{modo:<13}{nivel:>8}{resumen['throughput']:>10}{str(resumen['p50_ms']):>10}"
+                f"{str(resumen['p90_ms']):>10}{str(resumen['p99_ms']):>10}"
+                f"{resumen['tasa_error']:>9.2%}{'  SATURADO' if resumen['saturado'] else ''}",
+                file=sys.stderr
+            )
+    return resumenes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para /validar-orden")
+    parser.add_argument("--url", default="http://localhost:8000")
+    origen = parser.add_mutually_exclusive_group(required=True)
+    origen.add_argument("--corpus", help="archivo NDJSON con una orden por línea")
+    origen.add_argument("--sintetico", type=int, help="cantidad de órdenes sintéticas")
+    parser.add_argument("--guardar-corpus", help="guardar el corpus sintético en este NDJSON")
+    parser.add_argument("--nit", default="CN800069933", help="NIT de las órdenes sintéticas")
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument("--concurrencia", default="1,10,40,80",
+                      help="clientes simultáneos por escalón (lazo cerrado)")
+    modo.add_argument("--tasas", help="solicitudes/s por escalón (lazo abierto, llegadas Poisson)")
+    parser.add_argument("--duracion", type=float, default=15.0, help="segundos por escalón")
+    parser.add_argument("--sin-cache", action="store_true",
+                        help="número de orden único por envío (evita el cache de resultados)")
+    parser.add_argument("--max-en-vuelo", type=int, default=1000)
+    parser.add_argument("--slo-ms", type=float, default=1000.0, help="p99 aceptable")
+    parser.add_argument("--max-error", type=float, default=0.01, help="tasa de error aceptable")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="archivo JSON con el informe")
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = _cargar_corpus(args.corpus)
+    else:
+        corpus = _corpus_sintetico(args.sintetico, args.nit, args.semilla)
+        if args.guardar_corpus:
+            with open(args.guardar_corpus, 'w', encoding='utf-8') as f:
+                for orden in corpus:
+                    f.write(json.dumps(orden, ensure_ascii=False) + "\n")
+
+    print(
+        f"{'modo':<13}{'nivel':>8}{'ok/s':>10}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'error':>9}",
+        file=sys.stderr
+    )
+    resumenes = asyncio.run(principal(args, corpus))
+    saturacion = next((r for r in resumenes if r["saturado"]), None)
+    informe = {
+        "url": args.url,
+        "ordenes_corpus": len(corpus),
+        "escalones": resumenes,
+        "punto_saturacion": (
+            {"modo": saturacion["modo"], "nivel": saturacion["nivel"]} if saturacion else None
+        )
+    }
+    if saturacion:
+        print(f"Punto de saturación: {saturacion['modo']} = {saturacion['nivel']}", file=sys.stderr)
+    else:
+        print("Sin saturación en los escalones probados", file=sys.stderr)
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga: latencia de órdenes pequeñas en /validar-orden mientras se
+valida una orden grande en el mismo worker de uvicorn.
+
+Mide las órdenes pequeñas dos veces: solas (línea base) y con una orden de
+--articulos-grande líneas en curso. Si la validación bloqueara el event loop, el
+p95 de la segunda medición crecería hasta el tiempo de la orden grande.
+
+Requiere el servicio corriendo (python run.py o uvicorn src.validador:app).
+
+Uso:
+  python -m benchmarks.carga_validar_orden
+  python -m benchmarks.carga_validar_orden --url http://localhost:8000 --concurrencia 40
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def _orden(nit, numero, articulos):
+    """Orden sintética; el número es único para no reutilizar resultados del cache"""
+    return {
+        "comprador": {"nit": nit},
+        "orden_compra": numero,
+        "items": [
+            {
+                "codigo": f"ART-{i:06d}",
+                "descripcion": f"Artículo de prueba {i}",
+                "cantidad": 1,
+                "precio_unitario": 1.0,
+                "precio_total": 1.0,
+                "fecha_entrega": "2024-01-15"
+            }
+            for i in range(articulos)
+        ]
+    }
+
+
+async def _enviar(cliente, orden):
+    """Enviar una orden y devolver (latencia en ms, código HTTP)"""
+    inicio = time.perf_counter()
+    respuesta = await cliente.post("/validar-orden", json=orden)
+    return (time.perf_counter() - inicio) * 1000, respuesta.status_code
+
+
+async def _rafaga_pequenas(cliente, args, etiqueta):
+    """Enviar --pequenas órdenes de --articulos-pequena líneas con --concurrencia en vuelo"""
+    semaforo = asyncio.Semaphore(args.concurrencia)
+
+    async def una():
+        async with semaforo:
+            numero = f"CARGA-{etiqueta}-{uuid.uuid4().hex[:12]}"
+            return await _enviar(cliente, _orden(args.nit, numero, args.articulos_pequena))
+
+    return await asyncio.gather(*(una() for _ in range(args.pequenas)))
+
+
+def _resumen(nombre, mediciones):
+    latencias = sorted(ms for ms, _ in mediciones)
+    errores = sum(1 for _, codigo in mediciones if codigo >= 500)
+    p95 = latencias[max(0, int(len(latencias) * 0.95) - 1)]
+    print(
+        f"{nombre:<28}{len(latencias):>8}{statistics.median(latencias):>10.1f}"
+        f"{p95:>10.1f}{latencias[-1]:>10.1f}{errores:>8}"
+    )
+
+
+async def principal(args):
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as cliente:
+        salud = await cliente.get("/health")
+        salud.raise_for_status()
+
+        base = await _rafaga_pequenas(cliente, args, "base")
+
+        grande = asyncio.ensure_future(_enviar(
+            cliente, _orden(args.nit, f"CARGA-GRANDE-{uuid.uuid4().hex[:12]}", args.articulos_grande)
+        ))
+        # Dar tiempo a que la orden grande llegue al servidor antes de la ráfaga
+        await asyncio.sleep(args.espera_grande)
+        con_grande = await _rafaga_pequenas(cliente, args, "grande")
+        ms_grande, codigo_grande = await grande
+
+    print(f"{'escenario':<28}{'n':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'5xx':>8}")
+    _resumen("pequeñas solas", base)
+    _resumen("pequeñas + orden grande", con_grande)
+    print(f"orden grande ({args.articulos_grande} líneas): {ms_grande:.1f} ms, HTTP {codigo_grande}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de /validar-orden")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--nit", default="CN800069933")
+    parser.add_argument("--pequenas", type=int, default=200, help="órdenes pequeñas por escenario")
+    parser.add_argument("--articulos-pequena", type=int, default=3)
+    parser.add_argument("--articulos-grande", type=int, default=2000)
+    parser.add_argument("--concurrencia", type=int, default=20)
+    parser.add_argument("--espera-grande", type=float, default=0.05,
+                        help="segundos entre enviar la orden grande y empezar la ráfaga")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    asyncio.run(principal(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
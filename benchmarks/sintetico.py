@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Datos sintéticos reproducibles para benchmarks: catálogos y órdenes. El cliente de
+gspread falso que sirve el catálogo como hoja de Google Sheets está en
+tests/sheets_falso.py.
+"""
+
+import random
+
+ENCABEZADOS = ['Código SN', 'Nº catálogo SN', 'Descripción', 'Precio']
+
+
+def catalogo_sintetico(filas, clientes=500, sesgo=1.1, semilla=42):
+    """Filas de la hoja (con encabezados) repartidas entre clientes con sesgo tipo Zipf
+
+    El cliente de rango k recibe filas en proporción a 1 / k**sesgo: unos pocos
+    NIT concentran la mayor parte del catálogo, como en producción.
+    Devuelve (filas_hoja, articulos_por_cliente).
+    """
+    rng = random.Random(semilla)
+    nits = [f"CN{800000000 + i}" for i in range(clientes)]
+    pesos = [1 / (rango + 1) ** sesgo for rango in range(clientes)]
+    asignados = rng.choices(range(clientes), weights=pesos, k=filas)
+    articulos_por_cliente = {nit: [] for nit in nits}
+    hoja = [list(ENCABEZADOS)]
+    for fila, cliente in enumerate(asignados):
+        nit = nits[cliente]
+        codigo = f"{14000000000 + fila}"
+        articulos_por_cliente[nit].append(codigo)
+        hoja.append([nit, codigo, f"Artículo {fila}", f"{rng.uniform(1, 500):.2f}"])
+    return hoja, articulos_por_cliente
+
+
+def orden_sintetica(nit, articulos_cliente, items, numero, proporcion_existentes=0.9, rng=None):
+    """Orden con items artículos; proporcion_existentes de ellos están en el catálogo del cliente"""
+    rng = rng or random.Random(0)
+    lineas = []
+    for i in range(items):
+        if articulos_cliente and rng.random() < proporcion_existentes:
+            codigo = rng.choice(articulos_cliente)
+        else:
+            codigo = f"NOEXISTE{i:07d}"
+        lineas.append({
+            "codigo": codigo,
+            "descripcion": f"Artículo {codigo}",
+            "cantidad": rng.randint(1, 50),
+            "precio_unitario": 10.0,
+            "precio_total": 10.0,
+            "fecha_entrega": "2024-01-15"
+        })
+    return {"comprador": {"nit": nit}, "orden_compra": numero, "items": lineas}
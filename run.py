@@ -32,6 +32,7 @@ Ejemplos de uso:
   python run.py --port 8080       # Puerto específico
   python run.py --host 127.0.0.1  # Host específico
   python run.py --reload          # Modo desarrollo con recarga
+  python run.py --workers 4       # Producción multi-core: catálogo compartido entre workers
         """
     )
     
@@ -54,6 +55,13 @@ Ejemplos de uso:
         help="Habilitar recarga automática (modo desarrollo)"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Procesos worker; con más de 1 el catálogo se carga una vez y se comparte (default: 1)"
+    )
+    
     parser.add_argument(
         "--log-level", 
         default="info",
@@ -63,6 +71,10 @@ Ejemplos de uso:
     
     args = parser.parse_args()
     
+    if args.workers > 1 and args.reload:
+        print("Error: --workers no se puede combinar con --reload")
+        sys.exit(1)
+    
     # Verificar que el módulo principal existe
     validador_path = src_path / "validador.py"
     if not validador_path.exists():
@@ -84,9 +96,14 @@ Ejemplos de uso:
     print(f"   Puerto: {args.port}")
     print(f"   Modo: {'Desarrollo' if args.reload else 'Produccion'}")
     print(f"   Log Level: {args.log_level}")
+    if args.workers > 1:
+        print(f"   Workers: {args.workers} (catálogo compartido)")
     print()
     
     try:
+        if args.workers > 1:
+            from src.prefork import servir_prefork
+            sys.exit(servir_prefork(args.host, args.port, args.workers, args.log_level))
         import uvicorn
         uvicorn.run(**uvicorn_config)
     except ImportError:
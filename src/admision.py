@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Control de admisión por artículos en vuelo para /validar-orden.
+
+El costo de validar una orden crece con su cantidad de artículos, así que el
+límite no es de solicitudes sino de artículos en proceso. Una orden que no cabe
+espera en una cola FIFO como máximo espera_max segundos; si no hay lugar a tiempo
+(o la cola está llena) se rechaza de inmediato para que el cliente reintente, en
+vez de que todas las solicitudes se vuelvan lentas.
+
+Se usa desde el event loop (no es seguro entre hilos).
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class AdmisionRechazada(Exception):
+    """La orden no obtuvo lugar dentro del tiempo de espera o la cola estaba llena"""
+
+    def __init__(self, mensaje, motivo):
+        super().__init__(mensaje)
+        self.motivo = motivo
+
+
+class ControlAdmision:
+    """Limita los artículos en vuelo con una cola de espera breve"""
+
+    def __init__(self, max_articulos, espera_max, cola_max):
+        self.max_articulos = max_articulos
+        self.espera_max = espera_max
+        self.cola_max = cola_max
+        self.articulos_en_vuelo = 0
+        self._espera = deque()
+        self.admitidas = 0
+        self.rechazadas = {"cola_llena": 0, "espera_agotada": 0}
+
+    def _peso(self, articulos):
+        # Una orden mayor que el límite se admite sola, cuando no hay nada más en vuelo
+        return min(max(articulos, 1), self.max_articulos)
+
+    def _despertar(self):
+        """Admitir en orden de llegada las órdenes en espera que ya caben"""
+        while self._espera:
+            peso, futuro = self._espera[0]
+            if futuro.done():
+                self._espera.popleft()
+                continue
+            if self.articulos_en_vuelo + peso > self.max_articulos:
+                break
+            self._espera.popleft()
+            self.articulos_en_vuelo += peso
+            futuro.set_result(None)
+
+    async def entrar(self, articulos):
+        """Reservar lugar para una orden; devuelve los segundos de espera
+
+        Lanza AdmisionRechazada si la cola está llena o si no hubo lugar en espera_max.
+        """
+        peso = self._peso(articulos)
+        if not self._espera and self.articulos_en_vuelo + peso <= self.max_articulos:
+            self.articulos_en_vuelo += peso
+            self.admitidas += 1
+            return 0.0
+        if len(self._espera) >= self.cola_max:
+            self.rechazadas["cola_llena"] += 1
+            raise AdmisionRechazada(
+                f"Cola de admisión llena ({self.cola_max} órdenes esperando)", "cola_llena"
+            )
+
+        inicio = time.perf_counter()
+        entrada = (peso, asyncio.get_running_loop().create_future())
+        self._espera.append(entrada)
+        futuro = entrada[1]
+        try:
+            await asyncio.wait_for(futuro, self.espera_max)
+        except asyncio.TimeoutError:
+            # Si el lugar se asignó justo al vencer la espera, la orden queda admitida
+            if not (futuro.done() and not futuro.cancelled()):
+                self._quitar(entrada)
+                self.rechazadas["espera_agotada"] += 1
+                raise AdmisionRechazada(
+                    f"Sin capacidad para {articulos} artículos tras esperar "
+                    f"{self.espera_max * 1000:.0f} ms ({self.max_articulos} artículos en vuelo como máximo)",
+                    "espera_agotada"
+                )
+        except asyncio.CancelledError:
+            # El lugar pudo asignarse justo antes de la cancelación: devolverlo
+            if futuro.done() and not futuro.cancelled():
+                self.salir(articulos)
+            else:
+                self._quitar(entrada)
+            raise
+        self.admitidas += 1
+        return time.perf_counter() - inicio
+
+    def _quitar(self, entrada):
+        try:
+            self._espera.remove(entrada)
+        except ValueError:
+            pass
+        # Una orden grande que dejó la cola puede estar bloqueando a las que venían detrás
+        self._despertar()
+
+    def salir(self, articulos):
+        """Liberar el lugar de una orden admitida"""
+        self.articulos_en_vuelo -= self._peso(articulos)
+        self._despertar()
+
+    @asynccontextmanager
+    async def admitir(self, articulos):
+        """Mantener el lugar de la orden mientras dura el bloque; entrega los segundos de espera"""
+        espera = await self.entrar(articulos)
+        try:
+            yield espera
+        finally:
+            self.salir(articulos)
+
+    def stats(self):
+        """Estado actual del control de admisión"""
+        return {
+            "max_articulos": self.max_articulos,
+            "articulos_en_vuelo": self.articulos_en_vuelo,
+            "en_espera": sum(1 for _, futuro in self._espera if not futuro.done()),
+            "admitidas": self.admitidas,
+            "rechazadas": dict(self.rechazadas)
+        }
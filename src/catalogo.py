@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""
+Índice de búsqueda y persistencia local del catálogo para el Validador TamaPrint.
+
+El snapshot guarda solo lo que necesita el índice, ya normalizado, en dos archivos:
+  - <ruta>       : arreglo estructurado de NumPy (.npy) con una fila por clave
+                   única cliente + artículo, ordenado por cliente y código:
+                   número de cliente (uint32), código de artículo en UTF-8 (bytes
+                   de ancho fijo) y fila del catálogo (uint32).
+  - <ruta>.json  : metadatos (lista de clientes, claves, filas, fecha, y el hash
+                   del contenido y la fecha de modificación en Drive de la versión
+                   guardada, para no volver a descargarla al arrancar).
+
+El arreglo se abre con mmap. Desde él se construye el índice en memoria
+(IndiceCatalogo) o se busca directamente sobre las páginas mapeadas
+(IndiceSnapshot): esas páginas son del caché de archivos del sistema y las
+comparten todos los procesos que abren el mismo snapshot.
+"""
+
+import heapq
+import json
+import logging
+import os
+from datetime import datetime
+
+# numpy se importa dentro de las funciones que lo usan: importar este módulo no
+# debe cargarlo (el arranque del servidor lo difiere hasta cargar el catálogo)
+
+logger = logging.getLogger(__name__)
+
+FORMATO_SNAPSHOT = 3
+
+
+class IndiceCatalogo:
+    """Índice inmutable particionado por cliente: NIT -> {artículo: fila del catálogo}"""
+
+    __slots__ = ('_particiones', '_total', 'filas')
+
+    # Las particiones son dicts en el heap del proceso
+    mapeado = False
+
+    def __init__(self, particiones, filas):
+        self._particiones = particiones
+        self._total = sum(len(p) for p in particiones.values())
+        # Filas del catálogo de origen (incluye claves duplicadas)
+        self.filas = filas
+
+    @classmethod
+    def desde_catalogo(cls, catalogo):
+        """Construir el índice desde las columnas 'Código SN' y 'Nº catálogo SN'"""
+        clientes, codigos = _claves_normalizadas(catalogo)
+        particiones = {}
+        # Recorrido inverso: ante claves duplicadas gana la primera fila
+        for fila in range(len(codigos) - 1, -1, -1):
+            particion = particiones.get(clientes[fila])
+            if particion is None:
+                particion = particiones[clientes[fila]] = {}
+            particion[codigos[fila]] = fila
+        return cls(particiones, len(codigos))
+
+    @classmethod
+    def desde_arreglos(cls, clientes, datos, filas):
+        """Construir el índice desde el arreglo del snapshot sin pasar por pandas"""
+        cortes = _cortes_por_cliente(datos, len(clientes)).tolist()
+        particiones = {}
+        # Las claves del snapshot ya son únicas (la primera fila de cada una)
+        for numero, cliente in enumerate(clientes):
+            inicio, fin = cortes[numero], cortes[numero + 1]
+            if inicio < fin:
+                particiones[cliente] = dict(zip(
+                    (codigo.decode('utf-8') for codigo in datos['codigo'][inicio:fin].tolist()),
+                    datos['fila'][inicio:fin].tolist()
+                ))
+        return cls(particiones, filas)
+
+    def particion(self, cliente):
+        """Artículos del cliente ({código normalizado: fila}) o None si no tiene ninguno"""
+        return self._particiones.get(cliente)
+
+    def buscar(self, cliente, codigo):
+        """Devolver la fila del catálogo para cliente + artículo o None si no existe"""
+        particion = self._particiones.get(cliente)
+        return particion.get(codigo) if particion is not None else None
+
+    def claves_ejemplo(self, n=5):
+        """Primeras n claves 'CLIENTE|artículo' del índice (para diagnóstico)"""
+        claves = (
+            (fila, f"{cliente}|{codigo}")
+            for cliente, particion in self._particiones.items()
+            for codigo, fila in particion.items()
+        )
+        return [clave for _, clave in heapq.nsmallest(n, claves)]
+
+    @property
+    def total_clientes(self):
+        return len(self._particiones)
+
+    def __len__(self):
+        return self._total
+
+
+class ParticionSnapshot:
+    """Artículos de un cliente en el snapshot mapeado: códigos ordenados y su fila"""
+
+    __slots__ = ('_codigos', '_filas')
+
+    def __init__(self, codigos, filas):
+        self._codigos = codigos
+        self._filas = filas
+
+    def _posiciones(self, codigos):
+        """Posición en la partición de cada código (str normalizado) o -1 si no está"""
+        import numpy as np
+        codificados = [codigo.encode('utf-8') for codigo in codigos]
+        posiciones = np.full(len(codificados), -1, dtype=np.int64)
+        # Un código más largo que el ancho del arreglo no puede estar (y NumPy lo truncaría)
+        ancho = self._codigos.dtype.itemsize
+        validos = [i for i, codigo in enumerate(codificados) if len(codigo) <= ancho]
+        if validos and len(self._codigos):
+            buscados = np.array([codificados[i] for i in validos], dtype=self._codigos.dtype)
+            encontrados = np.minimum(np.searchsorted(self._codigos, buscados), len(self._codigos) - 1)
+            coinciden = self._codigos[encontrados] == buscados
+            posiciones[np.asarray(validos)[coinciden]] = encontrados[coinciden]
+        return posiciones
+
+    def faltantes(self, codigos):
+        """Subconjunto de codigos (set de str normalizados) que no están en la partición"""
+        codigos = list(codigos)
+        posiciones = self._posiciones(codigos).tolist()
+        return {codigo for codigo, posicion in zip(codigos, posiciones) if posicion < 0}
+
+    def get(self, codigo, defecto=None):
+        posicion = int(self._posiciones([codigo])[0])
+        return int(self._filas[posicion]) if posicion >= 0 else defecto
+
+    def __contains__(self, codigo):
+        return self._posiciones([codigo])[0] >= 0
+
+    def __iter__(self):
+        return (codigo.decode('utf-8') for codigo in self._codigos.tolist())
+
+    def __len__(self):
+        return len(self._codigos)
+
+
+class IndiceSnapshot:
+    """Índice de solo lectura que busca por bisección sobre el snapshot mapeado en memoria
+
+    No copia las claves al heap: varios procesos con el mismo snapshot (modo
+    multi-worker) comparten sus páginas aunque cada uno publique su propio índice.
+    Misma interfaz que IndiceCatalogo; las particiones son ParticionSnapshot.
+    """
+
+    __slots__ = ('_datos', '_numeros', '_cortes', 'filas')
+
+    mapeado = True
+
+    def __init__(self, clientes, datos, filas):
+        self._datos = datos
+        self._numeros = {cliente: numero for numero, cliente in enumerate(clientes)}
+        self._cortes = _cortes_por_cliente(datos, len(clientes)).tolist()
+        self.filas = filas
+
+    def particion(self, cliente):
+        """Artículos del cliente (ParticionSnapshot) o None si no tiene ninguno"""
+        numero = self._numeros.get(cliente)
+        if numero is None:
+            return None
+        inicio, fin = self._cortes[numero], self._cortes[numero + 1]
+        if inicio == fin:
+            return None
+        return ParticionSnapshot(self._datos['codigo'][inicio:fin], self._datos['fila'][inicio:fin])
+
+    def buscar(self, cliente, codigo):
+        """Devolver la fila del catálogo para cliente + artículo o None si no existe"""
+        particion = self.particion(cliente)
+        return particion.get(codigo) if particion is not None else None
+
+    def claves_ejemplo(self, n=5):
+        """Primeras n claves 'CLIENTE|artículo' del índice (para diagnóstico)"""
+        import numpy as np
+        clientes = list(self._numeros)
+        primeras = np.argsort(self._datos['fila'], kind='stable')[:n]
+        return [
+            f"{clientes[int(self._datos['cliente'][i])]}|{self._datos['codigo'][i].decode('utf-8')}"
+            for i in primeras
+        ]
+
+    @property
+    def total_clientes(self):
+        return sum(1 for inicio, fin in zip(self._cortes, self._cortes[1:]) if inicio < fin)
+
+    def __len__(self):
+        return len(self._datos)
+
+
+def codigos_faltantes(particion, codigos):
+    """Códigos normalizados (set) que no están en la partición de IndiceCatalogo o IndiceSnapshot"""
+    if particion is None:
+        return set(codigos)
+    if type(particion) is dict:
+        return set(codigos).difference(particion)
+    return particion.faltantes(set(codigos))
+
+
+def _cortes_por_cliente(datos, total_clientes):
+    """Inicio de las claves de cada número de cliente en el arreglo ordenado (más el final)"""
+    import numpy as np
+    return np.searchsorted(datos['cliente'], np.arange(total_clientes + 1, dtype=np.uint32))
+
+
+def _claves_normalizadas(catalogo):
+    """Clientes (NIT en mayúsculas) y artículos (en minúsculas) normalizados por fila"""
+    clientes = catalogo['Código SN'].astype(str).str.strip().str.upper().tolist()
+    codigos = catalogo['Nº catálogo SN'].astype(str).str.strip().str.lower().tolist()
+    return clientes, codigos
+
+
+def _ruta_metadatos(ruta):
+    return f"{ruta}.json"
+
+
+def guardar_snapshot(catalogo, ruta: str, huella=None, modificado=None):
+    """Guardar las claves del catálogo (DataFrame) en disco de forma atómica (escritura temporal + replace)
+
+    huella y modificado identifican la versión guardada (hash del contenido descargado y
+    fecha de modificación del libro en Drive); se devuelven con cargar_snapshot.
+    """
+    import numpy as np
+    clientes, codigos = _claves_normalizadas(catalogo)
+    # Codificar clientes como enteros: cada NIT se guarda una sola vez en los metadatos
+    numeros = {}
+    id_cliente = [numeros.setdefault(cliente, len(numeros)) for cliente in clientes]
+    codigos_utf8 = [codigo.encode('utf-8') for codigo in codigos]
+    # Ancho mínimo 1: NumPy no admite campos de bytes de longitud cero
+    ancho = max(1, max(map(len, codigos_utf8), default=0))
+    datos = np.empty(len(codigos), dtype=[('cliente', '<u4'), ('codigo', f'S{ancho}'), ('fila', '<u4')])
+    datos['cliente'] = id_cliente
+    datos['codigo'] = codigos_utf8
+    datos['fila'] = np.arange(len(codigos))
+    # Ordenar por cliente y código (y fila) y quedarse con la primera fila de cada clave:
+    # así se puede buscar por bisección sin construir nada al cargar
+    datos = datos[np.lexsort((datos['fila'], datos['codigo'], datos['cliente']))]
+    if len(datos):
+        unicas = np.ones(len(datos), dtype=bool)
+        unicas[1:] = (datos['cliente'][1:] != datos['cliente'][:-1]) | (datos['codigo'][1:] != datos['codigo'][:-1])
+        datos = datos[unicas]
+
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    os.makedirs(directorio, exist_ok=True)
+
+    tmp_datos = f"{ruta}.tmp"
+    with open(tmp_datos, 'wb') as f:
+        np.save(f, datos, allow_pickle=False)
+    tmp_meta = f"{_ruta_metadatos(ruta)}.tmp"
+    with open(tmp_meta, 'w', encoding='utf-8') as f:
+        json.dump({
+            "formato": FORMATO_SNAPSHOT,
+            "clientes": list(numeros),
+            "claves": len(datos),
+            "filas": len(codigos),
+            "creado": datetime.now().isoformat(),
+            "huella": huella,
+            "modificado": modificado
+        }, f, ensure_ascii=False)
+
+    # Datos primero: si el proceso muere entre ambos replace, los metadatos
+    # viejos no coinciden en claves y cargar_snapshot descarta el snapshot
+    os.replace(tmp_datos, ruta)
+    os.replace(tmp_meta, _ruta_metadatos(ruta))
+    logger.info(f"[SNAPSHOT] Catálogo guardado en {ruta}: {len(codigos)} registros")
+
+
+def cargar_snapshot(ruta: str, con_metadatos=False, mapeado=False):
+    """Cargar el índice del catálogo desde disco; devuelve None si no existe o no es válido
+
+    Con mapeado=True devuelve un IndiceSnapshot que busca sobre el archivo mapeado
+    en vez de copiar las claves a un IndiceCatalogo. Con con_metadatos=True
+    devuelve (índice, metadatos), o (None, {}) si no hay snapshot válido.
+    """
+    if not ruta or not os.path.exists(ruta) or not os.path.exists(_ruta_metadatos(ruta)):
+        return (None, {}) if con_metadatos else None
+    import numpy as np
+    try:
+        with open(_ruta_metadatos(ruta), encoding='utf-8') as f:
+            meta = json.load(f)
+        datos = np.load(ruta, mmap_mode='r', allow_pickle=False)
+        clientes = meta["clientes"]
+        if (meta.get("formato") != FORMATO_SNAPSHOT or len(datos) != meta["claves"]
+                or datos.dtype.names != ('cliente', 'codigo', 'fila')
+                or (len(datos) and int(datos['cliente'][-1]) >= len(clientes))):
+            logger.warning(f"[SNAPSHOT] Snapshot inconsistente en {ruta}, se ignora")
+            return (None, {}) if con_metadatos else None
+        tipo = IndiceSnapshot if mapeado else IndiceCatalogo.desde_arreglos
+        indice = tipo(clientes, datos, meta["filas"])
+        logger.info(
+            f"[SNAPSHOT] Catálogo cargado desde {ruta}: {indice.filas} registros "
+            f"(creado {meta['creado']})"
+        )
+        return (indice, meta) if con_metadatos else indice
+    except Exception as e:
+        logger.warning(f"[SNAPSHOT] No se pudo leer el snapshot {ruta}: {e}")
+        return (None, {}) if con_metadatos else None
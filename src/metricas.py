@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Métricas en memoria con exposición en formato de texto de Prometheus.
+
+Sin dependencias externas: contadores, histogramas y medidores calculados al
+exponer, suficientes para que /metrics se pueda consultar o scrapear en local.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+# Límites (segundos) por defecto de los histogramas de latencia
+BUCKETS_LATENCIA = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _formatear_etiquetas(nombres, valores, extra=()):
+    pares = list(zip(nombres, valores)) + list(extra)
+    if not pares:
+        return ""
+    contenido = ",".join(
+        '{}="{}"'.format(
+            nombre, str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+        for nombre, valor in pares
+    )
+    return "{" + contenido + "}"
+
+
+def _formatear_valor(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Contador:
+    """Contador monótono con etiquetas opcionales"""
+
+    tipo = "counter"
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *valores_etiquetas, cantidad=1):
+        with self._lock:
+            self._valores[valores_etiquetas] = self._valores.get(valores_etiquetas, 0) + cantidad
+
+    def valor(self, *valores_etiquetas):
+        with self._lock:
+            return self._valores.get(valores_etiquetas, 0)
+
+    def muestras(self):
+        with self._lock:
+            valores = sorted(self._valores.items())
+        return [
+            (self.nombre, _formatear_etiquetas(self.etiquetas, clave), valor)
+            for clave, valor in valores
+        ]
+
+
+class Histograma:
+    """Histograma acumulativo (buckets, suma y cantidad) con etiquetas opcionales"""
+
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_LATENCIA):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.buckets = tuple(buckets)
+        # etiquetas -> [cuentas por bucket (+Inf al final), suma, cantidad]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *valores_etiquetas):
+        posicion = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            if serie is None:
+                serie = self._series[valores_etiquetas] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][posicion] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def cantidad(self, *valores_etiquetas):
+        with self._lock:
+            serie = self._series.get(valores_etiquetas)
+            return serie[2] if serie is not None else 0
+
+    def muestras(self):
+        with self._lock:
+            series = sorted((clave, (list(s[0]), s[1], s[2])) for clave, s in self._series.items())
+        resultado = []
+        for clave, (cuentas, suma, cantidad) in series:
+            acumulado = 0
+            for limite, cuenta in zip(self.buckets + (float("inf"),), cuentas):
+                acumulado += cuenta
+                resultado.append((
+                    f"{self.nombre}_bucket",
+                    _formatear_etiquetas(self.etiquetas, clave, [("le", _formatear_valor(limite))]),
+                    acumulado
+                ))
+            resultado.append((f"{self.nombre}_sum", _formatear_etiquetas(self.etiquetas, clave), suma))
+            resultado.append((f"{self.nombre}_count", _formatear_etiquetas(self.etiquetas, clave), cantidad))
+        return resultado
+
+
+class Medidor:
+    """Valor instantáneo calculado al exponer; funcion devuelve un número o {etiquetas: número}"""
+
+    def __init__(self, nombre, ayuda, funcion, etiquetas=(), tipo="gauge"):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.funcion = funcion
+        self.etiquetas = tuple(etiquetas)
+        self.tipo = tipo
+
+    def muestras(self):
+        valor = self.funcion()
+        if valor is None:
+            return []
+        if not isinstance(valor, dict):
+            return [(self.nombre, "", valor)]
+        return [
+            (self.nombre, _formatear_etiquetas(self.etiquetas, clave), v)
+            for clave, v in sorted(valor.items())
+        ]
+
+
+class RegistroMetricas:
+    """Conjunto de métricas expuestas juntas en /metrics"""
+
+    def __init__(self):
+        self._metricas = []
+
+    def _registrar(self, metrica):
+        self._metricas.append(metrica)
+        return metrica
+
+    def contador(self, nombre, ayuda, etiquetas=()):
+        return self._registrar(Contador(nombre, ayuda, etiquetas))
+
+    def histograma(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_LATENCIA):
+        return self._registrar(Histograma(nombre, ayuda, etiquetas, buckets))
+
+    def medidor(self, nombre, ayuda, funcion, etiquetas=(), tipo="gauge"):
+        return self._registrar(Medidor(nombre, ayuda, funcion, etiquetas, tipo))
+
+    def exponer(self):
+        """Todas las métricas en formato de texto de Prometheus (versión 0.0.4)"""
+        lineas = []
+        for metrica in self._metricas:
+            lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+            lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+            for nombre, etiquetas, valor in metrica.muestras():
+                lineas.append(f"{nombre}{etiquetas} {_formatear_valor(valor)}")
+        return "\n".join(lineas) + "\n"
+
+
+def formatear_server_timing(tiempos):
+    """Valor del encabezado Server-Timing para {etapa: segundos} (dur en milisegundos)"""
+    return ", ".join(f"{etapa};dur={segundos * 1000:.3f}" for etapa, segundos in tiempos.items())
+
+
+class MiddlewareMetricas:
+    """Middleware ASGI: cuenta solicitudes y mide su duración completa por endpoint
+
+    Mide hasta el último fragmento del cuerpo, así que también cubre respuestas
+    en streaming. Deja el instante de llegada en scope["state"]["inicio_solicitud"]
+    para que los endpoints midan lo que pasó antes de ejecutarse (lectura y
+    validación del cuerpo).
+
+    Con server_timing=True agrega 'total' (hasta el inicio de la respuesta) al
+    encabezado Server-Timing, conservando las etapas que haya puesto el endpoint.
+    """
+
+    def __init__(self, app, solicitudes, duracion, server_timing=False):
+        self.app = app
+        self.solicitudes = solicitudes
+        self.duracion = duracion
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        inicio = time.perf_counter()
+        scope.setdefault("state", {})["inicio_solicitud"] = inicio
+        estado = {"codigo": 500}
+
+        async def send_medido(mensaje):
+            if mensaje["type"] == "http.response.start":
+                estado["codigo"] = mensaje["status"]
+                if self.server_timing:
+                    mensaje = self._agregar_total(mensaje, time.perf_counter() - inicio)
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, send_medido)
+        finally:
+            # Plantilla de la ruta (no la URL) para acotar la cantidad de series
+            ruta = scope.get("route")
+            endpoint = getattr(ruta, "path", None) or "desconocido"
+            self.solicitudes.inc(endpoint, str(estado["codigo"]))
+            self.duracion.observar(time.perf_counter() - inicio, endpoint)
+
+    @staticmethod
+    def _agregar_total(mensaje, segundos):
+        total = formatear_server_timing({"total": segundos}).encode("latin-1")
+        encabezados = []
+        previo = None
+        for nombre, valor in mensaje.get("headers", []):
+            if nombre.lower() == b"server-timing":
+                previo = valor
+            else:
+                encabezados.append((nombre, valor))
+        encabezados.append((b"server-timing", previo + b", " + total if previo else total))
+        return {**mensaje, "headers": encabezados}
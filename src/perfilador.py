@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Perfilador por muestreo para el proceso en ejecución.
+
+Cada intervalo toma la pila de todos los hilos con sys._current_frames() y
+cuenta pilas iguales. El resultado sale en formato "collapsed stacks" (una línea
+'hilo;raíz;...;hoja N' por pila), que leen directamente flamegraph.pl,
+speedscope e inferno. El costo es proporcional a la frecuencia de muestreo y no
+se instrumenta ninguna función.
+
+Solo corre un perfil a la vez y dura como máximo max_segundos: no puede quedar
+encendido.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class PerfiladorOcupado(Exception):
+    """Ya hay un perfil en curso"""
+
+
+def _colapsar_pila(frame):
+    """Funciones de la pila (raíz primero) como 'funcion (archivo:línea)' y sus nombres"""
+    marcos = []
+    funciones = set()
+    while frame is not None:
+        codigo = frame.f_code
+        marcos.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})")
+        funciones.add(codigo.co_name)
+        frame = frame.f_back
+    marcos.reverse()
+    return ";".join(marcos), funciones
+
+
+class PerfiladorMuestreo:
+    """Perfilador por muestreo con duración máxima y un solo perfil a la vez"""
+
+    def __init__(self, max_segundos=30.0):
+        self.max_segundos = max_segundos
+        self._lock = threading.Lock()
+
+    @property
+    def en_curso(self):
+        return self._lock.locked()
+
+    def perfilar(self, segundos, intervalo=0.005, funciones=None):
+        """Muestrear durante segundos (acotado a max_segundos) y devolver (perfil, muestras)
+
+        Si se pasa funciones (conjunto de nombres), solo se cuentan las pilas que
+        pasan por alguna de ellas.
+        """
+        segundos = min(max(segundos, 0.0), self.max_segundos)
+        if not self._lock.acquire(blocking=False):
+            raise PerfiladorOcupado("Ya hay un perfil en curso")
+        try:
+            propio = threading.get_ident()
+            pilas = Counter()
+            muestras = 0
+            fin = time.monotonic() + segundos
+            while time.monotonic() < fin:
+                nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == propio:
+                        continue
+                    pila, nombres_funciones = _colapsar_pila(frame)
+                    if funciones and funciones.isdisjoint(nombres_funciones):
+                        continue
+                    pilas[f"{nombres.get(ident, ident)};{pila}"] += 1
+                muestras += 1
+                time.sleep(intervalo)
+            perfil = "".join(f"{pila} {cuenta}\n" for pila, cuenta in pilas.most_common())
+            return perfil, muestras
+        finally:
+            self._lock.release()
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Pool acotado de hilos para validar órdenes fuera del event loop de uvicorn.
+
+Las órdenes grandes se resuelven en un hilo del pool mientras el event loop sigue
+atendiendo otras solicitudes. El pool tiene un número fijo de hilos y una cola de
+espera limitada: con el pool y la cola llenos la solicitud se rechaza de inmediato
+(PoolSaturado) en vez de acumular trabajo sin límite.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class PoolSaturado(Exception):
+    """No hay hilo libre ni lugar en la cola de espera del pool"""
+
+
+class PoolValidacion:
+    """Hilos de validación con límite de trabajos en espera"""
+
+    def __init__(self, workers, cola_max):
+        self.workers = workers
+        self.cola_max = cola_max
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="validacion")
+        # Trabajos aceptados que no han terminado (en ejecución + en cola)
+        self._pendientes = 0
+        self._lock = threading.Lock()
+        self.completadas = 0
+        self.rechazadas = 0
+
+    def _terminar(self, _futuro):
+        # Se llama desde el hilo que terminó el trabajo, aunque el cliente ya no espere
+        with self._lock:
+            self._pendientes -= 1
+            self.completadas += 1
+
+    async def ejecutar(self, funcion, *args):
+        """Ejecutar funcion(*args) en el pool; PoolSaturado si el pool y la cola están llenos"""
+        with self._lock:
+            if self._pendientes >= self.workers + self.cola_max:
+                self.rechazadas += 1
+                raise PoolSaturado(
+                    f"Pool de validación saturado ({self.workers} hilos, {self.cola_max} en cola)"
+                )
+            self._pendientes += 1
+        futuro = self._executor.submit(funcion, *args)
+        futuro.add_done_callback(self._terminar)
+        return await asyncio.wrap_future(futuro)
+
+    def stats(self):
+        """Estado actual del pool"""
+        with self._lock:
+            pendientes = self._pendientes
+            return {
+                "workers": self.workers,
+                "cola_max": self.cola_max,
+                "en_ejecucion": min(pendientes, self.workers),
+                "en_cola": max(0, pendientes - self.workers),
+                "completadas": self.completadas,
+                "rechazadas": self.rechazadas
+            }
+
+    def cerrar(self):
+        """Detener el pool sin esperar los trabajos en curso"""
+        self._executor.shutdown(wait=False)
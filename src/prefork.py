@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Modo multi-worker (prefork) para run.py --workers N.
+
+El proceso principal carga el catálogo una sola vez y crea los workers con fork.
+El índice que publican los workers es un IndiceSnapshot: busca por bisección
+sobre el snapshot (CATALOGO_SNAPSHOT_PATH) mapeado con mmap, así que sus páginas
+son del caché de archivos y las comparten todos los workers en lugar de que cada
+uno tenga su copia, también después de cada recarga. El proceso principal no
+atiende solicitudes; tras una recarga conserva solo el índice de su descarga.
+
+El refresco desde Google Sheets al arrancar termina antes de hacer fork: ningún
+hilo de fondo queda a mitad de una descarga (o con un lock tomado) al copiar el
+proceso, y los workers no vuelven a publicar un catálogo recién arrancado. Lo que
+quede en el heap al hacer fork se congela con gc.freeze() para que el recolector
+de ciclos no escriba en esas páginas compartidas por copy-on-write.
+
+Solo el proceso principal consulta Google Sheets: su hilo de recarga descarga el
+catálogo y reescribe el snapshot cuando cambia; cada worker vigila ese archivo y
+mapea la versión nueva sin pandas ni red.
+
+Requiere os.fork (Linux o macOS). El puerto se abre cuando el catálogo ya está
+cargado.
+"""
+
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Cada cuántos segundos un worker revisa si hay un snapshot nuevo
+INTERVALO_SNAPSHOT = 5.0
+
+
+def _crear_socket(host, port):
+    """Socket de escucha compartido por todos los workers"""
+    familia = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(familia, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _marca_snapshot(ruta):
+    """Fecha de modificación de los metadatos del snapshot (se reemplazan al final de cada escritura)"""
+    try:
+        return os.stat(f"{ruta}.json").st_mtime_ns
+    except OSError:
+        return None
+
+
+def _seguir_snapshot(modulo, intervalo):
+    """Hilo del worker: publicar el índice cada vez que el proceso principal reescribe el snapshot"""
+    ruta = modulo.CATALOGO_SNAPSHOT_PATH
+    ultima = _marca_snapshot(ruta)
+    while True:
+        time.sleep(intervalo)
+        marca = _marca_snapshot(ruta)
+        if marca is not None and marca != ultima and modulo.validador.recargar_desde_snapshot():
+            ultima = marca
+
+
+def _servir_worker(modulo, sock, log_level, intervalo_snapshot):
+    """Código del proceso hijo tras fork: servir hasta recibir SIGTERM o SIGINT"""
+    import uvicorn
+    # Los manejadores del proceso principal no aplican al worker; uvicorn instala los suyos
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    gc.enable()
+    threading.Thread(
+        target=_seguir_snapshot, args=(modulo, intervalo_snapshot),
+        name="seguimiento-snapshot", daemon=True
+    ).start()
+    config = uvicorn.Config(modulo.app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+    return 0
+
+
+def servir_prefork(host, port, workers, log_level="info", intervalo_snapshot=INTERVALO_SNAPSHOT):
+    """Cargar el catálogo, crear workers workers con fork y supervisarlos
+
+    En el proceso principal vuelve cuando todos los workers terminaron; en cada
+    worker vuelve cuando su servidor se detiene. Devuelve el código de salida.
+    """
+    if not hasattr(os, 'fork'):
+        raise RuntimeError("--workers requiere os.fork (Linux o macOS)")
+
+    # Sin recolección durante la carga: los objetos del catálogo no se mueven entre
+    # generaciones y quedan juntos para gc.freeze()
+    gc.disable()
+    import src.validador as modulo
+    directorio_temporal = None
+    if not modulo.CATALOGO_SNAPSHOT_PATH:
+        # Los workers reciben las recargas por el snapshot: hace falta una ruta aunque no se configure
+        directorio_temporal = tempfile.mkdtemp(prefix="validador-")
+        modulo.CATALOGO_SNAPSHOT_PATH = os.path.join(directorio_temporal, "catalogo.npy")
+    logger.info(f"[PREFORK] Cargando catálogo una vez para {workers} workers...")
+    modulo.arranque.cargar(recarga_automatica=False, refresco_en_segundo_plano=False, indice_mapeado=True)
+    if not modulo.validador.indice_catalogo.mapeado:
+        # Se descargó de Sheets (sin snapshot previo o con cambios): pasar al snapshot recién escrito
+        if not modulo.validador.recargar_desde_snapshot():
+            logger.warning(
+                "[PREFORK] No se pudo mapear el snapshot: los workers comparten el índice "
+                "por copy-on-write hasta la próxima recarga"
+            )
+    sock = _crear_socket(host, port)
+
+    hijos = set()
+    deteniendo = False
+
+    def _lanzar():
+        # Lo que exista al hacer fork queda fuera del recolector y se comparte sin copias
+        gc.freeze()
+        pid = os.fork()
+        if pid == 0:
+            return True
+        hijos.add(pid)
+        logger.info(f"[PREFORK] Worker {pid} iniciado")
+        return False
+
+    def _detener(signum, _frame):
+        nonlocal deteniendo
+        deteniendo = True
+        for pid in list(hijos):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    # Antes de crear workers: una señal a mitad del arranque también los detiene
+    signal.signal(signal.SIGTERM, _detener)
+    signal.signal(signal.SIGINT, _detener)
+    for _ in range(workers):
+        if _lanzar():
+            return _servir_worker(modulo, sock, log_level, intervalo_snapshot)
+    gc.enable()
+    # Único proceso que consulta Sheets; los workers toman cada recarga del snapshot
+    modulo.validador.iniciar_recarga_automatica(modulo.CATALOGO_RECARGA_SEGUNDOS)
+    logger.info(f"[PREFORK] {workers} workers escuchando en {host}:{port}")
+
+    while hijos:
+        try:
+            pid, estado = os.wait()
+        except ChildProcessError:
+            break
+        hijos.discard(pid)
+        if deteniendo:
+            continue
+        logger.warning(
+            f"[PREFORK] Worker {pid} terminó inesperadamente (código {os.waitstatus_to_exitcode(estado)}), "
+            "se reemplaza"
+        )
+        if _lanzar():
+            return _servir_worker(modulo, sock, log_level, intervalo_snapshot)
+
+    modulo.validador.detener_recarga_automatica()
+    sock.close()
+    if directorio_temporal is not None:
+        shutil.rmtree(directorio_temporal, ignore_errors=True)
+    logger.info("[PREFORK] Todos los workers terminaron")
+    return 0
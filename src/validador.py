@@ -1,21 +1,35 @@
 # -*- coding: utf-8 -*-
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, FastAPI, HTTPException, Request, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, validator
-import pandas as pd
 import json
 from datetime import datetime
 import os
 from dotenv import load_dotenv
-import gspread
-from google.oauth2.service_account import Credentials
 from typing import List, Dict, Any
 import logging
+import atexit
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+import hashlib
+import hmac
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from functools import lru_cache
+from operator import itemgetter
 from datetime import datetime, timedelta
 import time
 
+from src.catalogo import IndiceCatalogo, guardar_snapshot, cargar_snapshot, codigos_faltantes
+from src.pool_validacion import PoolValidacion, PoolSaturado
+from src.metricas import RegistroMetricas, MiddlewareMetricas, formatear_server_timing
+from src.perfilador import PerfiladorMuestreo, PerfiladorOcupado
+from src.vuelo_unico import VueloUnico
+from src.admision import ControlAdmision, AdmisionRechazada
+
 # Configurar encoding UTF-8 para Windows
 if sys.platform.startswith('win'):
     import codecs
@@ -25,16 +39,45 @@ if sys.platform.startswith('win'):
     if hasattr(sys.stderr, 'buffer'):
         sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
+# Cargar variables de entorno (antes del logging: LOG_LEVEL puede venir del .env)
+load_dotenv()
+
 # Configuración de logging estructurado
 def setup_logging():
-    """Configurar logging estructurado con formato personalizado"""
+    """Configurar logging estructurado con escritura en segundo plano
+    
+    Las solicitudes solo encolan el registro; un QueueListener en su propio hilo
+    lo escribe en consola y en validador.log.
+    """
+    formato = logging.Formatter('%(asctime)s | %(levelname)s | %(name)s | %(message)s')
+    handlers = [
+        logging.StreamHandler(sys.stdout),
+        logging.FileHandler('validador.log', encoding='utf-8')
+    ]
+    for handler in handlers:
+        handler.setFormatter(formato)
+    cola = queue.SimpleQueue()
+    listener = QueueListener(cola, *handlers, respect_handler_level=True)
+    listener.start()
+    # Vaciar la cola al terminar el proceso
+    atexit.register(listener.stop)
+    if hasattr(os, 'register_at_fork'):
+        def _reiniciar_tras_fork():
+            # Lo que quedó en la cola al hacer fork lo escribe el proceso principal
+            while True:
+                try:
+                    cola.get_nowait()
+                except queue.Empty:
+                    break
+            listener.start()
+        # Los hilos no sobreviven a fork: cada worker de run.py --workers arranca su listener
+        os.register_at_fork(after_in_child=_reiniciar_tras_fork)
+    # El QueueHandler solo resuelve el mensaje; el formato completo lo aplican los handlers
+    handler_cola = QueueHandler(cola)
+    handler_cola.setFormatter(logging.Formatter('%(message)s'))
     logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s | %(levelname)s | %(name)s | %(message)s',
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            logging.FileHandler('validador.log', encoding='utf-8')
-        ]
+        level=os.getenv('LOG_LEVEL', 'INFO').upper(),
+        handlers=[handler_cola]
     )
     return logging.getLogger(__name__)
 
@@ -42,85 +85,342 @@ def setup_logging():
 logger = setup_logging()
 
 class CacheManager:
-    """Gestor de cache para mejorar performance"""
+    """Gestor de cache LRU con expiración por inactividad; get/set/evict en O(1)
+    
+    Cada entrada queda marcada con la generación vigente al guardarla (la versión
+    del catálogo). nueva_generacion invalida todo el cache en O(1): las entradas
+    de generaciones anteriores se descartan al consultarlas o al purgar.
     
-    def __init__(self, max_size=1000, ttl_seconds=3600):
-        self.cache = {}
+    Además del límite de entradas, max_peso acota la suma de los pesos de las
+    entradas (p. ej. artículos por orden): una entrada más pesada que max_peso
+    no se guarda.
+    """
+    
+    def __init__(self, max_size=1000, ttl_seconds=3600, max_peso=None):
+        # clave -> (valor, último acceso, clase, generación, peso);
+        # el orden va del acceso más antiguo al más reciente
+        self.cache = OrderedDict()
+        self.generacion = 0
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
-        self.access_times = {}
-        logger.info(f"[CACHE] Inicializado: max_size={max_size}, ttl={ttl_seconds}s")
+        self.max_peso = max_peso
+        self.peso_total = 0
+        self._lock = threading.Lock()
+        # Contadores acumulados desde el arranque
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.inserts = 0
+        self.invalidations = 0
+        self.omitidas = 0
+        self._tiempo_lookup_total = 0.0
+        # Desglose por clase de entrada (p. ej. positiva / negativa)
+        self._por_clase = {}
+        logger.info(f"[CACHE] Inicializado: max_size={max_size}, max_peso={max_peso}, ttl={ttl_seconds}s")
+    
+    def _contadores_clase(self, clase):
+        contadores = self._por_clase.get(clase)
+        if contadores is None:
+            contadores = self._por_clase[clase] = {"entradas": 0, "hits": 0, "inserts": 0}
+        return contadores
     
     def get(self, key):
         """Obtener valor del cache"""
-        if key in self.cache:
-            # Verificar TTL
-            if time.time() - self.access_times[key] > self.ttl_seconds:
-                logger.debug(f"[CACHE] Expirado para: {key}")
-                del self.cache[key]
-                del self.access_times[key]
-                return None
-            
-            # Actualizar tiempo de acceso
-            self.access_times[key] = time.time()
-            logger.debug(f"[CACHE] Hit para: {key}")
-            return self.cache[key]
-        
-        logger.debug(f"Cache miss para: {key}")
-        return None
+        inicio = time.perf_counter()
+        ahora = time.monotonic()
+        with self._lock:
+            try:
+                entrada = self.cache.get(key)
+                if entrada is None:
+                    self.misses += 1
+                    logger.debug("Cache miss para: %s", key)
+                    return None
+                
+                # Verificar generación y TTL
+                valor, ultimo_acceso, clase, generacion, peso = entrada
+                if generacion != self.generacion or ahora - ultimo_acceso > self.ttl_seconds:
+                    logger.debug("[CACHE] Expirado para: %s", key)
+                    del self.cache[key]
+                    self._por_clase[clase]["entradas"] -= 1
+                    self.peso_total -= peso
+                    if generacion != self.generacion:
+                        self.invalidations += 1
+                    else:
+                        self.expirations += 1
+                    self.misses += 1
+                    return None
+                
+                # Actualizar tiempo de acceso y mover al final (más reciente)
+                self.cache[key] = (valor, ahora, clase, generacion, peso)
+                self.cache.move_to_end(key)
+                self.hits += 1
+                self._por_clase[clase]["hits"] += 1
+                logger.debug("[CACHE] Hit para: %s", key)
+                return valor
+            finally:
+                self._tiempo_lookup_total += time.perf_counter() - inicio
     
-    def set(self, key, value):
-        """Guardar valor en cache"""
-        # Limpiar cache si está lleno (LRU)
-        if len(self.cache) >= self.max_size:
-            self._cleanup_oldest()
+    def set(self, key, value, clase="general", peso=1):
+        """Guardar valor en cache; clase agrupa las entradas en las estadísticas
         
-        self.cache[key] = value
-        self.access_times[key] = time.time()
-        logger.debug(f"Cache set para: {key}")
+        peso cuenta contra max_peso (p. ej. artículos de la orden guardada).
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            if self.max_peso is not None and peso > self.max_peso:
+                # Ocuparía todo el cache: no se guarda ni desplaza a las demás
+                self.omitidas += 1
+                logger.debug("Cache omitido para: %s (peso %s)", key, peso)
+                return
+            anterior = self.cache.get(key)
+            if anterior is not None:
+                self._por_clase[anterior[2]]["entradas"] -= 1
+                self.peso_total -= anterior[4]
+                self.cache.move_to_end(key)
+            self.cache[key] = (value, ahora, clase, self.generacion, peso)
+            self.peso_total += peso
+            contadores = self._contadores_clase(clase)
+            contadores["entradas"] += 1
+            contadores["inserts"] += 1
+            self.inserts += 1
+            self._purgar_expirados(ahora)
+            # Limpiar cache si está lleno (LRU): la primera entrada es la menos usada
+            while len(self.cache) > self.max_size or (
+                self.max_peso is not None and self.peso_total > self.max_peso
+            ):
+                clave_antigua, (_, _, clase_antigua, _, peso_antiguo) = self.cache.popitem(last=False)
+                self._por_clase[clase_antigua]["entradas"] -= 1
+                self.peso_total -= peso_antiguo
+                self.evictions += 1
+                logger.debug("Cache cleanup: eliminado %s", clave_antigua)
+        logger.debug("Cache set para: %s", key)
     
-    def _cleanup_oldest(self):
-        """Limpiar entradas más antiguas del cache"""
-        if not self.access_times:
-            return
-        
-        oldest_key = min(self.access_times.keys(), key=lambda k: self.access_times[k])
-        del self.cache[oldest_key]
-        del self.access_times[oldest_key]
-        logger.debug(f"Cache cleanup: eliminado {oldest_key}")
+    def _purgar_expirados(self, ahora):
+        """Eliminar entradas expiradas o invalidadas desde el frente sin recorrer todo el cache"""
+        # El TTL cuenta desde el último acceso y el orden es por último acceso. Toda
+        # entrada tocada después de un cambio de generación es de la generación nueva,
+        # así que las de generaciones viejas también quedan al frente: al encontrar la
+        # primera entrada vigente, todas las siguientes también lo son
+        while self.cache:
+            _, ultimo_acceso, clase, generacion, peso = next(iter(self.cache.values()))
+            if generacion == self.generacion and ahora - ultimo_acceso <= self.ttl_seconds:
+                break
+            self.cache.popitem(last=False)
+            self._por_clase[clase]["entradas"] -= 1
+            self.peso_total -= peso
+            if generacion != self.generacion:
+                self.invalidations += 1
+            else:
+                self.expirations += 1
+    
+    def nueva_generacion(self, generacion):
+        """Invalidar todas las entradas actuales en O(1) (p. ej. al publicar un catálogo nuevo)"""
+        with self._lock:
+            if generacion != self.generacion:
+                self.generacion = generacion
+                logger.info("[CACHE] Generación %s: entradas anteriores invalidadas", generacion)
     
     def clear(self):
-        """Limpiar todo el cache"""
-        self.cache.clear()
-        self.access_times.clear()
+        """Limpiar todo el cache (los contadores acumulados se conservan)"""
+        with self._lock:
+            self.cache.clear()
+            self.peso_total = 0
+            for contadores in self._por_clase.values():
+                contadores["entradas"] = 0
         logger.info("🧹 Cache limpiado")
     
     def stats(self):
         """Obtener estadísticas del cache"""
-        return {
-            "size": len(self.cache),
-            "max_size": self.max_size,
-            "ttl_seconds": self.ttl_seconds,
-            "hit_rate": self._calculate_hit_rate()
-        }
-    
-    def _calculate_hit_rate(self):
-        """Calcular tasa de aciertos (simplificado)"""
-        # En una implementación real, contaríamos hits/misses
-        return len(self.cache) / self.max_size if self.max_size > 0 else 0
-
-# Inicializar cache global
-cache_manager = CacheManager()
-
-# Cargar variables de entorno
-load_dotenv()
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "size": len(self.cache),
+                "max_size": self.max_size,
+                "peso_total": self.peso_total,
+                "max_peso": self.max_peso,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": self.hits / consultas if consultas else 0.0,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "inserts": self.inserts,
+                "invalidations": self.invalidations,
+                "omitidas": self.omitidas,
+                "generacion": self.generacion,
+                "avg_lookup_us": (
+                    self._tiempo_lookup_total / consultas * 1e6 if consultas else 0.0
+                ),
+                "por_clase": {clase: dict(c) for clase, c in self._por_clase.items()}
+            }
 
 # Variables de entorno
 GOOGLE_DRIVE_FILE_ID = os.getenv('GOOGLE_DRIVE_FILE_ID')
 GOOGLE_SHEET_RANGE = os.getenv('GOOGLE_SHEET_RANGE')
 GOOGLE_APPLICATION_CREDENTIALS = os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+# Tamaño y expiración del cache
+CACHE_MAX_SIZE = int(os.getenv('CACHE_MAX_SIZE', '1000'))
+CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', '3600'))
+# Artículos guardados en el cache sumando todas las órdenes (acota su memoria: ~0,3 KB por artículo)
+CACHE_MAX_ARTICULOS = int(os.getenv('CACHE_MAX_ARTICULOS', '100000'))
+# Intervalo de recarga automática del catálogo en segundos (0 = deshabilitada)
+CATALOGO_RECARGA_SEGUNDOS = int(os.getenv('CATALOGO_RECARGA_SEGUNDOS', '300'))
+# Ruta del snapshot local del catálogo para arranque rápido (vacío = deshabilitado)
+CATALOGO_SNAPSHOT_PATH = os.getenv('CATALOGO_SNAPSHOT_PATH', '')
+# Máximo de órdenes aceptadas por solicitud en /validar-ordenes
+VALIDAR_ORDENES_MAX = int(os.getenv('VALIDAR_ORDENES_MAX', '5000'))
+# Máximo de artículos sumando todas las órdenes de una solicitud en /validar-ordenes
+VALIDAR_ORDENES_MAX_ARTICULOS = int(os.getenv('VALIDAR_ORDENES_MAX_ARTICULOS', '200000'))
+# Órdenes que se validan juntas al procesar un stream NDJSON
+STREAM_LOTE = int(os.getenv('STREAM_LOTE', '100'))
+# Tamaño máximo de una línea NDJSON (una orden) en bytes
+STREAM_LINEA_MAX_BYTES = int(os.getenv('STREAM_LINEA_MAX_BYTES', str(1024 * 1024)))
+# Hilos que validan órdenes de /validar-orden fuera del event loop
+VALIDAR_ORDEN_WORKERS = int(os.getenv('VALIDAR_ORDEN_WORKERS', '4'))
+# Órdenes que pueden esperar hilo libre; con la cola llena se responde 503
+VALIDAR_ORDEN_COLA_MAX = int(os.getenv('VALIDAR_ORDEN_COLA_MAX', '76'))
+# Segundos sugeridos al cliente (Retry-After) con el pool saturado o la admisión rechazada
+VALIDAR_ORDEN_RETRY_AFTER = int(os.getenv('VALIDAR_ORDEN_RETRY_AFTER', '1'))
+# Artículos que /validar-orden procesa a la vez, sumando todas las órdenes admitidas
+ADMISION_MAX_ARTICULOS = int(os.getenv('ADMISION_MAX_ARTICULOS', '20000'))
+# Espera máxima de una orden por lugar antes de rechazarla con 429, en milisegundos
+ADMISION_ESPERA_MAX_MS = float(os.getenv('ADMISION_ESPERA_MAX_MS', '250'))
+# Órdenes que pueden esperar lugar a la vez; con la cola llena se rechaza de inmediato
+ADMISION_COLA_MAX = int(os.getenv('ADMISION_COLA_MAX', '100'))
+# Agregar encabezados Server-Timing con el desglose por etapa (1 = habilitado)
+SERVER_TIMING = os.getenv('SERVER_TIMING', '0') == '1'
+# Token para los endpoints /admin/* (vacío = deshabilitados)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+# Duración máxima de un perfil de /admin/perfil en segundos
+PERFILADOR_MAX_SEGUNDOS = float(os.getenv('PERFILADOR_MAX_SEGUNDOS', '30'))
+# Espera antes del primer reintento de carga del catálogo al arrancar (se duplica en cada fallo)
+ARRANQUE_REINTENTO_INICIAL = float(os.getenv('ARRANQUE_REINTENTO_INICIAL', '1'))
+# Espera máxima entre reintentos de carga del catálogo al arrancar
+ARRANQUE_REINTENTO_MAXIMO = float(os.getenv('ARRANQUE_REINTENTO_MAXIMO', '60'))
+# Segundos sugeridos al cliente (Retry-After) mientras el catálogo se carga
+ARRANQUE_RETRY_AFTER = int(os.getenv('ARRANQUE_RETRY_AFTER', '5'))
+
+# Inicializar cache global
+cache_manager = CacheManager(
+    max_size=CACHE_MAX_SIZE, ttl_seconds=CACHE_TTL_SECONDS, max_peso=CACHE_MAX_ARTICULOS
+)
+
+# Órdenes idénticas de /validar-orden en curso al mismo tiempo comparten un solo cálculo
+ordenes_en_curso = VueloUnico()
 
-app = FastAPI(title="Validador Tamaprint", version="1.0.0")
+# Admisión de /validar-orden por artículos en vuelo, antes del pool
+control_admision = ControlAdmision(
+    max_articulos=ADMISION_MAX_ARTICULOS,
+    espera_max=ADMISION_ESPERA_MAX_MS / 1000,
+    cola_max=ADMISION_COLA_MAX
+)
+
+# Pool de validación de órdenes individuales
+pool_validacion = PoolValidacion(workers=VALIDAR_ORDEN_WORKERS, cola_max=VALIDAR_ORDEN_COLA_MAX)
+
+# Perfilador por muestreo de /admin/perfil
+perfilador = PerfiladorMuestreo(max_segundos=PERFILADOR_MAX_SEGUNDOS)
+# Por defecto el perfil solo cuenta pilas de validación y recarga del catálogo
+FUNCIONES_PERFIL = {"validar_orden", "validar_ordenes", "recargar_catalogo"}
+
+# Métricas expuestas en /metrics (los medidores se calculan al exponer)
+metricas = RegistroMetricas()
+metrica_solicitudes = metricas.contador(
+    "validador_solicitudes_total", "Solicitudes HTTP atendidas", ("endpoint", "codigo")
+)
+metrica_duracion = metricas.histograma(
+    "validador_solicitud_segundos", "Duración de la solicitud hasta el último byte", ("endpoint",)
+)
+metrica_etapas = metricas.histograma(
+    "validador_etapa_segundos",
+    "Duración por etapa de /validar-orden (parse, dict, clave, coalesce, admision, cache, lookup, build, serialize)",
+    ("etapa",)
+)
+metrica_recarga = metricas.histograma(
+    "validador_recarga_catalogo_segundos", "Duración de las recargas exitosas del catálogo",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+)
+metrica_recargas = metricas.contador(
+    "validador_recargas_catalogo_total",
+    "Recargas del catálogo por resultado (ok, sin_cambios, error)", ("resultado",)
+)
+metrica_verificacion = metricas.histograma(
+    "validador_verificacion_catalogo_segundos",
+    "Duración de la consulta de la fecha de modificación del catálogo en Drive"
+)
+metricas.medidor(
+    "validador_listo", "1 si el catálogo está cargado y el servicio acepta validaciones",
+    lambda: 1 if validador is not None else 0
+)
+metricas.medidor(
+    "validador_arranque_intentos", "Intentos de carga del catálogo al arrancar",
+    lambda: arranque.intentos
+)
+metricas.medidor(
+    "validador_catalogo_registros", "Filas del catálogo publicado",
+    lambda: validador.total_registros if validador is not None else None
+)
+metricas.medidor(
+    "validador_catalogo_version", "Versión del catálogo publicado",
+    lambda: validador.version_catalogo if validador is not None else None
+)
+metricas.medidor(
+    "validador_catalogo_edad_segundos", "Segundos desde la última publicación del catálogo",
+    lambda: (
+        (datetime.now() - validador.ultima_recarga).total_seconds()
+        if validador is not None and validador.ultima_recarga is not None else None
+    )
+)
+metricas.medidor(
+    "validador_cache_entradas", "Entradas en el cache de resultados", lambda: len(cache_manager.cache)
+)
+metricas.medidor(
+    "validador_cache_eventos_total", "Eventos acumulados del cache de resultados",
+    lambda: {
+        (evento,): valor for evento, valor in cache_manager.stats().items()
+        if evento in ("hits", "misses", "inserts", "evictions", "expirations", "invalidations", "omitidas")
+    },
+    etiquetas=("evento",), tipo="counter"
+)
+metrica_espera_admision = metricas.histograma(
+    "validador_admision_espera_segundos", "Espera de las órdenes admitidas en /validar-orden"
+)
+metricas.medidor(
+    "validador_admision_rechazadas_total", "Órdenes rechazadas por el control de admisión por motivo",
+    lambda: {(motivo,): valor for motivo, valor in control_admision.rechazadas.items()},
+    etiquetas=("motivo",), tipo="counter"
+)
+metricas.medidor(
+    "validador_admision_articulos_en_vuelo", "Artículos de órdenes admitidas sin terminar",
+    lambda: control_admision.articulos_en_vuelo
+)
+metricas.medidor(
+    "validador_admision_en_espera", "Órdenes esperando lugar en el control de admisión",
+    lambda: control_admision.stats()["en_espera"]
+)
+metricas.medidor(
+    "validador_ordenes_coalescidas_total",
+    "Validaciones de /validar-orden por rol: calculadas (lider) o compartidas de una idéntica en curso",
+    lambda: {
+        ("lider",): ordenes_en_curso.lideres, ("compartida",): ordenes_en_curso.compartidas
+    },
+    etiquetas=("rol",), tipo="counter"
+)
+metricas.medidor(
+    "validador_pool_pendientes", "Órdenes aceptadas por el pool de validación sin terminar",
+    lambda: {
+        (estado,): pool_validacion.stats()[estado] for estado in ("en_ejecucion", "en_cola")
+    },
+    etiquetas=("estado",)
+)
+metricas.medidor(
+    "validador_pool_rechazadas_total", "Órdenes rechazadas con el pool saturado",
+    lambda: pool_validacion.stats()["rechazadas"], tipo="counter"
+)
+
+# Endpoints; la aplicación se arma en crear_app
+router = APIRouter()
 
 class ItemModel(BaseModel):
     codigo: str
@@ -162,9 +462,56 @@ class OrdenModel(BaseModel):
             raise ValueError('La orden debe tener al menos un artículo')
         return v
 
+# Columnas de la hoja que usa el índice; son las únicas que se descargan
+COLUMNAS_CATALOGO = ['Código SN', 'Nº catálogo SN']
+
+def _limites_rango(rango_a1):
+    """(fila inicial, fila final, columna inicial, columna final) de un rango A1, base 1
+    
+    Los límites abiertos (p. ej. 'A:Z' no fija filas) se devuelven como None.
+    """
+    from gspread.utils import a1_range_to_grid_range
+    grilla = a1_range_to_grid_range(rango_a1)
+    return (
+        grilla.get('startRowIndex', 0) + 1, grilla.get('endRowIndex'),
+        grilla.get('startColumnIndex', 0) + 1, grilla.get('endColumnIndex')
+    )
+
+def _letra_columna(numero):
+    """Letra A1 de la columna numero (base 1): 1 -> 'A', 27 -> 'AA'"""
+    from gspread.utils import rowcol_to_a1
+    return rowcol_to_a1(1, numero)[:-1]
+
+# Campos de cada artículo que se repiten en la respuesta (y por eso forman la clave de cache)
+_CAMPOS_ITEM = itemgetter(
+    'codigo', 'descripcion', 'cantidad', 'precio_unitario', 'precio_total', 'fecha_entrega'
+)
+
 class ValidadorOrdenesCompra:
-    def __init__(self):
+    def __init__(self, refresco_en_segundo_plano=True, indice_mapeado=False):
+        """Cargar el catálogo (desde el snapshot si existe, o desde Google Sheets)
+        
+        Con refresco_en_segundo_plano=False el refresco desde Sheets tras arrancar del
+        snapshot termina antes de volver. Con indice_mapeado=True los índices que se
+        cargan del snapshot buscan sobre el archivo mapeado (IndiceSnapshot) en vez de
+        copiarse al heap.
+        """
         logger.info("[INIT] Iniciando ValidadorOrdenesCompra...")
+        self.indice_mapeado = indice_mapeado
+        # Estado publicado (catálogo, índice, versión); se reemplaza completo en cada recarga
+        self._estado = None
+        self.ultima_recarga = None
+        # Señales de cambio del catálogo publicado: fecha de modificación en Drive y hash del contenido
+        self._modificado_catalogo = None
+        self._huella_catalogo = None
+        self.ultima_verificacion = None
+        # Cliente de gspread autorizado; se reutiliza entre recargas y se descarta si una falla
+        self._cliente_gspread = None
+        # Números de columna de COLUMNAS_CATALOGO en la hoja; se ubican una vez y se verifican en cada descarga
+        self._columnas_hoja = None
+        self._lock_recarga = threading.Lock()
+        self._detener_recarga = threading.Event()
+        self._hilo_recarga = None
         try:
             # Validar variables de entorno
             logger.info("[SETUP] Validando variables de entorno...")
@@ -182,198 +529,634 @@ class ValidadorOrdenesCompra:
                 raise FileNotFoundError(f"Archivo de credenciales no encontrado: {GOOGLE_APPLICATION_CREDENTIALS}")
             logger.info("[AUTH] Archivo de credenciales encontrado")
             
-            # Configurar Google Sheets
-            logger.info("[GSHEETS] Conectando con Google Sheets...")
-            scopes = [
-                'https://www.googleapis.com/auth/spreadsheets',
-                'https://www.googleapis.com/auth/drive'
-            ]
-            credentials = Credentials.from_service_account_file(
-                GOOGLE_APPLICATION_CREDENTIALS,
-                scopes=scopes
+            # Arrancar desde el último snapshot válido y refrescar desde Sheets en segundo plano
+            # El snapshot solo trae el índice: el DataFrame completo llega con el refresco
+            indice_catalogo, meta = cargar_snapshot(
+                CATALOGO_SNAPSHOT_PATH, con_metadatos=True, mapeado=indice_mapeado
             )
-            gc = gspread.authorize(credentials)
-            sh = gc.open_by_key(GOOGLE_DRIVE_FILE_ID)
-            logger.info("[GSHEETS] Conexión establecida")
-            
-            # Obtener datos de la hoja
-            logger.info(f"[DATA] Cargando datos del rango: {GOOGLE_SHEET_RANGE}")
-            if '!' in GOOGLE_SHEET_RANGE:
-                sheet_name, sheet_range = GOOGLE_SHEET_RANGE.split('!')
+            if indice_catalogo is not None:
+                self._publicar_catalogo(None, indice_catalogo)
+                # Versión del snapshot: si Drive no informa cambios, el refresco no descarga ni publica
+                self._modificado_catalogo = meta.get("modificado")
+                self._huella_catalogo = meta.get("huella")
+                if refresco_en_segundo_plano:
+                    threading.Thread(
+                        target=self.recargar_catalogo, name="recarga-inicial", daemon=True
+                    ).start()
+                else:
+                    self.recargar_catalogo()
             else:
-                sheet_name = 'Hoja1'
-                sheet_range = GOOGLE_SHEET_RANGE
-                
-            worksheet = sh.worksheet(sheet_name)
-            data = worksheet.get(sheet_range)
+                modificado = self._fecha_modificacion()
+                catalogo, huella = self._descargar_catalogo()
+                self._publicar_catalogo(*self._construir_indice(catalogo))
+                self._modificado_catalogo, self._huella_catalogo = modificado, huella
+                self._guardar_snapshot(catalogo)
             
-            if not data or len(data) < 2:
-                raise ValueError("El catálogo está vacío o no tiene datos válidos")
-                
-            headers = data[0]
-            rows = data[1:]
-            self.catalogo = pd.DataFrame(rows, columns=headers)
-            logger.info(f"[DATA] Datos cargados: {len(rows)} filas, {len(headers)} columnas")
-            
-            # Verificar columnas requeridas
-            logger.info("[VALIDATE] Verificando columnas requeridas...")
-            required_columns = ['Código SN', 'Nº catálogo SN']
-            missing_columns = [col for col in required_columns if col not in self.catalogo.columns]
-            if missing_columns:
-                raise ValueError(f"Columnas faltantes en el catálogo: {missing_columns}")
-            logger.info("[VALIDATE] Columnas requeridas verificadas")
-            
-            # Crear índice de búsqueda
-            logger.info("[INDEX] Creando índice de búsqueda...")
-            self.catalogo['clave_busqueda'] = (
-                self.catalogo['Código SN'].astype(str).str.strip().str.upper() +
-                "|" +
-                self.catalogo['Nº catálogo SN'].astype(str).str.strip().str.lower()
-            )
-            self.indice_catalogo = self.catalogo.set_index('clave_busqueda')
-            logger.info(f"[INDEX] Índice creado con {len(self.indice_catalogo)} claves únicas")
-            
-            logger.info(f"[CATALOG] Catálogo cargado exitosamente: {len(self.catalogo)} registros")
+            logger.info(f"[CATALOG] Catálogo cargado exitosamente: {self.total_registros} registros")
             
         except Exception as e:
             logger.error(f"Error inicializando validador: {e}")
             raise
 
-    def validar_orden(self, orden_json: Dict[str, Any]):
-        logger.info("[VALIDATE] Iniciando validación de orden...")
+    @property
+    def catalogo(self):
+        """DataFrame del catálogo publicado actualmente"""
+        return self._estado[0]
+
+    @property
+    def indice_catalogo(self):
+        """Índice de búsqueda publicado actualmente"""
+        return self._estado[1]
+
+    @property
+    def version_catalogo(self):
+        """Versión del catálogo publicado (aumenta con cada publicación)"""
+        return self._estado[2] if self._estado is not None else 0
+
+    @property
+    def total_registros(self):
+        """Filas del catálogo publicado (disponible aunque se haya arrancado desde snapshot)"""
+        return self.indice_catalogo.filas
+
+    def _cliente_sheets(self):
+        """Cliente de gspread autorizado con la cuenta de servicio (se crea una sola vez)"""
+        if self._cliente_gspread is not None:
+            return self._cliente_gspread
+        # Importaciones pesadas diferidas: se pagan al descargar, no al importar el módulo
+        import gspread
+        from google.oauth2.service_account import Credentials
+        
+        # Configurar Google Sheets
+        logger.info("[GSHEETS] Autorizando cliente de Google Sheets...")
+        scopes = [
+            'https://www.googleapis.com/auth/spreadsheets',
+            'https://www.googleapis.com/auth/drive'
+        ]
+        credentials = Credentials.from_service_account_file(
+            GOOGLE_APPLICATION_CREDENTIALS,
+            scopes=scopes
+        )
+        self._cliente_gspread = gspread.authorize(credentials)
+        return self._cliente_gspread
+
+    def _abrir_libro(self):
+        """Abrir el libro del catálogo en Google Sheets"""
+        logger.info("[GSHEETS] Conectando con Google Sheets...")
+        sh = self._cliente_sheets().open_by_key(GOOGLE_DRIVE_FILE_ID)
+        logger.info("[GSHEETS] Conexión establecida")
+        return sh
+
+    def _fecha_modificacion(self):
+        """Última modificación del libro según Drive; None si no se puede consultar
+        
+        Es una sola llamada a la API de Drive: no abre el libro en Sheets. Los errores
+        de autorización sí se propagan.
+        """
+        cliente = self._cliente_sheets()
+        inicio = time.perf_counter()
+        try:
+            return cliente.get_file_drive_metadata(GOOGLE_DRIVE_FILE_ID)["modifiedTime"]
+        except Exception as e:
+            logger.warning(f"[RELOAD] No se pudo consultar la fecha de modificación del catálogo: {e}")
+            return None
+        finally:
+            metrica_verificacion.observar(time.perf_counter() - inicio)
+
+    def _descargar_catalogo(self):
+        """Descargar el catálogo de Google Sheets; devuelve (DataFrame, hash del contenido)"""
+        import pandas as pd
+        sh = self._abrir_libro()
+        
+        # Obtener datos de la hoja
+        logger.info(f"[DATA] Cargando datos del rango: {GOOGLE_SHEET_RANGE}")
+        if '!' in GOOGLE_SHEET_RANGE:
+            sheet_name, sheet_range = GOOGLE_SHEET_RANGE.split('!')
+        else:
+            sheet_name = 'Hoja1'
+            sheet_range = GOOGLE_SHEET_RANGE
+            
+        worksheet = sh.worksheet(sheet_name)
+        columnas = self._leer_columnas(worksheet, sheet_range)
+        
+        filas = max(len(columna) for columna in columnas) - 1
+        if filas < 1:
+            raise ValueError("El catálogo está vacío o no tiene datos válidos")
+        
+        huella = hashlib.sha256(
+            json.dumps(columnas, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        ).hexdigest()
+        # La API omite las celdas vacías al final de cada columna: completar hasta la última fila
+        catalogo = pd.DataFrame({
+            nombre: columna[1:] + [''] * (filas + 1 - len(columna))
+            for nombre, columna in zip(COLUMNAS_CATALOGO, columnas)
+        })
+        logger.info(f"[DATA] Datos cargados: {filas} filas, columnas {COLUMNAS_CATALOGO}")
+        return catalogo, huella
+
+    def _ubicar_columnas(self, worksheet, sheet_range):
+        """Leer solo la fila de encabezados y devolver el número de columna de cada COLUMNAS_CATALOGO"""
+        fila, _, columna_inicial, columna_final = _limites_rango(sheet_range)
+        columna_final = columna_final or worksheet.col_count
+        encabezados = worksheet.get(
+            f"{_letra_columna(columna_inicial)}{fila}:{_letra_columna(columna_final)}{fila}"
+        )
+        encabezados = encabezados[0] if encabezados else []
+        faltantes = [nombre for nombre in COLUMNAS_CATALOGO if nombre not in encabezados]
+        if faltantes:
+            raise ValueError(f"Columnas faltantes en el catálogo: {faltantes}")
+        posiciones = [columna_inicial + encabezados.index(nombre) for nombre in COLUMNAS_CATALOGO]
+        logger.info(
+            f"[DATA] Columnas del catálogo ubicadas: "
+            f"{dict(zip(COLUMNAS_CATALOGO, map(_letra_columna, posiciones)))} de {len(encabezados)}"
+        )
+        return posiciones
+
+    def _leer_columnas(self, worksheet, sheet_range):
+        """Descargar en una sola solicitud solo las columnas del índice (encabezado incluido)
+        
+        Cada columna se pide como rango abierto o acotado por las filas de sheet_range;
+        la API devuelve solo hasta la última celda con datos. Si los encabezados ya
+        no están donde se ubicaron (columnas movidas), se vuelven a ubicar.
+        """
+        fila_inicial, fila_final, _, _ = _limites_rango(sheet_range)
+        fin = fila_final or ''
+        for _ in range(2):
+            if self._columnas_hoja is None:
+                self._columnas_hoja = self._ubicar_columnas(worksheet, sheet_range)
+            rangos = [
+                f"{_letra_columna(c)}{fila_inicial}:{_letra_columna(c)}{fin}" for c in self._columnas_hoja
+            ]
+            respuesta = worksheet.batch_get(rangos, major_dimension='COLUMNS')
+            columnas = [list(valores[0]) if valores else [] for valores in respuesta]
+            if all(columna[:1] == [nombre] for columna, nombre in zip(columnas, COLUMNAS_CATALOGO)):
+                return columnas
+            logger.warning("[DATA] Las columnas del catálogo cambiaron de posición, se vuelven a ubicar")
+            self._columnas_hoja = None
+        raise ValueError(f"No se encontraron las columnas {COLUMNAS_CATALOGO} en la hoja")
+
+    def _construir_indice(self, catalogo):
+        """Validar columnas y construir el índice de búsqueda sin publicarlo"""
+        # Verificar columnas requeridas
+        logger.info("[VALIDATE] Verificando columnas requeridas...")
+        missing_columns = [col for col in COLUMNAS_CATALOGO if col not in catalogo.columns]
+        if missing_columns:
+            raise ValueError(f"Columnas faltantes en el catálogo: {missing_columns}")
+        logger.info("[VALIDATE] Columnas requeridas verificadas")
+        
+        # Crear índice de búsqueda
+        logger.info("[INDEX] Creando índice de búsqueda...")
+        indice_catalogo = IndiceCatalogo.desde_catalogo(catalogo)
+        logger.info(
+            f"[INDEX] Índice creado con {len(indice_catalogo)} claves únicas "
+            f"para {indice_catalogo.total_clientes} clientes"
+        )
+        
+        return catalogo, indice_catalogo
+
+    def _guardar_snapshot(self, catalogo):
+        """Persistir el catálogo en disco; un fallo aquí no afecta al servicio"""
+        if not CATALOGO_SNAPSHOT_PATH:
+            return
+        try:
+            guardar_snapshot(
+                catalogo, CATALOGO_SNAPSHOT_PATH,
+                huella=self._huella_catalogo, modificado=self._modificado_catalogo
+            )
+        except Exception as e:
+            logger.warning(f"No se pudo guardar el snapshot del catálogo: {e}")
+
+    def _publicar_catalogo(self, catalogo, indice_catalogo):
+        """Reemplazar atómicamente el catálogo e índice usados por las validaciones"""
+        # Una sola asignación: los lectores ven el estado anterior o el nuevo, nunca una mezcla
+        self._estado = (catalogo, indice_catalogo, self.version_catalogo + 1)
+        self.ultima_recarga = datetime.now()
+        # Lo calculado contra el catálogo anterior deja de ser válido
+        cache_manager.nueva_generacion(self.version_catalogo)
+
+    def recargar_catalogo(self, forzar=False):
+        """Recargar el catálogo desde Google Sheets conservando el anterior si falla
+        
+        Antes de abrir el libro consulta su fecha de modificación en Drive; si no
+        cambió desde la versión publicada no abre ni descarga nada. Si cambió pero el contenido
+        descargado es idéntico (hash), no reconstruye el índice. Con forzar=True
+        descarga y publica siempre.
+        Devuelve True si publicó una versión nueva, None si el catálogo no cambió y
+        False si la recarga falló o ya había otra en curso.
+        """
+        if not self._lock_recarga.acquire(blocking=False):
+            logger.info("[RELOAD] Recarga ya en curso, se omite")
+            return False
+        try:
+            logger.info("[RELOAD] Recargando catálogo...")
+            inicio = time.time()
+            modificado = self._fecha_modificacion()
+            self.ultima_verificacion = datetime.now()
+            if not forzar and modificado is not None and modificado == self._modificado_catalogo:
+                logger.info(f"[RELOAD] Catálogo sin cambios desde {modificado}, se omite la descarga")
+                metrica_recargas.inc("sin_cambios")
+                return None
+            catalogo, huella = self._descargar_catalogo()
+            if not forzar and huella == self._huella_catalogo:
+                # Cambió otra parte del libro, no el rango del catálogo
+                self._modificado_catalogo = modificado
+                logger.info(
+                    f"[RELOAD] Contenido idéntico al catálogo v{self.version_catalogo}, se conserva"
+                )
+                metrica_recargas.inc("sin_cambios")
+                return None
+            catalogo, indice_catalogo = self._construir_indice(catalogo)
+            self._publicar_catalogo(catalogo, indice_catalogo)
+            self._modificado_catalogo, self._huella_catalogo = modificado, huella
+            duracion = time.time() - inicio
+            logger.info(
+                f"[RELOAD] Catálogo v{self.version_catalogo} publicado: "
+                f"{len(catalogo)} registros en {duracion:.2f}s"
+            )
+            metrica_recarga.observar(duracion)
+            metrica_recargas.inc("ok")
+            self._guardar_snapshot(catalogo)
+            return True
+        except Exception as e:
+            logger.error(f"Error recargando catálogo, se mantiene la versión anterior: {e}")
+            metrica_recargas.inc("error")
+            # La siguiente recarga vuelve a autorizar por si el fallo fue del cliente
+            self._cliente_gspread = None
+            return False
+        finally:
+            self._lock_recarga.release()
+
+    def recargar_desde_snapshot(self):
+        """Publicar el índice del snapshot en disco (lo escribió otro proceso) sin llamar a Sheets"""
+        indice_catalogo, meta = cargar_snapshot(
+            CATALOGO_SNAPSHOT_PATH, con_metadatos=True, mapeado=self.indice_mapeado
+        )
+        if indice_catalogo is None:
+            return False
+        self._publicar_catalogo(None, indice_catalogo)
+        self._modificado_catalogo = meta.get("modificado")
+        self._huella_catalogo = meta.get("huella")
+        logger.info(f"[RELOAD] Catálogo v{self.version_catalogo} publicado desde el snapshot")
+        return True
+
+    def iniciar_recarga_automatica(self, intervalo_segundos):
+        """Iniciar hilo en segundo plano que recarga el catálogo periódicamente"""
+        if intervalo_segundos <= 0:
+            logger.info("[RELOAD] Recarga automática deshabilitada")
+            return
+        if self._hilo_recarga is not None and self._hilo_recarga.is_alive():
+            return
+        
+        def _bucle_recarga():
+            while not self._detener_recarga.wait(intervalo_segundos):
+                self.recargar_catalogo()
+        
+        self._detener_recarga.clear()
+        self._hilo_recarga = threading.Thread(
+            target=_bucle_recarga, name="recarga-catalogo", daemon=True
+        )
+        self._hilo_recarga.start()
+        logger.info(f"[RELOAD] Recarga automática cada {intervalo_segundos}s")
+
+    def detener_recarga_automatica(self):
+        """Detener el hilo de recarga automática"""
+        self._detener_recarga.set()
+        if self._hilo_recarga is not None:
+            self._hilo_recarga.join(timeout=5)
+            self._hilo_recarga = None
+
+    def _construir_resultado(self, orden_numero, cliente, items, particion, tiempos=None):
+        """Resolver los artículos de una orden contra la partición del cliente y armar la respuesta
+        
+        Si se pasa tiempos (dict), registra en él los segundos de 'lookup' y 'build'.
+        """
+        inicio = time.perf_counter()
+        # Normalizar todos los códigos de una vez y resolver faltantes con una sola
+        # operación de conjuntos contra la partición del cliente
+        codigos = [str(item['codigo']).strip().lower() for item in items]
+        faltantes = codigos_faltantes(particion, codigos)
+        fin_lookup = time.perf_counter()
+        articulos_no_encontrados = []
+        if faltantes and logger.isEnabledFor(logging.DEBUG):
+            for codigo in faltantes:
+                logger.debug("[ITEM] %s + %s no existe en el catálogo", cliente, codigo)
+        if faltantes:
+            articulos_no_encontrados = [
+                {
+                    "codigo": item['codigo'],
+                    "descripcion": item['descripcion'],
+                    "cantidad": item['cantidad'],
+                    "motivo": f"La combinación Cliente [{cliente}] + Artículo [{item['codigo']}] NO existe en el catálogo"
+                }
+                for item, codigo in zip(items, codigos) if codigo in faltantes
+            ]
+        
+        todos_existen = len(articulos_no_encontrados) == 0
+        total_encontrados = len(items) - len(articulos_no_encontrados)
+        # Solo se listan artículos para SAP cuando la orden completa es válida
+        articulos_encontrados = [
+            {
+                "codigo": item['codigo'],
+                "descripcion": item['descripcion'],
+                "cantidad": item['cantidad'],
+                "precio_unitario": item['precio_unitario'],
+                "precio_total": item['precio_total'],
+                "fecha_entrega": item['fecha_entrega']
+            }
+            for item in items
+        ] if todos_existen else []
+        
+        resultado = {
+            "orden_compra": orden_numero,
+            "cliente": cliente,
+            "fecha_validacion": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "TODOS_LOS_ARTICULOS_EXISTEN": todos_existen,
+            "PUEDE_PROCESAR_EN_SAP": todos_existen,
+            "resumen": {
+                "total_articulos": len(items),
+                "articulos_encontrados": total_encontrados,
+                "articulos_faltantes": len(articulos_no_encontrados),
+                "porcentaje_exito": round(total_encontrados / len(items) * 100, 2)
+            },
+            "articulos_listos_para_sap": articulos_encontrados,
+            "articulos_que_NO_existen": articulos_no_encontrados,
+            "mensaje": (
+                f"VALIDACION EXITOSA: Todos los {len(items)} articulos existen en el catalogo. La orden puede procesarse en SAP."
+                if todos_existen else 
+                f"VALIDACION FALLIDA: {len(articulos_no_encontrados)} de {len(items)} articulos NO existen en el catalogo. Revisar articulos faltantes antes de procesar en SAP."
+            )
+        }
+        if tiempos is not None:
+            tiempos["lookup"] = fin_lookup - inicio
+            tiempos["build"] = time.perf_counter() - fin_lookup
+        return resultado
+
+    @staticmethod
+    def _clave_orden(version, cliente, orden_numero, items):
+        """Clave de cache de una orden: versión del catálogo + hash de su contenido"""
+        # La respuesta repite número de orden y los campos de cada artículo, así que
+        # el hash cubre todo lo que aparece en ella (no solo NIT y códigos). hash()
+        # sobre tuplas no serializa la orden: cuesta menos que armar la respuesta
+        contenido = (cliente, orden_numero, tuple(map(_CAMPOS_ITEM, items)))
+        return f"orden:v{version}:{hash(contenido):x}"
+
+    def _resolver_orden(self, clave, orden_numero, cliente, items, indice_catalogo, tiempos=None):
+        """Validar una orden que no está en el cache y guardar el resultado bajo clave"""
+        particion = indice_catalogo.particion(cliente)
+        if particion is None:
+            logger.warning("Cliente %s sin articulos en el catalogo", cliente)
+        resultado = self._construir_resultado(orden_numero, cliente, items, particion, tiempos)
+        cache_manager.set(
+            clave, resultado,
+            clase="positiva" if resultado["TODOS_LOS_ARTICULOS_EXISTEN"] else "negativa",
+            peso=len(items)
+        )
+        return resultado
+
+    def clave_orden(self, orden_json: Dict[str, Any]):
+        """Clave de cache (y de coalescencia) de una orden contra el catálogo publicado"""
+        return self._clave_orden(
+            self.version_catalogo, str(orden_json['comprador']['nit']).strip().upper(),
+            orden_json['orden_compra'], orden_json['items']
+        )
+
+    def validar_orden(self, orden_json: Dict[str, Any], tiempos: Dict[str, float] = None, clave=None):
+        """Validar una orden; si se pasa tiempos (dict), registra los segundos por etapa
+        
+        clave es la de clave_orden si el llamador ya la calculó.
+        """
+        logger.debug("[VALIDATE] Iniciando validación de orden...")
         try:
             cliente = str(orden_json['comprador']['nit']).strip().upper()
             orden_numero = orden_json['orden_compra']
             items = orden_json['items']
+            # Tomar una sola referencia al índice: una recarga concurrente no afecta esta orden
+            _, indice_catalogo, version = self._estado
             
-            logger.info(f"[ORDER] Validando orden {orden_numero} para cliente {cliente} con {len(items)} artículos")
+            logger.info(
+                "[ORDER] Validando orden %s para cliente %s con %d artículos",
+                orden_numero, cliente, len(items)
+            )
             
             if not items:
                 logger.warning("Orden sin articulos")
                 raise ValueError("La orden debe tener al menos un artículo")
             
-            articulos_encontrados = []
-            articulos_no_encontrados = []
-            
-            for i, item in enumerate(items, 1):
-                codigo = str(item['codigo']).strip()
-                clave_busqueda = f"{cliente}|{codigo.lower()}"
-                
-                logger.debug(f"[SEARCH] Buscando artículo {i}/{len(items)}: {codigo} para cliente {cliente}")
-                
-                # Intentar obtener del cache primero
-                cache_key = f"validacion_{clave_busqueda}"
-                cache_result = cache_manager.get(cache_key)
-                
-                if cache_result is not None:
-                    logger.debug(f"⚡ Cache hit para artículo: {codigo}")
-                    if cache_result["existe"]:
-                        articulo_valido = {
-                            "codigo": item['codigo'],
-                            "descripcion": item['descripcion'],
-                            "cantidad": item['cantidad'],
-                            "precio_unitario": item['precio_unitario'],
-                            "precio_total": item['precio_total'],
-                            "fecha_entrega": item['fecha_entrega']
-                        }
-                        articulos_encontrados.append(articulo_valido)
-                    else:
-                        articulo_faltante = {
-                            "codigo": item['codigo'],
-                            "descripcion": item['descripcion'],
-                            "cantidad": item['cantidad'],
-                            "motivo": cache_result["motivo"]
-                        }
-                        articulos_no_encontrados.append(articulo_faltante)
-                    continue
-                
-                # Búsqueda en catálogo
-                try:
-                    registro_catalogo = self.indice_catalogo.loc[clave_busqueda]
-                    articulo_valido = {
-                        "codigo": item['codigo'],
-                        "descripcion": item['descripcion'],
-                        "cantidad": item['cantidad'],
-                        "precio_unitario": item['precio_unitario'],
-                        "precio_total": item['precio_total'],
-                        "fecha_entrega": item['fecha_entrega']
-                    }
-                    articulos_encontrados.append(articulo_valido)
-                    logger.debug(f"[FOUND] Artículo encontrado: {codigo}")
-                    
-                    # Guardar en cache
-                    cache_manager.set(cache_key, {
-                        "existe": True,
-                        "registro": registro_catalogo.to_dict()
-                    })
-                    
-                except KeyError:
-                    articulo_faltante = {
-                        "codigo": item['codigo'],
-                        "descripcion": item['descripcion'],
-                        "cantidad": item['cantidad'],
-                        "motivo": f"La combinación Cliente [{cliente}] + Artículo [{item['codigo']}] NO existe en el catálogo"
-                    }
-                    articulos_no_encontrados.append(articulo_faltante)
-                    logger.warning(f"Articulo no encontrado: {codigo} para cliente {cliente}")
-                    
-                    # Guardar en cache
-                    cache_manager.set(cache_key, {
-                        "existe": False,
-                        "motivo": articulo_faltante["motivo"]
-                    })
-            
-            todos_existen = len(articulos_no_encontrados) == 0
+            # Reenvío idéntico contra la misma versión del catálogo: reutilizar el resultado
+            inicio_cache = time.perf_counter()
+            if clave is None:
+                clave = self._clave_orden(version, cliente, orden_numero, items)
+            resultado = cache_manager.get(clave)
+            if tiempos is not None:
+                tiempos["cache"] = time.perf_counter() - inicio_cache
+            if resultado is not None:
+                logger.info("[CACHE] Orden %s ya validada contra catálogo v%s", orden_numero, version)
+                return {**resultado, "fecha_validacion": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
             
-            resultado = {
-                "orden_compra": orden_numero,
-                "cliente": cliente,
-                "fecha_validacion": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "TODOS_LOS_ARTICULOS_EXISTEN": todos_existen,
-                "PUEDE_PROCESAR_EN_SAP": todos_existen,
-                "resumen": {
-                    "total_articulos": len(items),
-                    "articulos_encontrados": len(articulos_encontrados),
-                    "articulos_faltantes": len(articulos_no_encontrados),
-                    "porcentaje_exito": round(len(articulos_encontrados) / len(items) * 100, 2)
-                },
-                "articulos_listos_para_sap": articulos_encontrados if todos_existen else [],
-                "articulos_que_NO_existen": articulos_no_encontrados,
-                "mensaje": (
-                    f"VALIDACION EXITOSA: Todos los {len(items)} articulos existen en el catalogo. La orden puede procesarse en SAP."
-                    if todos_existen else 
-                    f"VALIDACION FALLIDA: {len(articulos_no_encontrados)} de {len(items)} articulos NO existen en el catalogo. Revisar articulos faltantes antes de procesar en SAP."
-                )
-            }
-            
-            logger.info(f"[RESULT] Validación completada: {len(articulos_encontrados)}/{len(items)} artículos encontrados")
-            if todos_existen:
+            resultado = self._resolver_orden(clave, orden_numero, cliente, items, indice_catalogo, tiempos)
+            resumen = resultado["resumen"]
+            logger.info(
+                "[RESULT] Validación completada: %d/%d artículos encontrados",
+                resumen['articulos_encontrados'], len(items)
+            )
+            if resultado["TODOS_LOS_ARTICULOS_EXISTEN"]:
                 logger.info("TODOS los articulos existen - Orden lista para SAP")
             else:
-                logger.warning(f"{len(articulos_no_encontrados)} articulos faltantes - Revisar antes de SAP")
+                logger.warning("%d articulos faltantes - Revisar antes de SAP", resumen['articulos_faltantes'])
             
             return resultado
         except Exception as e:
-            logger.error(f"Error validando orden: {str(e)}")
+            logger.error("Error validando orden: %s", e)
             raise ValueError(f"Error validando orden: {str(e)}")
 
-# Inicializar validador
-logger.info("[STARTUP] Iniciando Validador Tamaprint...")
-try:
-    validador = ValidadorOrdenesCompra()
-    logger.info("[READY] Validador inicializado correctamente")
-except Exception as e:
-    logger.error(f"Error critico: {e}")
-    logger.error("Verifica la configuracion en .env y el archivo credentials.json")
-    exit(1)
-
-@app.post("/validar-orden")
-async def validar_orden_endpoint(orden: OrdenModel):
-    logger.info(f"Nueva solicitud de validacion recibida")
+    def validar_ordenes(self, ordenes: List[Dict[str, Any]]):
+        """Validar un lote de órdenes resolviendo la partición de cada NIT una sola vez"""
+        indice_catalogo = self.indice_catalogo
+        resultados = [None] * len(ordenes)
+        
+        # Agrupar posiciones por cliente conservando el orden original en la respuesta
+        por_cliente = {}
+        for posicion, orden_json in enumerate(ordenes):
+            cliente = str(orden_json['comprador']['nit']).strip().upper()
+            por_cliente.setdefault(cliente, []).append(posicion)
+        
+        for cliente, posiciones in por_cliente.items():
+            particion = indice_catalogo.particion(cliente)
+            for posicion in posiciones:
+                orden_json = ordenes[posicion]
+                try:
+                    if not orden_json['items']:
+                        raise ValueError("La orden debe tener al menos un artículo")
+                    resultados[posicion] = self._construir_resultado(
+                        orden_json['orden_compra'], cliente, orden_json['items'], particion
+                    )
+                except Exception as e:
+                    resultados[posicion] = {
+                        "orden_compra": orden_json.get('orden_compra'),
+                        "cliente": cliente,
+                        "TODOS_LOS_ARTICULOS_EXISTEN": False,
+                        "PUEDE_PROCESAR_EN_SAP": False,
+                        "error": str(e),
+                        "mensaje": f"ERROR DE VALIDACIÓN: {str(e)}"
+                    }
+        
+        validas = sum(1 for r in resultados if r["PUEDE_PROCESAR_EN_SAP"])
+        logger.info(
+            f"[BATCH] Lote validado: {validas}/{len(ordenes)} órdenes listas para SAP, "
+            f"{len(por_cliente)} clientes"
+        )
+        return resultados
+
+class ArranqueValidador:
+    """Crear el validador en segundo plano reintentando con backoff exponencial.
+    
+    El servidor acepta conexiones de inmediato: si Google Sheets está lento o caído
+    al arrancar, el proceso sigue vivo (sin reinicios en bucle del contenedor) y los
+    endpoints de validación responden 503 con Retry-After hasta que el catálogo carga.
+    """
+    
+    def __init__(self, espera_inicial=1.0, espera_maxima=60.0):
+        self.espera_inicial = espera_inicial
+        self.espera_maxima = espera_maxima
+        self.intentos = 0
+        self.ultimo_error = None
+        self.segundos_hasta_listo = None
+        self._detener = threading.Event()
+        self._hilo = None
+    
+    def iniciar(self):
+        """Lanzar la carga del catálogo en un hilo y volver sin esperarla"""
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self.cargar, name="arranque-catalogo", daemon=True)
+        self._hilo.start()
+    
+    def detener(self, timeout=5.0):
+        """Cancelar los reintentos pendientes (un intento en curso no se interrumpe)"""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+    
+    def cargar(self, recarga_automatica=True, **opciones):
+        """Crear el validador en el hilo actual reintentando hasta lograrlo o hasta detener()
+        
+        opciones se pasan a ValidadorOrdenesCompra.
+        """
+        global validador
+        inicio = time.monotonic()
+        espera = self.espera_inicial
+        while not self._detener.is_set():
+            self.intentos += 1
+            try:
+                nuevo = ValidadorOrdenesCompra(**opciones)
+            except Exception as e:
+                self.ultimo_error = str(e)
+                logger.error(
+                    f"[STARTUP] Intento {self.intentos} de carga del catálogo fallido: {e}. "
+                    f"Reintento en {espera:.0f}s"
+                )
+                if self.intentos == 1:
+                    logger.error("Verifica la configuracion en .env y el archivo credentials.json")
+                self._detener.wait(espera)
+                espera = min(espera * 2, self.espera_maxima)
+                continue
+            if self._detener.is_set():
+                return
+            if recarga_automatica:
+                nuevo.iniciar_recarga_automatica(CATALOGO_RECARGA_SEGUNDOS)
+            validador = nuevo
+            self.ultimo_error = None
+            self.segundos_hasta_listo = time.monotonic() - inicio
+            logger.info(
+                f"[READY] Validador inicializado correctamente en {self.segundos_hasta_listo:.1f}s "
+                f"({self.intentos} intentos)"
+            )
+            return
+    
+    def estado(self):
+        return {
+            "listo": validador is not None,
+            "intentos": self.intentos,
+            "ultimo_error": self.ultimo_error,
+            "segundos_hasta_listo": self.segundos_hasta_listo
+        }
+
+# Validador global; lo crea `arranque` en segundo plano al arrancar la aplicación
+validador = None
+arranque = ArranqueValidador(
+    espera_inicial=ARRANQUE_REINTENTO_INICIAL, espera_maxima=ARRANQUE_REINTENTO_MAXIMO
+)
+
+def _respuesta_no_listo():
+    """503 inmediato mientras el catálogo no está cargado"""
+    return JSONResponse(content={
+        "TODOS_LOS_ARTICULOS_EXISTEN": False,
+        "PUEDE_PROCESAR_EN_SAP": False,
+        "error": "Catálogo no cargado",
+        "mensaje": "SERVICIO NO DISPONIBLE: el catálogo se está cargando. Reintentar más tarde."
+    }, status_code=503, headers={"Retry-After": str(ARRANQUE_RETRY_AFTER)})
+
+async def _validar_orden_admitida(orden_json, clave, tiempos):
+    """Esperar lugar en el control de admisión y validar la orden en el pool"""
+    # El costo crece con los artículos: se admite por artículos en vuelo, no por solicitudes
+    async with control_admision.admitir(len(orden_json['items'])) as espera:
+        tiempos["admision"] = espera
+        metrica_espera_admision.observar(espera)
+        # Validar en el pool: una orden grande no bloquea el event loop
+        return await pool_validacion.ejecutar(validador.validar_orden, orden_json, tiempos, clave)
+
+@router.post("/validar-orden")
+async def validar_orden_endpoint(orden: OrdenModel, request: Request):
+    if validador is None:
+        return _respuesta_no_listo()
+    logger.debug("Nueva solicitud de validacion recibida")
+    tiempos = {}
+    # Desde la llegada de la solicitud: lectura del cuerpo y validación con pydantic
+    inicio_solicitud = getattr(request.state, "inicio_solicitud", None)
+    if inicio_solicitud is not None:
+        tiempos["parse"] = time.perf_counter() - inicio_solicitud
     try:
-        resultado = validador.validar_orden(orden.dict())
-        logger.info(f"[SUCCESS] Validación exitosa para orden: {resultado['orden_compra']}")
-        return JSONResponse(content=resultado, status_code=200)
+        inicio = time.perf_counter()
+        orden_json = orden.dict()
+        tiempos["dict"] = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        clave = validador.clave_orden(orden_json)
+        tiempos["clave"] = time.perf_counter() - inicio
+        # Una copia idéntica en curso espera el resultado de la primera aquí, sin reservar
+        # artículos en la admisión ni ocupar un hilo del pool
+        inicio = time.perf_counter()
+        resultado, compartido = await ordenes_en_curso.ejecutar(
+            clave, _validar_orden_admitida, orden_json, clave, tiempos
+        )
+        if compartido:
+            tiempos["coalesce"] = time.perf_counter() - inicio
+            logger.info(
+                "[COALESCE] Orden %s validada junto con una copia idéntica en curso", orden_json['orden_compra']
+            )
+            resultado = {**resultado, "fecha_validacion": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+        logger.info("[SUCCESS] Validación exitosa para orden: %s", resultado['orden_compra'])
+        inicio = time.perf_counter()
+        respuesta = JSONResponse(content=resultado, status_code=200)
+        tiempos["serialize"] = time.perf_counter() - inicio
+        for etapa, segundos in tiempos.items():
+            metrica_etapas.observar(segundos, etapa)
+        if SERVER_TIMING:
+            respuesta.headers["Server-Timing"] = formatear_server_timing(tiempos)
+        return respuesta
+    except AdmisionRechazada as e:
+        logger.warning("[ADMISSION] Orden rechazada (%s): %s", e.motivo, e)
+        return JSONResponse(content={
+            "TODOS_LOS_ARTICULOS_EXISTEN": False,
+            "PUEDE_PROCESAR_EN_SAP": False,
+            "error": str(e),
+            "mensaje": f"DEMASIADAS SOLICITUDES: {str(e)}. Reintentar más tarde."
+        }, status_code=429, headers={"Retry-After": str(VALIDAR_ORDEN_RETRY_AFTER)})
+    except PoolSaturado as e:
+        logger.warning("[POOL] Orden rechazada: %s", e)
+        return JSONResponse(content={
+            "TODOS_LOS_ARTICULOS_EXISTEN": False,
+            "PUEDE_PROCESAR_EN_SAP": False,
+            "error": str(e),
+            "mensaje": f"SERVICIO SATURADO: {str(e)}. Reintentar más tarde."
+        }, status_code=503, headers={"Retry-After": str(VALIDAR_ORDEN_RETRY_AFTER)})
     except ValueError as e:
         logger.warning(f"Error de validacion: {str(e)}")
         return JSONResponse(content={
@@ -391,13 +1174,168 @@ async def validar_orden_endpoint(orden: OrdenModel):
             "mensaje": f"ERROR INTERNO: {str(e)}"
         }, status_code=500)
 
-@app.get("/health")
+@router.post("/validar-ordenes")
+async def validar_ordenes_endpoint(ordenes: List[OrdenModel]):
+    """Validar un lote de órdenes en una sola solicitud"""
+    if validador is None:
+        return _respuesta_no_listo()
+    logger.info(f"Nueva solicitud de validacion por lote recibida: {len(ordenes)} ordenes")
+    total_articulos = sum(len(orden.items) for orden in ordenes)
+    if not ordenes or len(ordenes) > VALIDAR_ORDENES_MAX or total_articulos > VALIDAR_ORDENES_MAX_ARTICULOS:
+        mensaje = (
+            f"El lote debe tener entre 1 y {VALIDAR_ORDENES_MAX} órdenes y como máximo "
+            f"{VALIDAR_ORDENES_MAX_ARTICULOS} artículos en total"
+        )
+        logger.warning(f"Error de validacion: {mensaje}")
+        return JSONResponse(content={
+            "error": mensaje,
+            "mensaje": f"ERROR DE VALIDACIÓN: {mensaje}"
+        }, status_code=400)
+    try:
+        # Un lote grande es CPU pura: se valida en el threadpool para no bloquear el event loop
+        resultados = await run_in_threadpool(
+            validador.validar_ordenes, [orden.dict() for orden in ordenes]
+        )
+        return JSONResponse(content={
+            "total_ordenes": len(resultados),
+            "ordenes_validas": sum(1 for r in resultados if r["PUEDE_PROCESAR_EN_SAP"]),
+            "resultados": resultados
+        }, status_code=200)
+    except Exception as e:
+        logger.error(f"Error interno: {str(e)}")
+        return JSONResponse(content={
+            "error": str(e),
+            "mensaje": f"ERROR INTERNO: {str(e)}"
+        }, status_code=500)
+
+def _procesar_lote_stream(lote):
+    """Validar un lote de líneas del stream y serializarlas como NDJSON"""
+    validas = [orden for _, orden, _ in lote if orden is not None]
+    resultados = iter(validador.validar_ordenes(validas) if validas else ())
+    salida = []
+    for linea, orden, error in lote:
+        resultado = next(resultados) if orden is not None else error
+        salida.append(json.dumps({"linea": linea, **resultado}, ensure_ascii=False))
+        salida.append("\n")
+    return "".join(salida)
+
+def _error_linea_stream(mensaje):
+    return {
+        "TODOS_LOS_ARTICULOS_EXISTEN": False,
+        "PUEDE_PROCESAR_EN_SAP": False,
+        "error": mensaje,
+        "mensaje": f"ERROR DE VALIDACIÓN: {mensaje}"
+    }
+
+async def _leer_cuerpo(receive):
+    """Entregar el cuerpo de la solicitud bloque a bloque a medida que llega"""
+    while True:
+        mensaje = await receive()
+        if mensaje["type"] == "http.disconnect":
+            return
+        bloque = mensaje.get("body", b"")
+        if bloque:
+            yield bloque
+        if not mensaje.get("more_body", False):
+            return
+
+async def _validar_stream(bloques):
+    """Leer órdenes NDJSON a medida que llegan y emitir sus resultados por lotes"""
+    pendiente = bytearray()
+    lote = []
+    numero_linea = 0
+    total = 0
+    
+    def _agregar_linea(contenido):
+        nonlocal numero_linea
+        numero_linea += 1
+        if not contenido.strip():
+            return
+        try:
+            orden = OrdenModel(**json.loads(contenido)).dict()
+            lote.append((numero_linea, orden, None))
+        except Exception as e:
+            lote.append((numero_linea, None, _error_linea_stream(str(e))))
+    
+    async for bloque in bloques:
+        pendiente += bloque
+        if b"\n" in bloque:
+            *lineas, resto = pendiente.split(b"\n")
+            pendiente = bytearray(resto)
+            for contenido in lineas:
+                _agregar_linea(contenido)
+                if len(lote) >= STREAM_LOTE:
+                    total += len(lote)
+                    # La validación es CPU: se ejecuta fuera del event loop
+                    yield await run_in_threadpool(_procesar_lote_stream, lote)
+                    lote = []
+        if len(pendiente) > STREAM_LINEA_MAX_BYTES:
+            # Una línea sin fin rompería el límite de memoria: se corta el stream aquí
+            numero_linea += 1
+            lote.append((numero_linea, None, _error_linea_stream(
+                f"Línea mayor a {STREAM_LINEA_MAX_BYTES} bytes, stream interrumpido"
+            )))
+            logger.warning(f"[STREAM] Línea {numero_linea} excede el tamaño máximo, stream interrumpido")
+            yield await run_in_threadpool(_procesar_lote_stream, lote)
+            return
+    
+    _agregar_linea(pendiente)
+    if lote:
+        total += len(lote)
+        yield await run_in_threadpool(_procesar_lote_stream, lote)
+    logger.info(f"[STREAM] Stream completado: {total} ordenes procesadas")
+
+class RespuestaStreamNDJSON(StreamingResponse):
+    """Respuesta NDJSON que lee el cuerpo de la solicitud mientras responde.
+    
+    StreamingResponse escucha la desconexión del cliente con receive() en paralelo
+    al cuerpo de la respuesta; si el cuerpo también lee la solicitud, ambos compiten
+    por los mismos mensajes. Aquí lectura y escritura comparten un único flujo.
+    """
+    
+    def __init__(self):
+        super().__init__(iter(()), media_type="application/x-ndjson")
+    
+    async def __call__(self, scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+        async for texto in _validar_stream(_leer_cuerpo(receive)):
+            await send({"type": "http.response.body", "body": texto.encode("utf-8"), "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+@router.post("/validar-ordenes/stream")
+async def validar_ordenes_stream_endpoint():
+    """Validar órdenes NDJSON (una por línea) devolviendo resultados NDJSON incrementales"""
+    if validador is None:
+        return _respuesta_no_listo()
+    logger.info("Nueva solicitud de validacion por stream recibida")
+    return RespuestaStreamNDJSON()
+
+@router.get("/health")
 async def health_check():
     logger.debug("[HEALTH] Health check solicitado")
+    if validador is None:
+        # Proceso vivo pero sin catálogo todavía: 200 para no reiniciar el contenedor
+        return {
+            "status": "CARGANDO",
+            "catalogo_items": 0,
+            "arranque": arranque.estado(),
+            "admision": control_admision.stats(),
+            "pool_validacion": pool_validacion.stats(),
+            "timestamp": datetime.now().isoformat()
+        }
     try:
         response = {
             "status": "OK",
-            "catalogo_items": len(validador.catalogo),
+            "catalogo_items": (
+                len(validador.catalogo) if validador.catalogo is not None
+                else validador.total_registros
+            ),
+            "admision": control_admision.stats(),
+            "pool_validacion": pool_validacion.stats(),
             "timestamp": datetime.now().isoformat()
         }
         logger.debug(f"[HEALTH] Check exitoso: {response['catalogo_items']} items en catálogo")
@@ -409,13 +1347,76 @@ async def health_check():
             "error": str(e)
         }, status_code=500)
 
-@app.get("/debug-catalogo")
+@router.get("/health/live")
+async def liveness():
+    """Liveness: el proceso responde, con o sin catálogo cargado"""
+    return {"status": "OK"}
+
+@router.get("/health/ready")
+async def readiness():
+    """Readiness: 200 solo cuando el catálogo está cargado y se pueden validar órdenes"""
+    if validador is None:
+        return JSONResponse(
+            content={"status": "CARGANDO", **arranque.estado()},
+            status_code=503, headers={"Retry-After": str(ARRANQUE_RETRY_AFTER)}
+        )
+    return {
+        "status": "LISTO",
+        "catalogo_version": validador.version_catalogo,
+        "catalogo_items": validador.total_registros
+    }
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Métricas en formato de texto de Prometheus"""
+    return PlainTextResponse(metricas.exponer(), media_type="text/plain; version=0.0.4")
+
+def _verificar_token_admin(x_admin_token):
+    """Respuesta 404/403 si la administración está deshabilitada o el token no coincide; None si es válido"""
+    if not ADMIN_TOKEN:
+        return JSONResponse(content={"error": "Endpoints de administración deshabilitados"}, status_code=404)
+    # Comparar bytes: compare_digest rechaza str con caracteres no ASCII y el
+    # encabezado llega decodificado como latin-1
+    if not x_admin_token or not hmac.compare_digest(
+        x_admin_token.encode('latin-1'), ADMIN_TOKEN.encode('utf-8')
+    ):
+        return JSONResponse(content={"error": "Token de administración inválido"}, status_code=403)
+    return None
+
+@router.post("/admin/perfil", response_class=PlainTextResponse)
+async def perfil_endpoint(
+    segundos: float = 10.0,
+    intervalo_ms: float = 5.0,
+    todo: bool = False,
+    x_admin_token: str = Header(None)
+):
+    """Perfilar el proceso por muestreo y devolver las pilas en formato collapsed (flamegraph)"""
+    rechazo = _verificar_token_admin(x_admin_token)
+    if rechazo is not None:
+        return rechazo
+    logger.info(f"[PROFILE] Perfil solicitado: {segundos}s cada {intervalo_ms}ms")
+    try:
+        perfil, muestras = await run_in_threadpool(
+            perfilador.perfilar, segundos, max(intervalo_ms, 1.0) / 1000,
+            None if todo else FUNCIONES_PERFIL
+        )
+    except PerfiladorOcupado as e:
+        return JSONResponse(content={"error": str(e)}, status_code=409)
+    logger.info(f"[PROFILE] Perfil completado: {muestras} muestras")
+    return PlainTextResponse(perfil, headers={"X-Perfil-Muestras": str(muestras)})
+
+@router.get("/debug-catalogo")
 async def debug_catalogo():
     logger.debug("[DEBUG] Debug catálogo solicitado")
+    if validador is None:
+        return _respuesta_no_listo()
     try:
         response = {
-            "primeras_5_filas": validador.catalogo.head(5).to_dict(orient='records'),
-            "claves_busqueda": list(validador.indice_catalogo.index[:5])
+            "primeras_5_filas": (
+                validador.catalogo.head(5).to_dict(orient='records')
+                if validador.catalogo is not None else []
+            ),
+            "claves_busqueda": validador.indice_catalogo.claves_ejemplo(5)
         }
         logger.debug(f"[DEBUG] Catálogo exitoso: {len(response['primeras_5_filas'])} filas mostradas")
         return response
@@ -425,9 +1426,39 @@ async def debug_catalogo():
             "error": str(e)
         }, status_code=500)
 
-@app.get("/cache/stats")
+@router.post("/catalogo/recargar")
+async def recargar_catalogo(forzar: bool = False, x_admin_token: str = Header(None)):
+    """Recargar el catálogo sin reiniciar el servicio
+    
+    Con forzar=true descarga y publica aunque no haya cambiado; como salta la
+    detección de cambios, requiere el encabezado X-Admin-Token.
+    """
+    logger.info("[RELOAD] Recarga de catálogo solicitada")
+    if forzar:
+        rechazo = _verificar_token_admin(x_admin_token)
+        if rechazo is not None:
+            return rechazo
+    if validador is None:
+        return _respuesta_no_listo()
+    try:
+        # La recarga corre en un hilo para no bloquear el event loop
+        recargado = await run_in_threadpool(validador.recargar_catalogo, forzar)
+        return {
+            "recargado": recargado is True,
+            "sin_cambios": recargado is None,
+            "catalogo_version": validador.version_catalogo,
+            "catalogo_items": validador.total_registros,
+            "ultima_recarga": validador.ultima_recarga.isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error recargando catálogo: {str(e)}")
+        return JSONResponse(content={
+            "error": str(e)
+        }, status_code=500)
+
+@router.get("/cache/stats")
 async def cache_stats():
-    """Obtener estadísticas del cache"""
+    """Obtener estadísticas del cache de resultados por orden"""
     logger.debug("[STATS] Estadísticas de cache solicitadas")
     try:
         stats = cache_manager.stats()
@@ -439,9 +1470,9 @@ async def cache_stats():
             "error": str(e)
         }, status_code=500)
 
-@app.post("/cache/clear")
+@router.post("/cache/clear")
 async def clear_cache():
-    """Limpiar todo el cache"""
+    """Limpiar todo el cache de resultados por orden"""
     logger.info("🧹 Limpieza de cache solicitada")
     try:
         cache_manager.clear()
@@ -450,4 +1481,33 @@ async def clear_cache():
         logger.error(f"Error limpiando cache: {str(e)}")
         return JSONResponse(content={
             "error": str(e)
-        }, status_code=500)
\ No newline at end of file
+        }, status_code=500)
+
+@asynccontextmanager
+async def _ciclo_de_vida(aplicacion):
+    """Cargar el catálogo en segundo plano al arrancar y detener los hilos al apagar"""
+    logger.info("[STARTUP] Iniciando Validador Tamaprint...")
+    if validador is not None:
+        # Worker de run.py --workers: el proceso principal ya cargó el catálogo antes de fork
+        logger.info("[STARTUP] Catálogo precargado por el proceso principal")
+    else:
+        # No se espera la carga: el servidor escucha de inmediato y /health/ready indica cuándo está listo
+        arranque.iniciar()
+    yield
+    arranque.detener()
+    if validador is not None:
+        validador.detener_recarga_automatica()
+    pool_validacion.cerrar()
+
+def crear_app():
+    """Crear la aplicación FastAPI; el catálogo se carga al arrancar el servidor, no al importar"""
+    aplicacion = FastAPI(title="Validador Tamaprint", version="1.0.0", lifespan=_ciclo_de_vida)
+    aplicacion.add_middleware(
+        MiddlewareMetricas, solicitudes=metrica_solicitudes, duracion=metrica_duracion,
+        server_timing=SERVER_TIMING
+    )
+    aplicacion.include_router(router)
+    return aplicacion
+
+# Aplicación por defecto para `uvicorn src.validador:app`
+app = crear_app()
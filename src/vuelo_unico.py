@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Coalescencia de cálculos idénticos en curso ("single-flight").
+
+Durante tormentas de reintentos llega la misma orden varias veces en pocos
+milisegundos; antes de que la primera termine, el cache de resultados todavía no
+la tiene y cada copia haría el cálculo completo. Aquí la primera solicitud con una
+clave calcula (líder) y las que llegan mientras tanto esperan su resultado, o su
+excepción, en vez de repetir el trabajo.
+
+Se usa desde el event loop, antes del control de admisión y del pool de
+validación: quien espera el resultado de otra solicitud no reserva artículos ni
+ocupa un hilo. Solo agrupa cálculos simultáneos: al terminar, la clave se libera y
+el cache de resultados se encarga de los reenvíos posteriores.
+"""
+
+import asyncio
+
+
+class VueloUnico:
+    """Comparte entre corrutinas el resultado de un cálculo en curso con la misma clave"""
+
+    def __init__(self):
+        self._en_curso = {}
+        self.lideres = 0
+        self.compartidas = 0
+
+    async def ejecutar(self, clave, funcion, *args):
+        """Devolver (resultado, compartido) de await funcion(*args)
+
+        Si ya hay un cálculo con la misma clave en curso, espera ese resultado
+        (compartido=True) en lugar de ejecutar funcion. Las excepciones del líder
+        se propagan a todos los que esperaban; si el líder se cancela (p. ej. su
+        cliente se desconectó), quien esperaba vuelve a intentarlo.
+        """
+        while True:
+            futuro = self._en_curso.get(clave)
+            if futuro is None:
+                break
+            self.compartidas += 1
+            try:
+                # shield: cancelar a quien espera no cancela el cálculo del líder
+                return await asyncio.shield(futuro), True
+            except asyncio.CancelledError:
+                if not futuro.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                self.compartidas -= 1
+
+        futuro = asyncio.get_running_loop().create_future()
+        self._en_curso[clave] = futuro
+        self.lideres += 1
+        try:
+            resultado = await funcion(*args)
+        except asyncio.CancelledError:
+            futuro.cancel()
+            raise
+        except BaseException as e:
+            futuro.set_exception(e)
+            # Nadie más espera: evitar el aviso de excepción sin recuperar
+            futuro.exception()
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado, False
+        finally:
+            del self._en_curso[clave]
+
+    def stats(self):
+        """Cálculos ejecutados, resultados compartidos y claves en curso"""
+        return {
+            "lideres": self.lideres,
+            "compartidas": self.compartidas,
+            "en_curso": len(self._en_curso)
+        }
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Google Sheets falso para tests y benchmarks: una worksheet en memoria que resuelve
+rangos A1 como la API y un cliente de gspread que la sirve.
+"""
+
+import time
+from unittest.mock import Mock
+
+
+def _sin_vacias_al_final(valores):
+    fin = len(valores)
+    while fin and valores[fin - 1] in ('', [], None):
+        fin -= 1
+    return valores[:fin]
+
+
+class HojaFalsa:
+    """Worksheet de gspread en memoria: resuelve rangos A1 sobre las filas de la hoja
+
+    Como la API de Sheets, recorta las celdas y filas vacías al final de cada
+    rango y con major_dimension='COLUMNS' devuelve una lista por columna.
+    Registra en llamadas cada (método, rango) pedido.
+    """
+
+    def __init__(self, filas_hoja, latencia=0.0):
+        self.filas = filas_hoja
+        self.latencia = latencia
+        self.col_count = max((len(fila) for fila in filas_hoja), default=0)
+        self.llamadas = []
+
+    def _recortar(self, rango, major_dimension=None):
+        from gspread.utils import a1_range_to_grid_range
+        grilla = a1_range_to_grid_range(rango)
+        c0 = grilla.get('startColumnIndex', 0)
+        c1 = grilla.get('endColumnIndex', self.col_count)
+        filas = [
+            list(fila[c0:c1]) + [''] * (c1 - c0 - len(fila[c0:c1]))
+            for fila in self.filas[grilla.get('startRowIndex', 0):grilla.get('endRowIndex')]
+        ]
+        if major_dimension == 'COLUMNS':
+            filas = [list(columna) for columna in zip(*filas)]
+        return _sin_vacias_al_final([_sin_vacias_al_final(fila) for fila in filas])
+
+    def get(self, rango, major_dimension=None, **kwargs):
+        time.sleep(self.latencia)
+        self.llamadas.append(("get", rango))
+        return self._recortar(rango, major_dimension)
+
+    def batch_get(self, rangos, major_dimension=None, **kwargs):
+        time.sleep(self.latencia)
+        rangos = list(rangos)
+        self.llamadas.append(("batch_get", rangos))
+        return [self._recortar(rango, major_dimension) for rango in rangos]
+
+
+def cliente_gspread_falso(filas_hoja, latencia=0.0, modificado="2024-01-01T00:00:00.000Z"):
+    """Objeto que reemplaza a gspread.authorize(...): open_by_key().worksheet() -> HojaFalsa
+
+    latencia (segundos) simula lo que tarda Google Sheets en responder cada lectura y
+    modificado es la fecha de modificación del libro que informa Drive.
+    """
+    libro = Mock()
+    libro.worksheet.return_value = HojaFalsa(filas_hoja, latencia)
+    cliente = Mock()
+    cliente.open_by_key.return_value = libro
+    cliente.get_file_drive_metadata.return_value = {"modifiedTime": modificado}
+    return cliente
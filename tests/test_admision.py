@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests unitarios para el control de admisión por artículos en vuelo
+"""
+
+import asyncio
+import pytest
+
+from src.admision import ControlAdmision, AdmisionRechazada
+
+class TestControlAdmision:
+    """Tests para ControlAdmision"""
+    
+    def test_admite_sin_esperar_mientras_hay_cupo(self):
+        """Test: Órdenes que caben en el cupo entran sin espera y lo liberan al salir"""
+        control = ControlAdmision(max_articulos=10, espera_max=0.01, cola_max=5)
+        
+        async def escenario():
+            async with control.admitir(4) as espera_a:
+                async with control.admitir(6) as espera_b:
+                    en_vuelo = control.articulos_en_vuelo
+            return espera_a, espera_b, en_vuelo
+        
+        espera_a, espera_b, en_vuelo = asyncio.run(escenario())
+        
+        assert (espera_a, espera_b) == (0.0, 0.0)
+        assert en_vuelo == 10
+        assert control.articulos_en_vuelo == 0
+        assert control.admitidas == 2
+    
+    def test_espera_breve_y_entra_al_liberarse_cupo(self):
+        """Test: Una orden que no cabe espera en la cola y entra cuando otra termina"""
+        control = ControlAdmision(max_articulos=10, espera_max=1.0, cola_max=5)
+        
+        async def escenario():
+            await control.entrar(8)
+            esperando = asyncio.ensure_future(control.entrar(5))
+            await asyncio.sleep(0.01)
+            assert control.stats()["en_espera"] == 1
+            control.salir(8)
+            return await esperando
+        
+        espera = asyncio.run(escenario())
+        
+        assert espera > 0
+        assert control.articulos_en_vuelo == 5
+        assert control.stats()["en_espera"] == 0
+    
+    def test_rechaza_al_agotar_la_espera(self):
+        """Test: Sin cupo dentro de espera_max la orden se rechaza y sale de la cola"""
+        control = ControlAdmision(max_articulos=10, espera_max=0.01, cola_max=5)
+        
+        async def escenario():
+            await control.entrar(10)
+            with pytest.raises(AdmisionRechazada) as error:
+                await control.entrar(1)
+            return error.value
+        
+        error = asyncio.run(escenario())
+        
+        assert error.motivo == "espera_agotada"
+        assert control.rechazadas == {"cola_llena": 0, "espera_agotada": 1}
+        assert control.stats()["en_espera"] == 0
+        assert control.articulos_en_vuelo == 10
+    
+    def test_rechaza_de_inmediato_con_la_cola_llena(self):
+        """Test: Con cola_max órdenes esperando, la siguiente se rechaza sin esperar"""
+        control = ControlAdmision(max_articulos=10, espera_max=1.0, cola_max=1)
+        
+        async def escenario():
+            await control.entrar(10)
+            esperando = asyncio.ensure_future(control.entrar(1))
+            await asyncio.sleep(0)
+            with pytest.raises(AdmisionRechazada) as error:
+                await control.entrar(1)
+            control.salir(10)
+            await esperando
+            return error.value
+        
+        error = asyncio.run(escenario())
+        
+        assert error.motivo == "cola_llena"
+        assert control.rechazadas["cola_llena"] == 1
+        assert control.articulos_en_vuelo == 1
+    
+    def test_orden_mayor_que_el_cupo_entra_sola(self):
+        """Test: Una orden con más artículos que el límite se admite cuando no hay otras en vuelo"""
+        control = ControlAdmision(max_articulos=10, espera_max=0.01, cola_max=5)
+        
+        async def escenario():
+            async with control.admitir(500):
+                lleno = control.articulos_en_vuelo
+                with pytest.raises(AdmisionRechazada):
+                    await control.entrar(1)
+            return lleno
+        
+        assert asyncio.run(escenario()) == 10
+        assert control.articulos_en_vuelo == 0
+    
+    def test_respeta_el_orden_de_llegada(self):
+        """Test: Una orden pequeña no se adelanta a una grande que espera antes que ella"""
+        control = ControlAdmision(max_articulos=10, espera_max=1.0, cola_max=5)
+        admitidas = []
+        
+        async def esperar(nombre, articulos):
+            await control.entrar(articulos)
+            admitidas.append(nombre)
+        
+        async def escenario():
+            await control.entrar(6)
+            grande = asyncio.ensure_future(esperar("grande", 8))
+            await asyncio.sleep(0)
+            pequena = asyncio.ensure_future(esperar("pequena", 2))
+            await asyncio.sleep(0.01)
+            # La pequeña cabría (6 + 2 <= 10) pero espera detrás de la grande
+            assert admitidas == []
+            control.salir(6)
+            await asyncio.gather(grande, pequena)
+        
+        asyncio.run(escenario())
+        
+        assert admitidas == ["grande", "pequena"]
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests unitarios para la persistencia e índice del catálogo
+"""
+
+import json
+import pytest
+import numpy as np
+import pandas as pd
+
+from src.catalogo import IndiceCatalogo, guardar_snapshot, cargar_snapshot, codigos_faltantes
+
+CATALOGO_TEST = pd.DataFrame({
+    'Código SN': ['CN800069933', 'CN800069933', 'CN800069934'],
+    'Nº catálogo SN': ['14003793002', '14003793003', '14003793004'],
+    'Descripción': ['Producto 1', 'Producto ñandú', None]
+})
+
+class TestIndiceCatalogo:
+    """Tests para el índice de búsqueda particionado por cliente"""
+    
+    def test_buscar_articulo_existente(self):
+        """Test: Un artículo existente devuelve su fila"""
+        indice = IndiceCatalogo.desde_catalogo(CATALOGO_TEST)
+        assert indice.buscar('CN800069933', '14003793003') == 1
+        assert len(indice) == 3
+        assert indice.total_clientes == 2
+    
+    def test_buscar_articulo_inexistente(self):
+        """Test: Un artículo inexistente devuelve None sin lanzar excepción"""
+        indice = IndiceCatalogo.desde_catalogo(CATALOGO_TEST)
+        assert indice.buscar('CN800069933', '14003793004') is None
+        assert indice.buscar('CN000000000', '14003793002') is None
+    
+    def test_particion_por_cliente(self):
+        """Test: La partición contiene solo los artículos normalizados del cliente"""
+        catalogo = pd.DataFrame({
+            'Código SN': [' cn1 ', 'CN1', 'CN2'],
+            'Nº catálogo SN': ['AbC', ' x ', 'abc']
+        })
+        indice = IndiceCatalogo.desde_catalogo(catalogo)
+        assert set(indice.particion('CN1')) == {'abc', 'x'}
+        assert indice.particion('CN3') is None
+    
+    def test_clave_duplicada_usa_primera_fila(self):
+        """Test: Con claves duplicadas se devuelve una sola fila (la primera)"""
+        catalogo = pd.DataFrame({
+            'Código SN': ['CN1', 'CN1', 'CN1'],
+            'Nº catálogo SN': ['a', 'b', 'a']
+        })
+        indice = IndiceCatalogo.desde_catalogo(catalogo)
+        assert indice.buscar('CN1', 'a') == 0
+        assert len(indice) == 2
+        assert indice.claves_ejemplo(5) == ['CN1|a', 'CN1|b']
+
+class TestIndiceSnapshot:
+    """Tests para el índice que busca sobre el snapshot mapeado"""
+    
+    CATALOGO = pd.DataFrame({
+        'Código SN': [' cn1 ', 'CN2', 'CN1', 'CN1', 'CN3', 'CN1'],
+        'Nº catálogo SN': ['AbC', 'ñandú', 'x', 'abc', 'b', 'a'],
+    })
+    
+    def _indices(self, tmp_path):
+        ruta = str(tmp_path / "catalogo.npy")
+        guardar_snapshot(self.CATALOGO, ruta)
+        return cargar_snapshot(ruta, mapeado=True), IndiceCatalogo.desde_catalogo(self.CATALOGO)
+    
+    def test_busca_igual_que_el_indice_en_memoria(self, tmp_path):
+        """Test: Mismas filas, claves y clientes que el índice construido desde el catálogo"""
+        mapeado, esperado = self._indices(tmp_path)
+        
+        assert mapeado.mapeado and not esperado.mapeado
+        assert mapeado.filas == esperado.filas == 6
+        assert len(mapeado) == len(esperado) == 5
+        assert mapeado.total_clientes == esperado.total_clientes == 3
+        for cliente, codigo in [('CN1', 'abc'), ('CN1', 'x'), ('CN1', 'a'), ('CN2', 'ñandú'),
+                                ('CN3', 'b'), ('CN1', 'b'), ('CN9', 'abc'), ('CN1', 'abcdefghij')]:
+            assert mapeado.buscar(cliente, codigo) == esperado.buscar(cliente, codigo)
+        particion = mapeado.particion('CN1')
+        assert {codigo: particion.get(codigo) for codigo in particion} == esperado.particion('CN1')
+        assert mapeado.particion('CN9') is None
+        assert mapeado.claves_ejemplo(3) == esperado.claves_ejemplo(3)
+    
+    def test_codigos_faltantes(self, tmp_path):
+        """Test: codigos_faltantes da lo mismo con particiones mapeadas y dicts"""
+        mapeado, esperado = self._indices(tmp_path)
+        # 'abcd' es más largo que el código más largo del snapshot: no debe truncarse a 'abc'
+        codigos = ['abc', 'x', 'zz', 'abcd', '', 'a']
+        
+        assert codigos_faltantes(mapeado.particion('CN1'), codigos) == {'zz', 'abcd', ''}
+        assert codigos_faltantes(esperado.particion('CN1'), codigos) == {'zz', 'abcd', ''}
+        assert codigos_faltantes(None, ['a', 'a']) == {'a'}
+
+class TestSnapshot:
+    """Tests para guardar_snapshot / cargar_snapshot"""
+    
+    def test_guardar_y_cargar(self, tmp_path):
+        """Test: El índice cargado del snapshot es igual al construido desde el catálogo"""
+        catalogo = pd.DataFrame({
+            'Código SN': [' cn1 ', 'CN2', 'CN1', 'CN1'],
+            'Nº catálogo SN': ['AbC', 'ñandú', 'x', 'abc'],
+            'Descripción': ['Producto 1', 'Producto 2', None, 'Duplicado']
+        })
+        ruta = str(tmp_path / "catalogo.npy")
+        guardar_snapshot(catalogo, ruta)
+        
+        indice = cargar_snapshot(ruta)
+        esperado = IndiceCatalogo.desde_catalogo(catalogo)
+        
+        assert indice.filas == 4
+        assert len(indice) == len(esperado) == 3
+        assert indice.particion('CN1') == esperado.particion('CN1') == {'abc': 0, 'x': 2}
+        assert indice.buscar('CN2', 'ñandú') == 1
+    
+    def test_snapshot_solo_guarda_claves(self, tmp_path):
+        """Test: Las columnas que no usa el índice no se persisten"""
+        ruta = str(tmp_path / "catalogo.npy")
+        guardar_snapshot(CATALOGO_TEST, ruta)
+        
+        datos = np.load(ruta, mmap_mode='r')
+        
+        assert datos.dtype.names == ('cliente', 'codigo', 'fila')
+        assert datos['codigo'].tolist() == [b'14003793002', b'14003793003', b'14003793004']
+        assert datos['fila'].tolist() == [0, 1, 2]
+    
+    def test_snapshot_guarda_version_del_contenido(self, tmp_path):
+        """Test: El hash y la fecha de modificación guardados se devuelven con los metadatos"""
+        ruta = str(tmp_path / "catalogo.npy")
+        guardar_snapshot(CATALOGO_TEST, ruta, huella="abc123", modificado="2024-01-01T00:00:00.000Z")
+        
+        indice, meta = cargar_snapshot(ruta, con_metadatos=True)
+        
+        assert indice.filas == 3
+        assert meta["huella"] == "abc123"
+        assert meta["modificado"] == "2024-01-01T00:00:00.000Z"
+        assert cargar_snapshot(str(tmp_path / "no_existe.npy"), con_metadatos=True) == (None, {})
+    
+    def test_snapshot_inexistente(self, tmp_path):
+        """Test: Sin snapshot se devuelve None"""
+        assert cargar_snapshot(str(tmp_path / "no_existe.npy")) is None
+        assert cargar_snapshot('') is None
+    
+    def test_snapshot_inconsistente(self, tmp_path):
+        """Test: Metadatos que no coinciden con los datos invalidan el snapshot"""
+        ruta = str(tmp_path / "catalogo.npy")
+        guardar_snapshot(CATALOGO_TEST, ruta)
+        with open(f"{ruta}.json", encoding='utf-8') as f:
+            meta = json.load(f)
+        meta["claves"] = 99
+        with open(f"{ruta}.json", 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        
+        assert cargar_snapshot(ruta) is None
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests unitarios para las métricas en formato Prometheus
+"""
+
+import asyncio
+
+from src.metricas import RegistroMetricas, MiddlewareMetricas, formatear_server_timing
+
+class TestRegistroMetricas:
+    """Tests para contadores, histogramas y medidores"""
+    
+    def test_contador_con_etiquetas(self):
+        """Test: El contador acumula por combinación de etiquetas"""
+        registro = RegistroMetricas()
+        contador = registro.contador("pruebas_total", "Pruebas", ("resultado",))
+        contador.inc("ok")
+        contador.inc("ok")
+        contador.inc("error")
+        
+        texto = registro.exponer()
+        
+        assert "# TYPE pruebas_total counter" in texto
+        assert 'pruebas_total{resultado="ok"} 2' in texto
+        assert 'pruebas_total{resultado="error"} 1' in texto
+    
+    def test_histograma_acumulativo(self):
+        """Test: Los buckets son acumulativos y terminan en +Inf con suma y cantidad"""
+        registro = RegistroMetricas()
+        histograma = registro.histograma("latencia_segundos", "Latencia", ("etapa",), buckets=(0.1, 1.0))
+        histograma.observar(0.05, "lookup")
+        histograma.observar(0.5, "lookup")
+        histograma.observar(5.0, "lookup")
+        
+        lineas = registro.exponer().splitlines()
+        
+        assert 'latencia_segundos_bucket{etapa="lookup",le="0.1"} 1' in lineas
+        assert 'latencia_segundos_bucket{etapa="lookup",le="1.0"} 2' in lineas
+        assert 'latencia_segundos_bucket{etapa="lookup",le="+Inf"} 3' in lineas
+        assert 'latencia_segundos_sum{etapa="lookup"} 5.55' in lineas
+        assert 'latencia_segundos_count{etapa="lookup"} 3' in lineas
+    
+    def test_medidor_calculado_al_exponer(self):
+        """Test: El medidor llama a su función en cada exposición y omite None"""
+        registro = RegistroMetricas()
+        valores = [None, 7]
+        registro.medidor("catalogo_registros", "Filas", lambda: valores.pop(0))
+        
+        assert not [l for l in registro.exponer().splitlines() if not l.startswith("#")]
+        assert "catalogo_registros 7" in registro.exponer().splitlines()
+    
+    def test_escapa_valores_de_etiquetas(self):
+        """Test: Comillas y barras en etiquetas se escapan"""
+        registro = RegistroMetricas()
+        registro.contador("c_total", "C", ("ruta",)).inc('a"b\\c')
+        
+        assert 'c_total{ruta="a\\"b\\\\c"} 1' in registro.exponer()
+
+class TestMiddlewareMetricas:
+    """Tests para el middleware ASGI de métricas"""
+    
+    def test_cuenta_solicitud_hasta_el_ultimo_fragmento(self):
+        """Test: Registra código y duración y deja el instante de llegada en el scope"""
+        registro = RegistroMetricas()
+        solicitudes = registro.contador("s_total", "S", ("endpoint", "codigo"))
+        duracion = registro.histograma("d_segundos", "D", ("endpoint",))
+        vistos = {}
+        
+        async def app(scope, receive, send):
+            vistos["inicio"] = scope["state"]["inicio_solicitud"]
+            await send({"type": "http.response.start", "status": 404, "headers": []})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+        
+        async def send(mensaje):
+            pass
+        
+        middleware = MiddlewareMetricas(app, solicitudes, duracion)
+        asyncio.run(middleware({"type": "http", "path": "/x"}, receive, send))
+        
+        assert "inicio" in vistos
+        assert solicitudes.valor("desconocido", "404") == 1
+        assert duracion.cantidad("desconocido") == 1
+    
+    def test_server_timing_agrega_total(self):
+        """Test: Con server_timing agrega 'total' conservando las etapas del endpoint"""
+        registro = RegistroMetricas()
+        enviados = []
+        
+        async def app(scope, receive, send):
+            await send({
+                "type": "http.response.start", "status": 200,
+                "headers": [(b"server-timing", formatear_server_timing({"lookup": 0.0015}).encode())]
+            })
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+        
+        async def send(mensaje):
+            enviados.append(mensaje)
+        
+        middleware = MiddlewareMetricas(
+            app, registro.contador("s_total", "S", ("endpoint", "codigo")),
+            registro.histograma("d_segundos", "D", ("endpoint",)), server_timing=True
+        )
+        asyncio.run(middleware({"type": "http", "path": "/x"}, receive, send))
+        
+        encabezados = dict(enviados[0]["headers"])
+        etapas = encabezados[b"server-timing"].decode().split(", ")
+        assert etapas[0] == "lookup;dur=1.500"
+        assert etapas[1].startswith("total;dur=")
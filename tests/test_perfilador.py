@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Tests unitarios para el perfilador por muestreo
+"""
+
+import threading
+import time
+import pytest
+
+from src.perfilador import PerfiladorMuestreo, PerfiladorOcupado
+
+def _trabajo_de_prueba(detener):
+    while not detener.is_set():
+        sum(range(1000))
+
+class TestPerfiladorMuestreo:
+    """Tests para PerfiladorMuestreo"""
+    
+    def test_perfil_collapsed_filtrado_por_funcion(self):
+        """Test: Devuelve pilas 'hilo;raíz;...;hoja N' solo de las funciones pedidas"""
+        detener = threading.Event()
+        hilo = threading.Thread(target=_trabajo_de_prueba, args=(detener,), name="trabajo")
+        hilo.start()
+        try:
+            perfil, muestras = PerfiladorMuestreo().perfilar(
+                0.2, intervalo=0.005, funciones={"_trabajo_de_prueba"}
+            )
+        finally:
+            detener.set()
+            hilo.join()
+        
+        lineas = perfil.splitlines()
+        assert muestras > 0
+        assert lineas
+        for linea in lineas:
+            pila, cuenta = linea.rsplit(" ", 1)
+            assert pila.startswith("trabajo;")
+            assert "_trabajo_de_prueba (test_perfilador.py:" in pila
+            assert int(cuenta) > 0
+    
+    def test_duracion_acotada(self):
+        """Test: La duración pedida se limita a max_segundos"""
+        inicio = time.monotonic()
+        PerfiladorMuestreo(max_segundos=0.1).perfilar(60, intervalo=0.01)
+        assert time.monotonic() - inicio < 1
+    
+    def test_un_perfil_a_la_vez(self):
+        """Test: Un segundo perfil mientras corre otro lanza PerfiladorOcupado"""
+        perfilador = PerfiladorMuestreo()
+        hilo = threading.Thread(target=perfilador.perfilar, args=(0.3,))
+        hilo.start()
+        try:
+            while not perfilador.en_curso:
+                time.sleep(0.001)
+            with pytest.raises(PerfiladorOcupado):
+                perfilador.perfilar(0.1)
+        finally:
+            hilo.join()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Tests unitarios para el pool acotado de validación
+"""
+
+import asyncio
+import threading
+import pytest
+
+from src.pool_validacion import PoolValidacion, PoolSaturado
+
+class TestPoolValidacion:
+    """Tests para PoolValidacion"""
+    
+    def test_ejecutar_devuelve_resultado_en_otro_hilo(self):
+        """Test: La función corre en un hilo del pool y devuelve su resultado"""
+        pool = PoolValidacion(workers=2, cola_max=2)
+        try:
+            hilo = asyncio.run(pool.ejecutar(lambda: threading.current_thread().name))
+        finally:
+            pool.cerrar()
+        
+        assert hilo.startswith("validacion")
+        assert pool.stats()["completadas"] == 1
+    
+    def test_rechaza_con_pool_y_cola_llenos(self):
+        """Test: Con todos los hilos ocupados y la cola llena se lanza PoolSaturado"""
+        pool = PoolValidacion(workers=1, cola_max=1)
+        liberar = threading.Event()
+        
+        async def escenario():
+            ocupadas = [asyncio.ensure_future(pool.ejecutar(liberar.wait)) for _ in range(2)]
+            await asyncio.sleep(0)
+            with pytest.raises(PoolSaturado):
+                await pool.ejecutar(liberar.wait)
+            stats = pool.stats()
+            liberar.set()
+            await asyncio.gather(*ocupadas)
+            return stats
+        
+        try:
+            stats = asyncio.run(escenario())
+        finally:
+            pool.cerrar()
+        
+        assert stats["en_ejecucion"] == 1
+        assert stats["en_cola"] == 1
+        assert stats["rechazadas"] == 1
+        assert pool.stats()["completadas"] == 2
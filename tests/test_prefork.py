@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests para el modo multi-worker (prefork) de run.py --workers
+"""
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import textwrap
+import time
+
+import httpx
+import pytest
+
+from src.prefork import _crear_socket, _marca_snapshot
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class TestPrefork:
+    """Tests para servir_prefork y sus funciones auxiliares"""
+    
+    def test_socket_compartido_es_heredable(self):
+        """Test: El socket de escucha se hereda en los workers creados con fork"""
+        sock = _crear_socket("127.0.0.1", 0)
+        try:
+            assert sock.get_inheritable()
+            assert sock.getsockname()[1] > 0
+        finally:
+            sock.close()
+    
+    def test_marca_snapshot_cambia_al_reescribir(self, tmp_path):
+        """Test: La marca del snapshot es None sin archivo y cambia al reescribir los metadatos"""
+        ruta = str(tmp_path / "catalogo.npy")
+        assert _marca_snapshot(ruta) is None
+        with open(f"{ruta}.json", "w") as f:
+            f.write("{}")
+        primera = _marca_snapshot(ruta)
+        os.utime(f"{ruta}.json", ns=(primera + 10**9, primera + 10**9))
+        
+        assert primera is not None
+        assert _marca_snapshot(ruta) != primera
+    
+    def _servir(self, tmp_path, peticiones=10):
+        """Levantar servir_prefork con 3 workers y Google Sheets falso; devuelve (respuestas de /health/ready, código)"""
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            puerto = s.getsockname()[1]
+        descargas = tmp_path / "descargas.txt"
+        credenciales = tmp_path / "credentials.json"
+        credenciales.write_text("{}")
+        script = tmp_path / "servir.py"
+        script.write_text(textwrap.dedent(f"""
+            import sys
+            from unittest.mock import patch
+            from tests.sheets_falso import HojaFalsa, cliente_gspread_falso
+            
+            class HojaContada(HojaFalsa):
+                def batch_get(self, *args, **kwargs):
+                    with open({str(descargas)!r}, "a") as f:
+                        f.write("x")
+                    return super().batch_get(*args, **kwargs)
+            
+            cliente = cliente_gspread_falso([])
+            cliente.open_by_key.return_value.worksheet.return_value = HojaContada(
+                [['Código SN', 'Nº catálogo SN'], ['CN800069933', '14003793002']]
+            )
+            with patch('gspread.authorize', return_value=cliente), \\
+                 patch('google.oauth2.service_account.Credentials.from_service_account_file'):
+                from src.prefork import servir_prefork
+                sys.exit(servir_prefork("127.0.0.1", {puerto}, 3, "warning"))
+        """))
+        entorno = dict(os.environ, **{
+            'GOOGLE_DRIVE_FILE_ID': 'test_file_id',
+            'GOOGLE_SHEET_RANGE': 'Hoja1!A:Z',
+            'GOOGLE_APPLICATION_CREDENTIALS': str(credenciales),
+            'CATALOGO_RECARGA_SEGUNDOS': '0',
+            'CATALOGO_SNAPSHOT_PATH': str(tmp_path / "catalogo.npy"),
+            'PYTHONPATH': RAIZ,
+            'LOG_LEVEL': 'WARNING'
+        })
+        proceso = subprocess.Popen(
+            [sys.executable, str(script)], cwd=str(tmp_path), env=entorno,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            respuestas = []
+            limite = time.monotonic() + 30
+            with httpx.Client(base_url=f"http://127.0.0.1:{puerto}", timeout=5) as cliente:
+                while len(respuestas) < peticiones and time.monotonic() < limite:
+                    try:
+                        respuestas.append(cliente.get("/health/ready"))
+                    except httpx.TransportError:
+                        time.sleep(0.05)
+        finally:
+            proceso.send_signal(signal.SIGTERM)
+            codigo = proceso.wait(timeout=15)
+        return respuestas, codigo
+    
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requiere os.fork")
+    def test_workers_comparten_una_sola_descarga(self, tmp_path):
+        """Test: Con varios workers el catálogo se descarga una vez y todos responden"""
+        respuestas, codigo = self._servir(tmp_path)
+        
+        assert len(respuestas) == 10
+        assert all(r.status_code == 200 for r in respuestas)
+        assert (tmp_path / "descargas.txt").read_text() == "x"
+        assert codigo == 0
+    
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requiere os.fork")
+    def test_reinicio_desde_snapshot_no_descarga_ni_republica(self, tmp_path):
+        """Test: Al reiniciar con el snapshot vigente no se descarga la hoja ni se publica otra versión"""
+        self._servir(tmp_path, peticiones=1)
+        marca = os.stat(tmp_path / "catalogo.npy.json").st_mtime_ns
+        
+        respuestas, codigo = self._servir(tmp_path)
+        
+        assert len(respuestas) == 10
+        assert all(r.json()["catalogo_version"] == 1 for r in respuestas)
+        assert (tmp_path / "descargas.txt").read_text() == "x"
+        assert os.stat(tmp_path / "catalogo.npy.json").st_mtime_ns == marca
+        assert codigo == 0
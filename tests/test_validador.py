@@ -8,6 +8,8 @@ import pandas as pd
 from unittest.mock import Mock, patch, MagicMock
 import sys
 import os
+import threading
+from datetime import datetime
 
 # Agregar el directorio actual al path para importar el módulo
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -16,8 +18,13 @@ from src.validador import (
     ItemModel, 
     CompradorModel, 
     OrdenModel, 
-    ValidadorOrdenesCompra
+    ValidadorOrdenesCompra,
+    CacheManager,
+    cache_manager
 )
+from src.catalogo import IndiceCatalogo
+from src.vuelo_unico import VueloUnico
+from tests.sheets_falso import HojaFalsa
 
 # Datos de prueba
 CATALOGO_TEST = pd.DataFrame({
@@ -27,6 +34,18 @@ CATALOGO_TEST = pd.DataFrame({
     'Precio': [100.0, 200.0, 300.0]
 })
 
+def _mock_cliente_sheets(filas, modificado=None):
+    """Crear un cliente de gspread falso que devuelve las filas indicadas
+    
+    modificado simula la fecha de modificación del libro en Drive (None: desconocida).
+    """
+    mock_sheet = Mock()
+    mock_sheet.worksheet.return_value = HojaFalsa(filas)
+    mock_gc = Mock()
+    mock_gc.open_by_key.return_value = mock_sheet
+    mock_gc.get_file_drive_metadata.return_value = {"modifiedTime": modificado}
+    return mock_gc
+
 class TestItemModel:
     """Tests para el modelo ItemModel"""
     
@@ -117,44 +136,157 @@ class TestOrdenModel:
                 items=[]
             )
 
+class TestCacheManager:
+    """Tests para el cache LRU"""
+    
+    def test_evicta_el_menos_usado(self):
+        """Test: Al llenarse se elimina la entrada con el acceso más antiguo"""
+        cache = CacheManager(max_size=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+    
+    def test_actualizar_clave_no_evicta(self):
+        """Test: Reescribir una clave existente no cuenta como entrada nueva"""
+        cache = CacheManager(max_size=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("a", 10)
+        
+        assert cache.get("a") == 10
+        assert cache.get("b") == 2
+    
+    @patch('src.validador.time.monotonic')
+    def test_expira_por_inactividad(self, mock_monotonic):
+        """Test: Una entrada sin accesos durante ttl_seconds expira"""
+        cache = CacheManager(max_size=10, ttl_seconds=60)
+        mock_monotonic.return_value = 0
+        cache.set("a", 1)
+        cache.set("b", 2)
+        mock_monotonic.return_value = 50
+        assert cache.get("a") == 1
+        
+        mock_monotonic.return_value = 100
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        
+        # Las entradas expiradas se purgan desde el frente al insertar
+        mock_monotonic.return_value = 200
+        cache.set("c", 3)
+        assert list(cache.cache) == ["c"]
+    
+    def test_stats_cuenta_hits_misses_y_evictions(self):
+        """Test: Las estadísticas reflejan aciertos reales, no el llenado del cache"""
+        cache = CacheManager(max_size=2, ttl_seconds=60)
+        cache.set("a", 1, clase="positiva")
+        cache.set("b", 2, clase="negativa")
+        cache.get("a")
+        cache.get("a")
+        cache.get("zzz")
+        cache.set("c", 3, clase="positiva")
+        
+        stats = cache.stats()
+        
+        assert stats["hits"] == 2
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == pytest.approx(2 / 3)
+        assert stats["inserts"] == 3
+        assert stats["evictions"] == 1
+        assert stats["expirations"] == 0
+        assert stats["avg_lookup_us"] > 0
+        assert stats["por_clase"] == {
+            "positiva": {"entradas": 2, "hits": 2, "inserts": 2},
+            "negativa": {"entradas": 0, "hits": 0, "inserts": 1}
+        }
+    
+    def test_nueva_generacion_invalida_entradas(self):
+        """Test: Cambiar de generación invalida todo lo guardado antes"""
+        cache = CacheManager(max_size=10, ttl_seconds=60)
+        cache.nueva_generacion(1)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        
+        cache.nueva_generacion(2)
+        
+        assert cache.get("a") is None
+        cache.set("c", 3)
+        assert list(cache.cache) == ["c"]
+        assert cache.get("c") == 3
+        stats = cache.stats()
+        assert stats["invalidations"] == 2
+        assert stats["expirations"] == 0
+        assert stats["generacion"] == 2
+    
+    def test_max_peso_evicta_y_omite_entradas_pesadas(self):
+        """Test: La suma de pesos no supera max_peso y una entrada más pesada no se guarda"""
+        cache = CacheManager(max_size=10, ttl_seconds=60, max_peso=100)
+        cache.set("a", 1, peso=60)
+        cache.set("b", 2, peso=30)
+        cache.set("c", 3, peso=20)
+        cache.set("d", 4, peso=101)
+        
+        assert list(cache.cache) == ["b", "c"]
+        stats = cache.stats()
+        assert stats["peso_total"] == 50
+        assert stats["evictions"] == 1
+        assert stats["omitidas"] == 1
+        cache.clear()
+        assert cache.stats()["peso_total"] == 0
+    
+    @patch('src.validador.time.monotonic')
+    def test_stats_cuenta_expiraciones(self, mock_monotonic):
+        """Test: Una entrada expirada cuenta como expiración y como miss"""
+        cache = CacheManager(max_size=10, ttl_seconds=60)
+        mock_monotonic.return_value = 0
+        cache.set("a", 1)
+        mock_monotonic.return_value = 100
+        
+        assert cache.get("a") is None
+        stats = cache.stats()
+        assert stats["expirations"] == 1
+        assert stats["misses"] == 1
+        assert stats["por_clase"]["general"]["entradas"] == 0
+
 class TestValidadorOrdenesCompra:
     """Tests para la clase ValidadorOrdenesCompra"""
     
-    @patch('validador.gspread.authorize')
-    @patch('validador.Credentials.from_service_account_file')
-    @patch('validador.os.path.exists')
-    @patch('validador.os.getenv')
-    def setup_method(self, method, mock_getenv, mock_exists, mock_credentials, mock_gspread):
+    @patch('gspread.authorize')
+    @patch('google.oauth2.service_account.Credentials.from_service_account_file')
+    @patch('src.validador.os.path.exists')
+    def setup_method(self, method, mock_exists, mock_credentials, mock_gspread):
         """Setup para cada test"""
-        # Mock de variables de entorno
-        mock_getenv.side_effect = lambda x: {
-            'GOOGLE_DRIVE_FILE_ID': 'test_file_id',
-            'GOOGLE_SHEET_RANGE': 'Hoja1!A:Z',
-            'GOOGLE_APPLICATION_CREDENTIALS': 'credentials.json'
-        }.get(x)
+        # Configuración de Google Sheets (vigente también en las recargas del test)
+        self.configuracion = patch.multiple(
+            'src.validador',
+            GOOGLE_DRIVE_FILE_ID='test_file_id',
+            GOOGLE_SHEET_RANGE='Hoja1!A:Z',
+            GOOGLE_APPLICATION_CREDENTIALS='credentials.json',
+            CATALOGO_SNAPSHOT_PATH=''
+        )
+        self.configuracion.start()
         
         # Mock de archivo de credenciales
         mock_exists.return_value = True
         
         # Mock de Google Sheets
-        mock_worksheet = Mock()
-        mock_worksheet.get.return_value = [
+        mock_gspread.return_value = _mock_cliente_sheets([
             ['Código SN', 'Nº catálogo SN', 'Descripción', 'Precio'],
             ['CN800069933', '14003793002', 'Producto 1', '100.0'],
             ['CN800069933', '14003793003', 'Producto 2', '200.0']
-        ]
-        
-        mock_sheet = Mock()
-        mock_sheet.worksheet.return_value = mock_worksheet
+        ], modificado="2024-01-01T00:00:00.000Z")
         
-        mock_gc = Mock()
-        mock_gc.open_by_key.return_value = mock_sheet
-        
-        mock_gspread.return_value = mock_gc
-        
-        # Crear instancia del validador
+        # Crear instancia del validador con el cache de órdenes vacío
+        cache_manager.clear()
         self.validador = ValidadorOrdenesCompra()
     
+    def teardown_method(self, method):
+        self.configuracion.stop()
+    
     def test_validar_orden_todos_encontrados(self):
         """Test: Validar orden donde todos los artículos existen"""
         orden_json = {
@@ -246,6 +378,474 @@ class TestValidadorOrdenesCompra:
         assert resultado["TODOS_LOS_ARTICULOS_EXISTEN"] == False
         assert len(resultado["articulos_que_NO_existen"]) == 1
         assert "CN800069999" in resultado["articulos_que_NO_existen"][0]["motivo"]
+    
+    def test_validar_orden_normaliza_codigos(self):
+        """Test: Códigos con espacios, mayúsculas o repetidos se resuelven igual"""
+        orden_json = {
+            "comprador": {"nit": " cn800069933 "},
+            "orden_compra": "OC-2024-003",
+            "items": [
+                {
+                    "codigo": codigo,
+                    "descripcion": "Producto Test",
+                    "cantidad": 1,
+                    "precio_unitario": 10.0,
+                    "precio_total": 10.0,
+                    "fecha_entrega": "2024-01-15"
+                }
+                for codigo in (" 14003793002 ", "14003793003", "14003793002")
+            ]
+        }
+        
+        resultado = self.validador.validar_orden(orden_json)
+        
+        assert resultado["TODOS_LOS_ARTICULOS_EXISTEN"] == True
+        assert [a["codigo"] for a in resultado["articulos_listos_para_sap"]] == [
+            " 14003793002 ", "14003793003", "14003793002"
+        ]
+    
+    def test_validar_orden_cliente_desconocido_falla_todos(self):
+        """Test: Un NIT sin partición en el catálogo marca todos los artículos como faltantes"""
+        orden_json = {
+            "comprador": {"nit": "CN800069999"},
+            "orden_compra": "OC-2024-002",
+            "items": [
+                {
+                    "codigo": codigo,
+                    "descripcion": "Producto Test",
+                    "cantidad": 1,
+                    "precio_unitario": 10.0,
+                    "precio_total": 10.0,
+                    "fecha_entrega": "2024-01-15"
+                }
+                for codigo in ("14003793002", "14003793003")
+            ]
+        }
+        
+        resultado = self.validador.validar_orden(orden_json)
+        
+        assert resultado["resumen"]["articulos_faltantes"] == 2
+        assert resultado["resumen"]["porcentaje_exito"] == 0.0
+        assert [a["motivo"] for a in resultado["articulos_que_NO_existen"]] == [
+            "La combinación Cliente [CN800069999] + Artículo [14003793002] NO existe en el catálogo",
+            "La combinación Cliente [CN800069999] + Artículo [14003793003] NO existe en el catálogo"
+        ]
+
+    def test_recargar_catalogo_publica_nueva_version(self):
+        """Test: La recarga reemplaza el índice y sube la versión del catálogo"""
+        version_anterior = self.validador.version_catalogo
+        filas = [
+            ['Código SN', 'Nº catálogo SN', 'Descripción', 'Precio'],
+            ['CN800069933', '14003793002', 'Producto 1', '100.0'],
+            ['CN800069933', '14003793077', 'Producto Nuevo', '700.0']
+        ]
+        with patch.object(self.validador, '_cliente_gspread', _mock_cliente_sheets(filas)):
+            assert self.validador.recargar_catalogo() is True
+        
+        assert self.validador.version_catalogo == version_anterior + 1
+        assert cache_manager.generacion == self.validador.version_catalogo
+        assert self.validador.indice_catalogo.buscar('CN800069933', '14003793077') is not None
+        assert self.validador.indice_catalogo.buscar('CN800069933', '14003793003') is None
+    
+    def test_validar_orden_repetida_usa_cache(self):
+        """Test: Un reenvío idéntico reutiliza el resultado hasta que cambia el catálogo"""
+        orden_json = {
+            "comprador": {"nit": "CN800069933"},
+            "orden_compra": "OC-2024-010",
+            "items": [{
+                "codigo": "14003793077",
+                "descripcion": "Producto Test",
+                "cantidad": 1,
+                "precio_unitario": 10.0,
+                "precio_total": 10.0,
+                "fecha_entrega": "2024-01-15"
+            }]
+        }
+        primero = self.validador.validar_orden(orden_json)
+        with patch.object(self.validador, '_construir_resultado') as mock_construir:
+            segundo = self.validador.validar_orden(orden_json)
+            mock_construir.assert_not_called()
+        
+        assert primero["TODOS_LOS_ARTICULOS_EXISTEN"] is False
+        assert {**segundo, "fecha_validacion": None} == {**primero, "fecha_validacion": None}
+        assert cache_manager.stats()["por_clase"]["negativa"]["hits"] == 1
+        
+        filas = [
+            ['Código SN', 'Nº catálogo SN', 'Descripción', 'Precio'],
+            ['CN800069933', '14003793077', 'Producto Nuevo', '700.0']
+        ]
+        with patch.object(self.validador, '_cliente_gspread', _mock_cliente_sheets(filas)):
+            assert self.validador.recargar_catalogo() is True
+        
+        assert self.validador.validar_orden(orden_json)["TODOS_LOS_ARTICULOS_EXISTEN"] is True
+    
+    def test_validar_orden_con_otros_datos_no_usa_cache(self):
+        """Test: Cambiar un dato que aparece en la respuesta (cantidad) produce otra clave"""
+        item = {
+            "codigo": "14003793002",
+            "descripcion": "Producto Test",
+            "cantidad": 1,
+            "precio_unitario": 10.0,
+            "precio_total": 10.0,
+            "fecha_entrega": "2024-01-15"
+        }
+        orden_json = {"comprador": {"nit": "CN800069933"}, "orden_compra": "OC-2024-012", "items": [item]}
+        hits = cache_manager.stats()["hits"]
+        self.validador.validar_orden(orden_json)
+        
+        resultado = self.validador.validar_orden({**orden_json, "items": [{**item, "cantidad": 5}]})
+        
+        assert resultado["articulos_listos_para_sap"][0]["cantidad"] == 5
+        assert cache_manager.stats()["hits"] == hits
+        assert cache_manager.stats()["peso_total"] == 2
+    
+    def test_recargar_catalogo_sin_cambios_omite_la_descarga(self):
+        """Test: Si la fecha de modificación en Drive no cambió, no se descarga la hoja"""
+        from src.validador import metrica_recargas, metrica_verificacion
+        version_anterior = self.validador.version_catalogo
+        omitidas = metrica_recargas.valor("sin_cambios")
+        verificaciones = metrica_verificacion.cantidad()
+        cliente = _mock_cliente_sheets([], modificado="2024-01-01T00:00:00.000Z")
+        with patch.object(self.validador, '_cliente_gspread', cliente):
+            assert self.validador.recargar_catalogo() is None
+        
+        assert cliente.open_by_key.return_value.worksheet.return_value.llamadas == []
+        assert self.validador.version_catalogo == version_anterior
+        assert self.validador.ultima_verificacion is not None
+        assert metrica_recargas.valor("sin_cambios") == omitidas + 1
+        assert metrica_verificacion.cantidad() == verificaciones + 1
+    
+    def test_recargar_catalogo_contenido_identico_no_reconstruye(self):
+        """Test: Si Drive marca un cambio pero el rango es idéntico, no se reconstruye el índice"""
+        filas = [
+            ['Código SN', 'Nº catálogo SN', 'Descripción', 'Precio'],
+            ['CN800069933', '14003793002', 'Producto 1', '100.0'],
+            ['CN800069933', '14003793003', 'Producto 2', '200.0']
+        ]
+        version_anterior = self.validador.version_catalogo
+        with patch.object(self.validador, '_construir_indice') as mock_construir:
+            cliente = _mock_cliente_sheets(filas, modificado="2024-02-01T00:00:00.000Z")
+            with patch.object(self.validador, '_cliente_gspread', cliente):
+                assert self.validador.recargar_catalogo() is None
+            mock_construir.assert_not_called()
+            # La nueva fecha queda registrada: la siguiente recarga ni siquiera descarga
+            cliente = _mock_cliente_sheets(filas, modificado="2024-02-01T00:00:00.000Z")
+            with patch.object(self.validador, '_cliente_gspread', cliente):
+                assert self.validador.recargar_catalogo() is None
+            assert cliente.open_by_key.return_value.worksheet.return_value.llamadas == []
+        
+        assert self.validador.version_catalogo == version_anterior
+    
+    def test_recargar_catalogo_forzado_ignora_la_deteccion_de_cambios(self):
+        """Test: Con forzar=True se descarga y publica aunque nada haya cambiado"""
+        filas = [
+            ['Código SN', 'Nº catálogo SN', 'Descripción', 'Precio'],
+            ['CN800069933', '14003793002', 'Producto 1', '100.0'],
+            ['CN800069933', '14003793003', 'Producto 2', '200.0']
+        ]
+        version_anterior = self.validador.version_catalogo
+        cliente = _mock_cliente_sheets(filas, modificado="2024-01-01T00:00:00.000Z")
+        with patch.object(self.validador, '_cliente_gspread', cliente):
+            assert self.validador.recargar_catalogo(forzar=True) is True
+        
+        assert self.validador.version_catalogo == version_anterior + 1
+    
+    def test_recarga_descarga_solo_las_columnas_del_indice(self):
+        """Test: Se leen los encabezados una vez y después solo las columnas del índice"""
+        filas = [
+            ['Descripción', 'Código SN', 'Precio', 'Bodega', 'Nº catálogo SN', 'Notas'],
+            ['Producto 1', 'CN800069935', '1.0', 'B1', '14003793010', 'x'],
+            ['Producto 2', 'CN800069935', '2.0', 'B2', '', 'y'],
+            ['Producto 3', 'CN800069936', '3.0', 'B3', '14003793012']
+        ]
+        for modificado in ("2024-03-01T00:00:00.000Z", "2024-03-02T00:00:00.000Z"):
+            cliente = _mock_cliente_sheets(filas, modificado=modificado)
+            with patch.object(self.validador, '_cliente_gspread', cliente):
+                assert self.validador.recargar_catalogo(forzar=True) is True
+            hoja = cliente.open_by_key.return_value.worksheet.return_value
+            if modificado.startswith("2024-03-01"):
+                # Hoja nueva (columnas en otro lugar que en el setup): se vuelven a ubicar
+                assert ("get", "A1:Z1") in hoja.llamadas
+        
+        # La segunda recarga reutiliza las posiciones: una sola lectura de dos columnas
+        assert hoja.llamadas == [("batch_get", ["B1:B", "E1:E"])]
+        assert list(self.validador.catalogo.columns) == ['Código SN', 'Nº catálogo SN']
+        assert self.validador.total_registros == 3
+        assert self.validador.indice_catalogo.buscar('CN800069936', '14003793012') == 2
+    
+    def test_recarga_respeta_las_filas_del_rango_configurado(self):
+        """Test: Con un rango acotado en filas, cada columna se pide dentro de esos límites"""
+        filas = [
+            ['Título del reporte'],
+            ['Código SN', 'Nº catálogo SN', 'Descripción'],
+            ['CN800069933', '14003793020', 'Producto'],
+            ['CN800069933', '14003793021', 'Fuera del rango']
+        ]
+        cliente = _mock_cliente_sheets(filas, modificado="2024-04-01T00:00:00.000Z")
+        with patch('src.validador.GOOGLE_SHEET_RANGE', 'Hoja1!A2:C3'), \
+             patch.object(self.validador, '_cliente_gspread', cliente):
+            assert self.validador.recargar_catalogo() is True
+        
+        hoja = cliente.open_by_key.return_value.worksheet.return_value
+        assert hoja.llamadas[-1] == ("batch_get", ["A2:A3", "B2:B3"])
+        assert self.validador.total_registros == 1
+        assert self.validador.indice_catalogo.buscar('CN800069933', '14003793021') is None
+    
+    def test_recargar_catalogo_con_error_conserva_anterior(self):
+        """Test: Si la recarga falla se sigue usando el catálogo anterior"""
+        version_anterior = self.validador.version_catalogo
+        indice_anterior = self.validador.indice_catalogo
+        cliente = _mock_cliente_sheets([], modificado="2024-05-01T00:00:00.000Z")
+        cliente.open_by_key.side_effect = Exception("Sheets no disponible")
+        with patch.object(self.validador, '_cliente_gspread', cliente):
+            assert self.validador.recargar_catalogo() is False
+            # El cliente que falló se descarta: la siguiente recarga vuelve a autorizar
+            assert self.validador._cliente_gspread is None
+        
+        assert self.validador.version_catalogo == version_anterior
+        assert self.validador.indice_catalogo is indice_anterior
+    
+    def test_recargas_reutilizan_el_cliente_y_no_abren_el_libro_sin_cambios(self):
+        """Test: Se autoriza una sola vez y sin cambios en Drive el libro ni siquiera se abre"""
+        cliente = _mock_cliente_sheets([], modificado="2024-01-01T00:00:00.000Z")
+        with patch.object(self.validador, '_cliente_gspread', None), \
+             patch('gspread.authorize', return_value=cliente) as mock_authorize, \
+             patch('google.oauth2.service_account.Credentials.from_service_account_file'):
+            assert self.validador.recargar_catalogo() is None
+            assert self.validador.recargar_catalogo() is None
+        
+        mock_authorize.assert_called_once()
+        assert cliente.get_file_drive_metadata.call_count == 2
+        cliente.get_file_drive_metadata.assert_called_with('test_file_id')
+        cliente.open_by_key.assert_not_called()
+
+    def test_validar_ordenes_lote(self):
+        """Test: El lote devuelve un resultado por orden en el orden recibido"""
+        def orden(nit, numero, codigos):
+            return {
+                "comprador": {"nit": nit},
+                "orden_compra": numero,
+                "items": [
+                    {
+                        "codigo": codigo,
+                        "descripcion": "Producto Test",
+                        "cantidad": 1,
+                        "precio_unitario": 10.0,
+                        "precio_total": 10.0,
+                        "fecha_entrega": "2024-01-15"
+                    }
+                    for codigo in codigos
+                ]
+            }
+        ordenes = [
+            orden("CN800069933", "OC-1", ["14003793002"]),
+            orden("CN800069999", "OC-2", ["14003793002"]),
+            orden("CN800069933", "OC-3", ["14003793003", "14003793099"]),
+            orden("CN800069933", "OC-4", [])
+        ]
+        
+        resultados = self.validador.validar_ordenes(ordenes)
+        
+        assert [r["orden_compra"] for r in resultados] == ["OC-1", "OC-2", "OC-3", "OC-4"]
+        assert [r["PUEDE_PROCESAR_EN_SAP"] for r in resultados] == [True, False, False, False]
+        assert resultados[0] == {**self.validador.validar_orden(ordenes[0]), "fecha_validacion": resultados[0]["fecha_validacion"]}
+        assert resultados[2]["resumen"]["articulos_faltantes"] == 1
+        assert "al menos un artículo" in resultados[3]["error"]
+
+class TestArranqueDesdeSnapshot:
+    """Tests para el arranque del validador desde el snapshot local"""
+    
+    def test_arranque_sin_descargar_de_sheets(self, tmp_path):
+        """Test: Con snapshot válido el validador arranca sin esperar a Google Sheets"""
+        from src.catalogo import guardar_snapshot
+        ruta = str(tmp_path / "catalogo.npy")
+        guardar_snapshot(CATALOGO_TEST, ruta)
+        
+        with patch('src.validador.CATALOGO_SNAPSHOT_PATH', ruta), \
+             patch('src.validador.GOOGLE_DRIVE_FILE_ID', 'test_file_id'), \
+             patch('src.validador.GOOGLE_SHEET_RANGE', 'Hoja1!A:Z'), \
+             patch('src.validador.GOOGLE_APPLICATION_CREDENTIALS', 'credentials.json'), \
+             patch('src.validador.os.path.exists', return_value=True), \
+             patch('gspread.authorize') as mock_gspread, \
+             patch.object(ValidadorOrdenesCompra, 'recargar_catalogo') as mock_recargar:
+            validador = ValidadorOrdenesCompra()
+        
+        mock_gspread.assert_not_called()
+        assert validador.catalogo is None
+        assert validador.total_registros == 3
+        assert validador.indice_catalogo.buscar('CN800069934', '14003793004') == 2
+        # El refresco desde Sheets se lanza en segundo plano
+        for hilo in threading.enumerate():
+            if hilo.name == "recarga-inicial":
+                hilo.join(timeout=5)
+        mock_recargar.assert_called_once()
+    
+    def test_arranque_desde_snapshot_sin_cambios_no_descarga(self, tmp_path):
+        """Test: Si Drive informa la misma fecha que guardó el snapshot, el refresco no descarga ni publica"""
+        from src.catalogo import guardar_snapshot
+        ruta = str(tmp_path / "catalogo.npy")
+        modificado = "2024-01-01T00:00:00.000Z"
+        guardar_snapshot(CATALOGO_TEST, ruta, huella="abc123", modificado=modificado)
+        cliente = _mock_cliente_sheets([['Código SN', 'Nº catálogo SN']], modificado=modificado)
+        
+        with patch('src.validador.CATALOGO_SNAPSHOT_PATH', ruta), \
+             patch('src.validador.GOOGLE_DRIVE_FILE_ID', 'test_file_id'), \
+             patch('src.validador.GOOGLE_SHEET_RANGE', 'Hoja1!A:Z'), \
+             patch('src.validador.GOOGLE_APPLICATION_CREDENTIALS', 'credentials.json'), \
+             patch('src.validador.os.path.exists', return_value=True), \
+             patch('gspread.authorize', return_value=cliente), \
+             patch('google.oauth2.service_account.Credentials.from_service_account_file'):
+            validador = ValidadorOrdenesCompra()
+            for hilo in threading.enumerate():
+                if hilo.name == "recarga-inicial":
+                    hilo.join(timeout=5)
+        
+        assert cliente.open_by_key.return_value.worksheet.return_value.llamadas == []
+        assert validador.version_catalogo == 1
+        assert validador._huella_catalogo == "abc123"
+    
+    def test_arranque_mapeado_refresca_antes_de_volver(self, tmp_path):
+        """Test: Con indice_mapeado y refresco síncrono se valida sobre el snapshot mapeado, sin hilos de fondo"""
+        from src.catalogo import guardar_snapshot
+        ruta = str(tmp_path / "catalogo.npy")
+        modificado = "2024-01-01T00:00:00.000Z"
+        guardar_snapshot(CATALOGO_TEST, ruta, huella="abc123", modificado=modificado)
+        cliente = _mock_cliente_sheets([['Código SN', 'Nº catálogo SN']], modificado=modificado)
+        
+        with patch('src.validador.CATALOGO_SNAPSHOT_PATH', ruta), \
+             patch('src.validador.GOOGLE_DRIVE_FILE_ID', 'test_file_id'), \
+             patch('src.validador.GOOGLE_SHEET_RANGE', 'Hoja1!A:Z'), \
+             patch('src.validador.GOOGLE_APPLICATION_CREDENTIALS', 'credentials.json'), \
+             patch('src.validador.os.path.exists', return_value=True), \
+             patch('gspread.authorize', return_value=cliente), \
+             patch('google.oauth2.service_account.Credentials.from_service_account_file'), \
+             patch.object(threading.Thread, 'start') as mock_start:
+            validador = ValidadorOrdenesCompra(refresco_en_segundo_plano=False, indice_mapeado=True)
+        
+        mock_start.assert_not_called()
+        assert validador.ultima_verificacion is not None
+        assert validador.indice_catalogo.mapeado
+        item = {
+            "descripcion": "Producto Test",
+            "cantidad": 1,
+            "precio_unitario": 10.0,
+            "precio_total": 10.0,
+            "fecha_entrega": "2024-01-15"
+        }
+        resultado = validador.validar_orden({
+            "comprador": {"nit": "CN800069933"},
+            "orden_compra": "OC-2024-020",
+            "items": [{**item, "codigo": "14003793003"}, {**item, "codigo": "14003793004"}]
+        })
+        assert resultado["resumen"]["articulos_encontrados"] == 1
+        assert [a["codigo"] for a in resultado["articulos_que_NO_existen"]] == ["14003793004"]
+    
+    def test_recargar_desde_snapshot_escrito_por_otro_proceso(self, tmp_path):
+        """Test: Un worker publica el snapshot que reescribió el proceso principal sin llamar a Sheets"""
+        from src.catalogo import guardar_snapshot
+        ruta = str(tmp_path / "catalogo.npy")
+        guardar_snapshot(CATALOGO_TEST, ruta)
+        
+        with patch('src.validador.CATALOGO_SNAPSHOT_PATH', ruta), \
+             patch('src.validador.GOOGLE_DRIVE_FILE_ID', 'test_file_id'), \
+             patch('src.validador.GOOGLE_SHEET_RANGE', 'Hoja1!A:Z'), \
+             patch('src.validador.GOOGLE_APPLICATION_CREDENTIALS', 'credentials.json'), \
+             patch('src.validador.os.path.exists', return_value=True), \
+             patch('gspread.authorize') as mock_gspread, \
+             patch.object(ValidadorOrdenesCompra, 'recargar_catalogo'):
+            validador = ValidadorOrdenesCompra()
+            version = validador.version_catalogo
+            guardar_snapshot(pd.DataFrame({
+                'Código SN': ['CN800069935'],
+                'Nº catálogo SN': ['14003793099']
+            }), ruta)
+            assert validador.recargar_desde_snapshot() is True
+        
+        mock_gspread.assert_not_called()
+        assert validador.version_catalogo == version + 1
+        assert validador.total_registros == 1
+        assert validador.indice_catalogo.buscar('CN800069935', '14003793099') == 0
+        assert validador.indice_catalogo.buscar('CN800069934', '14003793004') is None
+
+class TestCrearApp:
+    """Tests para la fábrica de la aplicación y su arranque"""
+    
+    def test_importar_no_carga_dependencias_pesadas(self):
+        """Test: Importar src.validador no carga pandas, gspread ni google-auth"""
+        import subprocess
+        codigo = (
+            "import sys, src.validador; "
+            "print([m for m in ('pandas', 'gspread', 'google.oauth2') if m in sys.modules])"
+        )
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        salida = subprocess.run(
+            [sys.executable, "-c", codigo], cwd=raiz, capture_output=True, text=True, check=True
+        ).stdout
+        assert salida.strip().splitlines()[-1] == "[]"
+    
+    def _arrancar(self, cliente_sheets):
+        """Arrancar la aplicación con Google Sheets falso y esperar a que esté lista"""
+        import time
+        from src.validador import crear_app, ArranqueValidador
+        from src.pool_validacion import PoolValidacion
+        from fastapi.testclient import TestClient
+        
+        arranque = ArranqueValidador(espera_inicial=0.01, espera_maxima=0.01)
+        with patch.multiple(
+                'src.validador',
+                GOOGLE_DRIVE_FILE_ID='test_file_id',
+                GOOGLE_SHEET_RANGE='Hoja1!A:Z',
+                GOOGLE_APPLICATION_CREDENTIALS='credentials.json',
+                CATALOGO_SNAPSHOT_PATH='',
+                CATALOGO_RECARGA_SEGUNDOS=0,
+                validador=None,
+                arranque=arranque,
+                pool_validacion=PoolValidacion(workers=1, cola_max=1)
+             ), \
+             patch('src.validador.os.path.exists', return_value=True), \
+             patch('google.oauth2.service_account.Credentials.from_service_account_file'), \
+             patch('gspread.authorize', side_effect=cliente_sheets):
+            import src.validador as modulo
+            app = crear_app()
+            assert modulo.validador is None
+            with TestClient(app) as client:
+                # El servidor responde aunque el catálogo siga cargando
+                assert client.get("/health/live").status_code == 200
+                limite = time.monotonic() + 10
+                while client.get("/health/ready").status_code != 200 and time.monotonic() < limite:
+                    time.sleep(0.01)
+                assert modulo.validador is not None
+                response = client.get("/health")
+        return response, arranque
+    
+    def test_lifespan_carga_el_catalogo(self):
+        """Test: El catálogo se carga al arrancar la aplicación, no al importar"""
+        filas = [
+            ['Código SN', 'Nº catálogo SN', 'Descripción', 'Precio'],
+            ['CN800069933', '14003793002', 'Producto 1', '100.0']
+        ]
+        response, arranque = self._arrancar([_mock_cliente_sheets(filas)])
+        
+        assert response.status_code == 200
+        assert response.json()["catalogo_items"] == 1
+        assert arranque.intentos == 1
+    
+    def test_lifespan_reintenta_si_falla_la_carga(self):
+        """Test: Si Google Sheets falla al arrancar se reintenta en vez de terminar el proceso"""
+        filas = [
+            ['Código SN', 'Nº catálogo SN', 'Descripción', 'Precio'],
+            ['CN800069933', '14003793002', 'Producto 1', '100.0']
+        ]
+        response, arranque = self._arrancar([
+            Exception("Sheets no disponible"),
+            Exception("Sheets no disponible"),
+            _mock_cliente_sheets(filas)
+        ])
+        
+        assert response.status_code == 200
+        assert response.json()["status"] == "OK"
+        assert arranque.intentos == 3
+        assert arranque.ultimo_error is None
 
 class TestEndpoints:
     """Tests para los endpoints de FastAPI"""
@@ -279,9 +879,7 @@ class TestEndpoints:
             'Código SN': ['CN800069933'],
             'Nº catálogo SN': ['14003793002']
         })
-        mock_validador.indice_catalogo = pd.DataFrame({
-            'test': ['value']
-        }, index=['CN800069933|14003793002'])
+        mock_validador.indice_catalogo = IndiceCatalogo.desde_catalogo(mock_validador.catalogo)
         
         client = TestClient(app)
         response = client.get("/debug-catalogo")
@@ -289,7 +887,377 @@ class TestEndpoints:
         assert response.status_code == 200
         data = response.json()
         assert "primeras_5_filas" in data
-        assert "claves_busqueda" in data
+        assert data["claves_busqueda"] == ['CN800069933|14003793002']
+
+    @patch('src.validador.validador')
+    def test_validar_ordenes_endpoint(self, mock_validador):
+        """Test: Endpoint de lote devuelve resumen y resultados por orden"""
+        from src.validador import app
+        from fastapi.testclient import TestClient
+        
+        mock_validador.validar_ordenes.return_value = [
+            {"orden_compra": "OC-1", "PUEDE_PROCESAR_EN_SAP": True},
+            {"orden_compra": "OC-2", "PUEDE_PROCESAR_EN_SAP": False}
+        ]
+        orden = {
+            "comprador": {"nit": "CN800069933"},
+            "orden_compra": "OC-1",
+            "items": [{
+                "codigo": "14003793002",
+                "descripcion": "Producto Test",
+                "cantidad": 1,
+                "precio_unitario": 10.0,
+                "precio_total": 10.0,
+                "fecha_entrega": "2024-01-15"
+            }]
+        }
+        
+        client = TestClient(app)
+        response = client.post("/validar-ordenes", json=[orden, {**orden, "orden_compra": "OC-2"}])
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_ordenes"] == 2
+        assert data["ordenes_validas"] == 1
+        assert len(mock_validador.validar_ordenes.call_args[0][0]) == 2
+    
+    @patch('src.validador.validador')
+    def test_metrics_expone_etapas_de_validar_orden(self, mock_validador):
+        """Test: /metrics incluye solicitudes por endpoint y duración por etapa"""
+        from src.validador import app
+        from fastapi.testclient import TestClient
+        
+        mock_validador.validar_orden.return_value = {"orden_compra": "OC-1"}
+        mock_validador.total_registros = 3
+        mock_validador.version_catalogo = 1
+        mock_validador.ultima_recarga = None
+        orden = {
+            "comprador": {"nit": "CN800069933"},
+            "orden_compra": "OC-1",
+            "items": [{
+                "codigo": "14003793002",
+                "descripcion": "Producto Test",
+                "cantidad": 1,
+                "precio_unitario": 10.0,
+                "precio_total": 10.0,
+                "fecha_entrega": "2024-01-15"
+            }]
+        }
+        client = TestClient(app)
+        assert client.post("/validar-orden", json=orden).status_code == 200
+        response = client.get("/metrics")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        texto = response.text
+        assert 'validador_solicitudes_total{endpoint="/validar-orden",codigo="200"}' in texto
+        for etapa in ("parse", "dict", "serialize"):
+            assert f'validador_etapa_segundos_count{{etapa="{etapa}"}}' in texto
+        assert "validador_catalogo_registros 3" in texto
+    
+    @patch('src.validador.SERVER_TIMING', True)
+    @patch('src.validador.validador')
+    def test_validar_orden_endpoint_server_timing(self, mock_validador):
+        """Test: Con SERVER_TIMING la respuesta incluye el desglose por etapa"""
+        from src.validador import app
+        from fastapi.testclient import TestClient
+        
+        def validar(orden_json, tiempos, clave=None):
+            tiempos.update(cache=0.001, lookup=0.002, build=0.003)
+            return {"orden_compra": orden_json["orden_compra"]}
+        mock_validador.validar_orden.side_effect = validar
+        orden = {
+            "comprador": {"nit": "CN800069933"},
+            "orden_compra": "OC-1",
+            "items": [{
+                "codigo": "14003793002",
+                "descripcion": "Producto Test",
+                "cantidad": 1,
+                "precio_unitario": 10.0,
+                "precio_total": 10.0,
+                "fecha_entrega": "2024-01-15"
+            }]
+        }
+        client = TestClient(app)
+        response = client.post("/validar-orden", json=orden)
+        
+        assert response.status_code == 200
+        etapas = [e.split(";")[0] for e in response.headers["Server-Timing"].split(", ")]
+        assert etapas[:8] == ["parse", "dict", "clave", "admision", "cache", "lookup", "build", "serialize"]
+    
+    def test_admin_perfil_requiere_token(self):
+        """Test: /admin/perfil está deshabilitado sin ADMIN_TOKEN y exige el token correcto"""
+        from src.validador import app
+        from fastapi.testclient import TestClient
+        
+        client = TestClient(app)
+        with patch('src.validador.ADMIN_TOKEN', ''):
+            assert client.post("/admin/perfil").status_code == 404
+        with patch('src.validador.ADMIN_TOKEN', 'secreto'):
+            assert client.post("/admin/perfil", headers={"X-Admin-Token": "otro"}).status_code == 403
+            # Un byte no ASCII en el encabezado no debe convertirse en un 500
+            assert client.post(
+                "/admin/perfil", headers={"X-Admin-Token": "secret\xe9".encode('latin-1')}
+            ).status_code == 403
+            response = client.post(
+                "/admin/perfil?segundos=0.05&todo=true", headers={"X-Admin-Token": "secreto"}
+            )
+        
+        assert response.status_code == 200
+        assert int(response.headers["X-Perfil-Muestras"]) > 0
+    
+    @patch('src.validador.validador')
+    def test_recarga_forzada_requiere_token(self, mock_validador):
+        """Test: /catalogo/recargar?forzar=true exige el token de administración; sin forzar no"""
+        from src.validador import app
+        from fastapi.testclient import TestClient
+        
+        mock_validador.recargar_catalogo.return_value = None
+        mock_validador.version_catalogo = 1
+        mock_validador.total_registros = 3
+        mock_validador.ultima_recarga = datetime.now()
+        client = TestClient(app)
+        with patch('src.validador.ADMIN_TOKEN', ''):
+            assert client.post("/catalogo/recargar?forzar=true").status_code == 404
+        with patch('src.validador.ADMIN_TOKEN', 'secreto'):
+            assert client.post(
+                "/catalogo/recargar?forzar=true", headers={"X-Admin-Token": "otro"}
+            ).status_code == 403
+            mock_validador.recargar_catalogo.assert_not_called()
+            assert client.post("/catalogo/recargar").json()["sin_cambios"] is True
+            response = client.post(
+                "/catalogo/recargar?forzar=true", headers={"X-Admin-Token": "secreto"}
+            )
+        
+        assert response.status_code == 200
+        assert [c.args for c in mock_validador.recargar_catalogo.call_args_list] == [(False,), (True,)]
+    
+    @patch('src.validador.validador')
+    def test_validar_orden_endpoint_pool_saturado(self, mock_validador):
+        """Test: Con el pool saturado /validar-orden responde 503 con Retry-After"""
+        from src.validador import app
+        from src.pool_validacion import PoolSaturado
+        from fastapi.testclient import TestClient
+        
+        orden = {
+            "comprador": {"nit": "CN800069933"},
+            "orden_compra": "OC-1",
+            "items": [{
+                "codigo": "14003793002",
+                "descripcion": "Producto Test",
+                "cantidad": 1,
+                "precio_unitario": 10.0,
+                "precio_total": 10.0,
+                "fecha_entrega": "2024-01-15"
+            }]
+        }
+        with patch('src.validador.pool_validacion.ejecutar', side_effect=PoolSaturado("saturado")):
+            client = TestClient(app)
+            response = client.post("/validar-orden", json=orden)
+        
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+        assert response.json()["PUEDE_PROCESAR_EN_SAP"] is False
+    
+    @patch('src.validador.validador', None)
+    def test_sin_catalogo_responde_503_con_retry_after(self):
+        """Test: Mientras el catálogo carga, validar responde 503 y readiness no está listo"""
+        from src.validador import app
+        from fastapi.testclient import TestClient
+        
+        orden = {
+            "comprador": {"nit": "CN800069933"},
+            "orden_compra": "OC-1",
+            "items": [{
+                "codigo": "14003793002",
+                "descripcion": "Producto Test",
+                "cantidad": 1,
+                "precio_unitario": 10.0,
+                "precio_total": 10.0,
+                "fecha_entrega": "2024-01-15"
+            }]
+        }
+        client = TestClient(app)
+        response = client.post("/validar-orden", json=orden)
+        
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "5"
+        assert response.json()["PUEDE_PROCESAR_EN_SAP"] is False
+        assert client.post("/validar-ordenes", json=[orden]).status_code == 503
+        assert client.get("/health/ready").status_code == 503
+        assert client.get("/health/live").status_code == 200
+        health = client.get("/health")
+        assert health.status_code == 200
+        assert health.json()["status"] == "CARGANDO"
+    
+    @patch('src.validador.validador')
+    def test_health_ready_con_catalogo(self, mock_validador):
+        """Test: Readiness responde 200 con la versión del catálogo cargado"""
+        from src.validador import app
+        from fastapi.testclient import TestClient
+        
+        mock_validador.version_catalogo = 2
+        mock_validador.total_registros = 10
+        client = TestClient(app)
+        response = client.get("/health/ready")
+        
+        assert response.status_code == 200
+        assert response.json() == {"status": "LISTO", "catalogo_version": 2, "catalogo_items": 10}
+    
+    @patch('src.validador.validador')
+    def test_validar_orden_endpoint_copias_concurrentes_comparten_calculo(self, mock_validador):
+        """Test: Copias idénticas en curso esperan a la primera sin pasar por la admisión ni el pool"""
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from src.validador import app
+        from src.admision import ControlAdmision
+        from src.pool_validacion import PoolValidacion
+        from fastapi.testclient import TestClient
+        
+        liberar = threading.Event()
+        
+        def validar(orden_json, tiempos, clave=None):
+            liberar.wait(5)
+            return {"orden_compra": orden_json["orden_compra"], "fecha_validacion": "antes"}
+        mock_validador.validar_orden.side_effect = validar
+        mock_validador.clave_orden.return_value = "orden:v1:abc"
+        orden = {
+            "comprador": {"nit": "CN800069933"},
+            "orden_compra": "OC-1",
+            "items": [{
+                "codigo": "14003793002",
+                "descripcion": "Producto Test",
+                "cantidad": 1,
+                "precio_unitario": 10.0,
+                "precio_total": 10.0,
+                "fecha_entrega": "2024-01-15"
+            }]
+        }
+        # Cupo para una sola orden de 1 artículo y sin cola: una copia que pasara por la admisión recibiría 429
+        control = ControlAdmision(max_articulos=1, espera_max=0.01, cola_max=0)
+        pool = PoolValidacion(workers=1, cola_max=0)
+        with patch('src.validador.control_admision', control), \
+             patch('src.validador.pool_validacion', pool), \
+             patch('src.validador.ordenes_en_curso', VueloUnico()) as vuelo, \
+             TestClient(app) as client, ThreadPoolExecutor(max_workers=4) as executor:
+            futuros = [executor.submit(client.post, "/validar-orden", json=orden) for _ in range(4)]
+            limite = time.monotonic() + 5
+            while vuelo.compartidas < 3 and time.monotonic() < limite:
+                time.sleep(0.001)
+            liberar.set()
+            respuestas = [f.result() for f in futuros]
+        
+        assert [r.status_code for r in respuestas] == [200] * 4
+        assert mock_validador.validar_orden.call_count == 1
+        assert vuelo.stats() == {"lideres": 1, "compartidas": 3, "en_curso": 0}
+        assert control.admitidas == 1
+        assert sum(r.json()["fecha_validacion"] != "antes" for r in respuestas) == 3
+    
+    @patch('src.validador.validador')
+    def test_validar_orden_endpoint_admision_rechazada(self, mock_validador):
+        """Test: Sin lugar en el control de admisión /validar-orden responde 429 con Retry-After"""
+        from src.validador import app
+        from src.admision import ControlAdmision
+        from fastapi.testclient import TestClient
+        
+        item = {
+            "codigo": "14003793002",
+            "descripcion": "Producto Test",
+            "cantidad": 1,
+            "precio_unitario": 10.0,
+            "precio_total": 10.0,
+            "fecha_entrega": "2024-01-15"
+        }
+        orden = {"comprador": {"nit": "CN800069933"}, "orden_compra": "OC-1", "items": [item, item]}
+        control = ControlAdmision(max_articulos=2, espera_max=0.01, cola_max=1)
+        # Otra orden de 2 artículos ocupa todo el cupo
+        control.articulos_en_vuelo = 2
+        with patch('src.validador.control_admision', control):
+            client = TestClient(app)
+            response = client.post("/validar-orden", json=orden)
+        
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "1"
+        assert response.json()["PUEDE_PROCESAR_EN_SAP"] is False
+        assert control.rechazadas["espera_agotada"] == 1
+        mock_validador.validar_orden.assert_not_called()
+    
+    @patch('src.validador.validador')
+    def test_validar_ordenes_endpoint_lote_vacio(self, mock_validador):
+        """Test: Un lote vacío se rechaza con 400"""
+        from src.validador import app
+        from fastapi.testclient import TestClient
+        
+        client = TestClient(app)
+        response = client.post("/validar-ordenes", json=[])
+        
+        assert response.status_code == 400
+        mock_validador.validar_ordenes.assert_not_called()
+    
+    @patch('src.validador.VALIDAR_ORDENES_MAX_ARTICULOS', 2)
+    @patch('src.validador.validador')
+    def test_validar_ordenes_endpoint_demasiados_articulos(self, mock_validador):
+        """Test: Un lote que supera el máximo de artículos en total se rechaza con 400"""
+        from src.validador import app
+        from fastapi.testclient import TestClient
+        
+        item = {
+            "codigo": "14003793002",
+            "descripcion": "Producto Test",
+            "cantidad": 1,
+            "precio_unitario": 10.0,
+            "precio_total": 10.0,
+            "fecha_entrega": "2024-01-15"
+        }
+        orden = {"comprador": {"nit": "CN800069933"}, "orden_compra": "OC-1", "items": [item, item]}
+        
+        client = TestClient(app)
+        response = client.post("/validar-ordenes", json=[orden, orden])
+        
+        assert response.status_code == 400
+        assert "artículos" in response.json()["error"]
+        mock_validador.validar_ordenes.assert_not_called()
+
+    @patch('src.validador.STREAM_LOTE', 2)
+    @patch('src.validador.validador')
+    def test_validar_ordenes_stream(self, mock_validador):
+        """Test: El stream NDJSON devuelve una línea de resultado por orden recibida"""
+        from src.validador import app
+        from fastapi.testclient import TestClient
+        import json
+        
+        mock_validador.validar_ordenes.side_effect = lambda ordenes: [
+            {"orden_compra": o["orden_compra"], "PUEDE_PROCESAR_EN_SAP": True} for o in ordenes
+        ]
+        item = {
+            "codigo": "14003793002",
+            "descripcion": "Producto Test",
+            "cantidad": 1,
+            "precio_unitario": 10.0,
+            "precio_total": 10.0,
+            "fecha_entrega": "2024-01-15"
+        }
+        lineas = [
+            json.dumps({"comprador": {"nit": "CN800069933"}, "orden_compra": "OC-1", "items": [item]}),
+            "{no es json",
+            json.dumps({"comprador": {"nit": "CN800069933"}, "orden_compra": "OC-3", "items": []}),
+            "",
+            json.dumps({"comprador": {"nit": "CN800069933"}, "orden_compra": "OC-5", "items": [item]})
+        ]
+        
+        client = TestClient(app)
+        response = client.post("/validar-ordenes/stream", content="\n".join(lineas))
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        resultados = [json.loads(l) for l in response.text.splitlines()]
+        assert [r["linea"] for r in resultados] == [1, 2, 3, 5]
+        assert resultados[0]["orden_compra"] == "OC-1"
+        assert "error" in resultados[1]
+        assert "al menos un artículo" in resultados[2]["error"]
+        assert resultados[3]["orden_compra"] == "OC-5"
+        # Las órdenes válidas se validan en lotes de STREAM_LOTE líneas
+        assert mock_validador.validar_ordenes.call_count == 2
 
 if __name__ == "__main__":
     # Ejecutar tests
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests unitarios para la coalescencia de cálculos idénticos en curso
+"""
+
+import asyncio
+import pytest
+
+from src.vuelo_unico import VueloUnico
+
+async def _ceder(veces=5):
+    """Dejar correr a las demás tareas hasta que se bloqueen"""
+    for _ in range(veces):
+        await asyncio.sleep(0)
+
+class TestVueloUnico:
+    """Tests para VueloUnico"""
+    
+    def test_llamadas_concurrentes_comparten_un_calculo(self):
+        """Test: Con la misma clave en curso, solo el líder ejecuta la función"""
+        vuelo = VueloUnico()
+        llamadas = []
+        
+        async def escenario():
+            liberar = asyncio.Event()
+            
+            async def calcular():
+                llamadas.append(1)
+                await liberar.wait()
+                return {"valor": 42}
+            
+            tareas = [asyncio.ensure_future(vuelo.ejecutar("orden", calcular)) for _ in range(5)]
+            await _ceder()
+            assert vuelo.stats() == {"lideres": 1, "compartidas": 4, "en_curso": 1}
+            liberar.set()
+            return await asyncio.gather(*tareas)
+        
+        resultados = asyncio.run(escenario())
+        
+        assert len(llamadas) == 1
+        assert all(resultado == {"valor": 42} for resultado, _ in resultados)
+        assert [compartido for _, compartido in resultados] == [False] + [True] * 4
+        assert vuelo.stats() == {"lideres": 1, "compartidas": 4, "en_curso": 0}
+    
+    def test_claves_distintas_no_se_agrupan(self):
+        """Test: Cada clave distinta ejecuta su propio cálculo"""
+        vuelo = VueloUnico()
+        
+        def valor(v):
+            async def calcular():
+                return v
+            return calcular
+        
+        async def escenario():
+            return [
+                await vuelo.ejecutar("a", valor(1)),
+                await vuelo.ejecutar("b", valor(2)),
+                # Un cálculo terminado libera la clave: la siguiente llamada vuelve a calcular
+                await vuelo.ejecutar("a", valor(3))
+            ]
+        
+        assert asyncio.run(escenario()) == [(1, False), (2, False), (3, False)]
+        assert vuelo.stats()["lideres"] == 3
+    
+    def test_excepcion_del_lider_llega_a_todos(self):
+        """Test: Si el cálculo falla, los que esperaban reciben la misma excepción y la clave se libera"""
+        vuelo = VueloUnico()
+        
+        async def escenario():
+            liberar = asyncio.Event()
+            
+            async def fallar():
+                await liberar.wait()
+                raise ValueError("catálogo inconsistente")
+            
+            tareas = [asyncio.ensure_future(vuelo.ejecutar("orden", fallar)) for _ in range(3)]
+            await _ceder()
+            liberar.set()
+            return await asyncio.gather(*tareas, return_exceptions=True)
+        
+        errores = asyncio.run(escenario())
+        
+        assert all(isinstance(e, ValueError) and "inconsistente" in str(e) for e in errores)
+        assert vuelo.stats()["en_curso"] == 0
+    
+    def test_lider_cancelado_no_cancela_a_los_que_esperan(self):
+        """Test: Si el líder se cancela, quien esperaba calcula por su cuenta en lugar de fallar"""
+        vuelo = VueloUnico()
+        llamadas = []
+        
+        async def escenario():
+            liberar = asyncio.Event()
+            
+            async def calcular():
+                llamadas.append(1)
+                await liberar.wait()
+                return "ok"
+            
+            lider = asyncio.ensure_future(vuelo.ejecutar("orden", calcular))
+            seguidor = asyncio.ensure_future(vuelo.ejecutar("orden", calcular))
+            await _ceder()
+            lider.cancel()
+            await _ceder()
+            liberar.set()
+            with pytest.raises(asyncio.CancelledError):
+                await lider
+            return await seguidor
+        
+        assert asyncio.run(escenario()) == ("ok", False)
+        assert len(llamadas) == 2
+        assert vuelo.stats() == {"lideres": 2, "compartidas": 0, "en_curso": 0}